@@ -3,6 +3,7 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 # --- PFAD LOGIK ---
@@ -13,6 +14,22 @@ def get_config_path(filename):
         base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, filename)
 
+def open_camera(cam_id):
+    """Öffnet eine Kamera in 1080p und wartet, bis sie eingeschwungen ist. None, wenn sie nicht aufgeht."""
+    cap = cv2.VideoCapture(cam_id, cv2.CAP_DSHOW)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    
+    # --- UMSCHALTUNG AUF 1080p ---
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+    
+    # Wichtig: Höhere Auflösung braucht etwas mehr Zeit zum initialisieren
+    time.sleep(1.5)
+    for _ in range(10): cap.read()
+    return cap
+
 class Calibrator:
     def __init__(self, cam_ids=[0, 1, 2]):
         self.cam_ids = cam_ids
@@ -24,6 +41,9 @@ class Calibrator:
         self.mouse_x = 0
         self.mouse_y = 0
         self.is_dragging = False
+        # Alle Kameras parallel im Hintergrund öffnen: während eine kalibriert wird, sind die nächsten schon bereit
+        self.opener = ThreadPoolExecutor(max_workers=len(cam_ids))
+        self.opening = {cam_id: self.opener.submit(open_camera, cam_id) for cam_id in cam_ids}
         self.setup_cam()
 
     def setup_cam(self):
@@ -37,20 +57,12 @@ class Calibrator:
         cam_id = self.cam_ids[self.current_cam_idx]
         print(f"[INFO] Initialisiere Kamera ID: {cam_id}...")
         
-        self.cap = cv2.VideoCapture(cam_id, cv2.CAP_DSHOW)
+        self.cap = self.opening.pop(cam_id).result()
         
-        if not self.cap.isOpened():
+        if self.cap is None:
             print(f"[ERROR] Kamera ID {cam_id} konnte nicht geöffnet werden.")
             self.current_cam_idx += 1
             return self.setup_cam()
-        
-        # --- UMSCHALTUNG AUF 1080p ---
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-        
-        # Wichtig: Höhere Auflösung braucht etwas mehr Zeit zum initialisieren
-        time.sleep(1.5)
-        for _ in range(10): self.cap.read()
             
         self.points = []
         return True
@@ -143,6 +155,11 @@ class Calibrator:
                 break
 
         if self.cap is not None: self.cap.release()
+        # Abgebrochen: Kameras, die noch geöffnet werden oder schon offen sind, wieder freigeben
+        for future in self.opening.values():
+            cap = future.result()
+            if cap is not None: cap.release()
+        self.opener.shutdown()
         cv2.destroyAllWindows()
 
 def start_calibration():
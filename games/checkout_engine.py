@@ -0,0 +1,162 @@
+# games/checkout_engine.py
+import json
+import os
+import sys
+
+# Felder: S1-S20, D1-D20, T1-T20, "25" (Single Bull) und "Bull" (Double Bull, zählt als Doppel)
+DARTS = [(f"{k}{n}", n * m, k) for k, m in (("S", 1), ("D", 2), ("T", 3)) for n in range(1, 21)]
+DARTS += [("25", 25, "25"), ("Bull", 50, "Bull")]
+DART_VALUES = {name: value for name, value, _ in DARTS}
+
+OUT_MODES = ("Single Out", "Double Out", "Master Out")
+# Erlaubte Arten für den letzten Pfeil
+FINISH_KINDS = {
+    "Single Out": {"S", "D", "T", "25", "Bull"},
+    "Double Out": {"D", "Bull"},
+    "Master Out": {"D", "T", "Bull"},
+}
+MAX_SCORE = 180
+
+# Bewertung eines Checkwegs (kleiner ist besser). Wird nur beim Bauen der Tabelle ausgewertet.
+DEFAULT_PREFERENCES = {
+    "per_dart": 100.0,    # jeder Pfeil mehr: weniger Pfeile schlagen jede andere Vorliebe
+    "kind": {"S": 0.0, "T": 2.0, "D": 4.0, "25": 4.0, "Bull": 5.0}, # Schwierigkeit eines Setup-Pfeils
+    "finish": {"D20": 0.0, "D16": 0.0, "D8": 0.5, "D18": 1.0, "D10": 1.0, "D12": 1.0, "D4": 1.5, "Bull": 3.0},
+    "finish_default": 2.0, # alle anderen Doppel als letzter Pfeil
+    "triple_number": 0.05, # pro Zahl unter 20 bei Triple-Setups (T20 ist das gewohnte Ziel)
+}
+KEEP = 5 # Wege pro Eintrag in der Tabelle
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkout_table.json")
+
+def dart_number(name):
+    return 25 if name in ("25", "Bull") else int(name[1:])
+
+def route_cost(route, prefs):
+    """Kosten eines Wegs (Liste von Feldnamen) nach dem Präferenzmodell."""
+    cost = prefs["per_dart"] * len(route)
+    for i, name in enumerate(route):
+        kind = "25" if name == "25" else ("Bull" if name == "Bull" else name[0])
+        if i == len(route) - 1 and kind in ("D", "Bull"):
+            cost += prefs["finish"].get(name, prefs["finish_default"])
+            continue
+        cost += prefs["kind"][kind]
+        if kind == "T": cost += prefs["triple_number"] * (20 - dart_number(name))
+    return cost
+
+def enumerate_routes(score, out_mode):
+    """Alle legalen Wege mit 1 bis 3 Pfeilen für score. Die Setup-Pfeile eines 3-Dart-Wegs nur
+    einmal pro Kombination (höherer Wert zuerst), die Reihenfolge ändert am Rest nichts."""
+    finishers = [(name, value) for name, value, kind in DARTS if kind in FINISH_KINDS[out_mode]]
+    by_value = {}
+    for name, value in finishers: by_value.setdefault(value, []).append(name)
+
+    routes = [[name] for name in by_value.get(score, [])]
+    for i, (a, va, _) in enumerate(DARTS):
+        if va >= score: continue
+        routes += [[a, name] for name in by_value.get(score - va, [])]
+        for b, vb, _ in DARTS[i:]:
+            rest = score - va - vb
+            if rest <= 0: continue
+            first, second = (a, b) if (va, a) >= (vb, b) else (b, a)
+            routes += [[first, second, name] for name in by_value.get(rest, [])]
+    return routes
+
+def build_table(prefs=None, keep=KEEP):
+    """Beste `keep` Wege pro Out-Modus, Anzahl übriger Pfeile (1-3) und Score (0-180)."""
+    prefs = prefs or DEFAULT_PREFERENCES
+    routes = {}
+    for mode in OUT_MODES:
+        per_darts = {str(d): [[] for _ in range(MAX_SCORE + 1)] for d in (1, 2, 3)}
+        for score in range(1, MAX_SCORE + 1):
+            # Gleiche Kosten: höherer Wert zuerst (T20 T18 vor T19 T19)
+            ranked = sorted(enumerate_routes(score, mode),
+                            key=lambda r: (route_cost(r, prefs), [-DART_VALUES[name] for name in r], r))
+            # Dieselben Pfeile in anderer Reihenfolge (z.B. Single Out) nur einmal, die beste Reihenfolge zählt
+            seen, unique = set(), []
+            for r in ranked:
+                key = tuple(sorted(r))
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(r)
+            for d in (1, 2, 3):
+                per_darts[str(d)][score] = [" ".join(r) for r in unique if len(r) <= d][:keep]
+        routes[mode] = per_darts
+    return {"preferences": prefs, "keep": keep, "routes": routes}
+
+def write_table(path=TABLE_FILE, prefs=None, keep=KEEP):
+    table = build_table(prefs, keep)
+    with open(path, "w") as f:
+        json.dump(table, f, separators=(",", ":"))
+    return table
+
+def load_table(path=TABLE_FILE):
+    """Tabelle laden -> {out_mode: {darts: [Wege pro Score]}}, jeder Weg eine Liste von Feldnamen.
+    Fehlt die Datei, wird sie im Speicher gebaut."""
+    try:
+        with open(path, "r") as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        print(f"[WARN] Checkout-Tabelle {path} fehlt, wird neu berechnet.")
+        table = build_table()
+    return {mode: {int(d): [[r.split(" ") for r in ways] for ways in per_score] for d, per_score in per_darts.items()}
+            for mode, per_darts in table["routes"].items()}
+
+TABLE = load_table()
+
+def checkout_routes(score, out_mode="Double Out", darts=3):
+    """Beste Checkwege für score mit höchstens `darts` Pfeilen (Listen von Feldnamen), [] wenn keiner geht."""
+    if not 0 < score <= MAX_SCORE or not 1 <= darts <= 3: return []
+    return TABLE[out_mode][darts][score]
+
+def format_route(route):
+    return " - ".join(route)
+
+# --- SELBSTTEST ---
+
+def verify(table):
+    """Prüft jeden Eintrag: Summe, Anzahl Pfeile, letzter Pfeil passt zum Out-Modus, und dass
+    jeder checkbare Score (mit den übrigen Pfeilen) auch Wege hat. Gibt die Fehler als Liste zurück."""
+    errors = []
+    for mode in OUT_MODES:
+        for darts in (1, 2, 3):
+            for score in range(MAX_SCORE + 1):
+                ways = table[mode][darts][score]
+                for route in ways:
+                    if sum(DART_VALUES[name] for name in route) != score:
+                        errors.append(f"{mode} {darts} {score}: Summe {route}")
+                    if len(route) > darts:
+                        errors.append(f"{mode} {darts} {score}: zu viele Pfeile {route}")
+                    last = next(kind for name, _, kind in DARTS if name == route[-1])
+                    if last not in FINISH_KINDS[mode]:
+                        errors.append(f"{mode} {darts} {score}: ungültiger letzter Pfeil {route}")
+                possible = score > 0 and any(len(r) <= darts for r in enumerate_routes(score, mode))
+                if possible != bool(ways):
+                    errors.append(f"{mode} {darts} {score}: {'fehlt' if possible else 'unmöglich'}")
+    return errors
+
+def self_test():
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    errors = verify(TABLE)
+    for e in errors[:20]: print(f"  {e}")
+    check("alle Einträge rechnerisch korrekt", not errors)
+    with open(TABLE_FILE, "r") as f:
+        check("Tabelle passt zu DEFAULT_PREFERENCES (sonst --build)", json.load(f)["routes"] == build_table()["routes"])
+    check("170 Double Out", checkout_routes(170)[0] == ["T20", "T20", "Bull"])
+    check("Bogey-Zahlen ohne Weg", all(not checkout_routes(s) for s in (169, 168, 166, 165, 163, 162, 159)))
+    check("180 nur Master/Single Out", not checkout_routes(180) and checkout_routes(180, "Master Out")[0] == ["T20", "T20", "T20"])
+    check("ein Pfeil übrig", checkout_routes(40, darts=1) == [["D20"]] and not checkout_routes(41, darts=1))
+    check("1 nur Single Out", not checkout_routes(1) and checkout_routes(1, "Single Out")[0] == ["S1"])
+    return ok
+
+if __name__ == "__main__":
+    if "--build" in sys.argv:
+        write_table()
+        print(f"[INFO] Checkout-Tabelle geschrieben: {TABLE_FILE}")
+    else:
+        sys.exit(0 if self_test() else 1)
@@ -1,183 +1,11 @@
 # games/m_checkouts.py
+# Checkwege für Master Out, aus der vorberechneten Tabelle (games/checkout_engine.py)
 
-checkouts = {
-    180: [["T20", "T20", "T20"], ["T20", "T20", "T20"], ["T20", "T20", "T20"]],
-    179: [["T20", "T20", "T19"], ["T20", "T19", "T20"], ["T19", "T20", "T20"]],
-    178: [["T20", "T20", "T18"], ["T20", "T18", "T20"], ["T18", "T20", "T20"]],
-    177: [["T20", "T20", "T19"], ["T20", "T19", "T20"], ["T19", "T20", "T20"]],
-    176: [["T20", "T20", "T16"], ["T20", "T18", "T18"], ["T18", "T18", "T20"]],
-    175: [["T20", "T20", "T15"], ["T20", "T19", "T16"], ["T19", "T20", "T16"]],
-    174: [["T20", "T20", "T18"], ["T20", "T18", "T20"], ["T18", "T20", "T20"]],
-    173: [["T20", "T19", "T16"], ["T20", "T17", "T18"], ["T19", "T18", "T16"]],
-    172: [["T20", "T20", "T12"], ["T20", "T16", "T16"], ["T18", "T18", "T16"]],
-    171: [["T20", "T20", "T17"], ["T20", "T17", "T20"], ["T17", "T20", "T20"]],
-    170: [["T20", "T20", "BULL"], ["T20", "T18", "T18"], ["T19", "T19", "T19"]],
-    169: [["T20", "T19", "T16"], ["T19", "T20", "T16"], ["T18", "T17", "T16"]],
-    168: [["T20", "T18", "T16"], ["T19", "T17", "T16"], ["T20", "T20", "T8"]],
-    167: [["T20", "T19", "BULL"], ["T19", "T20", "BULL"], ["T17", "T17", "T20"]],
-    166: [["T20", "T18", "T14"], ["T19", "T17", "T14"], ["T20", "T16", "T16"]],
-    165: [["T20", "T19", "T12"], ["T19", "T20", "T12"], ["T18", "T17", "T14"]],
-    164: [["T20", "T18", "BULL"], ["T19", "T19", "BULL"], ["T18", "T18", "T18"]],
-    163: [["T20", "T17", "T16"], ["T19", "T18", "T14"], ["T20", "T15", "T16"]],
-    162: [["T20", "T16", "T14"], ["T19", "T15", "T16"], ["T18", "T18", "T12"]],
-    161: [["T20", "T17", "BULL"], ["T19", "T18", "BULL"], ["T17", "T20", "BULL"]],
-    160: [["T20", "T20", "D20"], ["T20", "T18", "T18"], ["T16", "T16", "T16"]],
-    159: [["T20", "T19", "T14"], ["T20", "T15", "T18"], ["T17", "T18", "T18"]],
-    158: [["T20", "T20", "D19"], ["T20", "T18", "T16"], ["T19", "T19", "T14"]],
-    157: [["T20", "T19", "D20"], ["T19", "T20", "D20"], ["T17", "T17", "T18"]],
-    156: [["T20", "T20", "D18"], ["T20", "T16", "T16"], ["T19", "T19", "T13"]],
-    155: [["T20", "T19", "D19"], ["T19", "T19", "T14"], ["T17", "T17", "T18"]],
-    154: [["T20", "T18", "D20"], ["T18", "T20", "D20"], ["T19", "T19", "T12"]],
-    153: [["T20", "T19", "D18"], ["T17", "T17", "T17"], ["T19", "T18", "T13"]],
-    152: [["T20", "T20", "D16"], ["T19", "T19", "D19"], ["T20", "T16", "D20"]],
-    151: [["T20", "T17", "D20"], ["T19", "T18", "D20"], ["T17", "T20", "D20"]],
-    150: [["T20", "T20", "T10"], ["T19", "T19", "T12"], ["T18", "T18", "T14"]],
-    149: [["T20", "T19", "D16"], ["T20", "T15", "T14"], ["T17", "T17", "T15"]],
-    148: [["T20", "T20", "D14"], ["T20", "T16", "T20"], ["T18", "T18", "T13"]],
-    147: [["T20", "T19", "T10"], ["T17", "T16", "T16"], ["T19", "T18", "T12"]],
-    146: [["T20", "T20", "D13"], ["T19", "T19", "D16"], ["T18", "T18", "D19"]],
-    145: [["T20", "T15", "T20"], ["T19", "T18", "T10"], ["T17", "T17", "T14"]],
-    144: [["T20", "T20", "D12"], ["T18", "T18", "T12"], ["T19", "T19", "D15"]],
-    143: [["T20", "T17", "T16"], ["T19", "T18", "T10"], ["T16", "T16", "T15"]],
-    142: [["T20", "T20", "D11"], ["T20", "T14", "D20"], ["T19", "T17", "T11"]],
-    141: [["T20", "T19", "D12"], ["T17", "T20", "T10"], ["T18", "T18", "T11"]],
-    140: [["T20", "T20", "D10"], ["T20", "T16", "D14"], ["T18", "T18", "D16"]],
-    139: [["T20", "T19", "T11"], ["T19", "T14", "T13"], ["T17", "T16", "T13"]],
-    138: [["T20", "T18", "D12"], ["T19", "T17", "T10"], ["T16", "T16", "T14"]],
-    137: [["T20", "T19", "T10"], ["T17", "T18", "T10"], ["T16", "T15", "T14"]],
-    136: [["T20", "T20", "D8"], ["T20", "T12", "D20"], ["T18", "T16", "D14"]],
-    135: [["T20", "T15", "D20"], ["T19", "T16", "T10"], ["T17", "T16", "T11"]],
-    134: [["T20", "T14", "D20"], ["T18", "T18", "D13"], ["T19", "T15", "T12"]],
-    133: [["T20", "T11", "D20"], ["T19", "T12", "D20"], ["T17", "T16", "T10"]],
-    132: [["T20", "T16", "D12"], ["T20", "T20", "D6"], ["T19", "T15", "T10"]],
-    131: [["T20", "T13", "D16"], ["T19", "T14", "D15"], ["T17", "T20", "D10"]],
-    130: [["T20", "T20", "T10"], ["T20", "T18", "D8"], ["T19", "T19", "T8"]],
-    129: [["T19", "T16", "T8"], ["T20", "T19", "D6"], ["T17", "T16", "T10"]],
-    128: [["T18", "T14", "T10"], ["T20", "T16", "D10"], ["T19", "T17", "D10"]],
-    127: [["T20", "T17", "D8"], ["T19", "T20", "D5"], ["T18", "T15", "D14"]],
-    126: [["T19", "T19", "D6"], ["T20", "T18", "D6"], ["T16", "T16", "D15"]],
-    125: [["BULL", "T15", "T10"], ["T20", "T15", "D10"], ["T19", "T16", "D10"]],
-    124: [["T20", "T16", "D8"], ["T18", "T18", "D8"], ["T20", "D20", "D12"]],
-    123: [["T20", "T13", "D12"], ["T19", "T16", "D9"], ["T17", "T16", "D10"]],
-    122: [["T18", "T18", "D7"], ["T20", "T14", "D10"], ["T19", "T15", "D10"]],
-    121: [["T20", "T11", "D14"], ["T17", "T10", "D20"], ["T19", "T14", "D10"]],
-    120: [["T20", "T20"], ["T19", "T11", "D15"], ["T18", "T12", "D15"]],
-    119: [["T19", "T10", "D16"], ["T20", "T13", "D10"], ["T17", "T16", "D10"]],
-    118: [["T20", "T16", "D5"], ["T19", "T17", "D5"], ["T18", "T14", "D10"]],
-    117: [["T20", "T19"], ["T17", "T16", "D8"], ["T18", "T15", "D6"]],
-    116: [["T20", "T12", "D10"], ["T19", "T13", "D10"], ["T18", "T14", "D8"]],
-    115: [["T20", "T15", "S10"], ["T19", "T16", "S9"], ["T20", "T13", "S16"]],
-    114: [["T20", "T18"], ["T20", "T14", "D5"], ["T19", "T15", "D5"]],
-    113: [["T19", "T16", "S6"], ["T20", "T13", "S14"], ["T17", "T14", "S10"]],
-    112: [["T20", "T12", "D8"], ["T18", "T16", "D5"], ["T20", "D16", "D10"]],
-    111: [["T20", "T17"], ["T19", "T18"], ["T17", "T20"]],
-    110: [["T20", "T10", "D10"], ["T19", "T17", "S2"], ["T18", "T16", "D4"]],
-    109: [["T19", "T12", "S16"], ["T20", "T13", "S10"], ["T17", "T14", "S16"]],
-    108: [["T20", "T16"], ["T18", "T18"], ["T20", "D24"]],
-    107: [["T19", "T10", "D10"], ["T20", "T15", "S2"], ["T17", "T16", "S5"]],
-    106: [["T20", "T10", "D8"], ["T19", "T13", "S10"], ["T18", "T12", "D8"]],
-    105: [["T20", "T15"], ["T19", "T16"], ["T15", "T20"]],
-    104: [["T20", "T12", "S8"], ["T18", "T10", "D10"], ["T16", "T16", "S8"]],
-    103: [["T19", "T10", "D8"], ["T20", "T11", "S10"], ["T17", "T12", "S10"]],
-    102: [["T20", "T14"], ["T18", "T16"], ["T17", "T17"]],
-    101: [["T20", "T11", "S8"], ["T19", "T12", "S8"], ["T17", "T10", "D10"]],
-    100: [["T20", "D20"], ["T19", "T11", "D5"], ["T18", "T12", "D5"]],
-    99: [["T19", "T14"], ["T17", "T16"], ["T20", "T13"]],
-    98: [["T20", "T10", "D4"], ["T18", "T10", "D5"], ["T16", "T16", "S2"]],
-    97: [["T19", "T10", "S10"], ["T17", "T10", "D5"], ["T20", "T11", "S4"]],
-    96: [["T20", "T12"], ["T18", "T14"], ["T16", "T16"]],
-    95: [["T19", "T12", "S2"], ["T20", "T11", "S2"], ["T17", "T12", "S8"]],
-    94: [["T18", "T10", "D5"], ["T20", "S14", "D10"], ["T16", "T14", "S2"]],
-    93: [["T19", "T12"], ["T20", "T11"], ["T17", "T14"]],
-    92: [["T20", "D16"], ["T18", "S18", "D10"], ["T16", "T12", "S12"]],
-    91: [["T17", "T10", "S10"], ["T19", "S14", "D10"], ["T20", "S11", "D10"]],
-    90: [["T20", "D15"], ["T18", "D18"], ["T15", "T15"]],
-    89: [["T19", "T10", "S2"], ["T20", "S9", "D10"], ["T17", "S18", "D10"]],
-    88: [["T20", "D14"], ["T16", "D20"], ["T12", "T12", "T8"]],
-    87: [["T19", "T10"], ["T17", "T12"], ["T15", "T14"]],
-    86: [["T18", "D16"], ["T20", "D13"], ["T14", "T14", "D15"]],
-    85: [["T15", "T10", "S10"], ["T20", "S5", "D20"], ["T19", "S8", "D10"]],
-    84: [["T20", "D12"], ["T16", "D18"], ["T14", "T14"]],
-    83: [["T17", "T10", "S2"], ["T20", "S3", "D20"], ["T19", "S6", "D10"]],
-    82: [["T14", "D20"], ["T10", "D26"], ["BULL", "D16"]],
-    81: [["T19", "D12"], ["T17", "D15"], ["T15", "D18"]],
-    80: [["T20", "D10"], ["T16", "D16"], ["T10", "T10", "T10"]],
-    79: [["T13", "D20"], ["T19", "D11"], ["T17", "S8", "D10"]],
-    78: [["T18", "D12"], ["T16", "D15"], ["T14", "T12"]],
-    77: [["T19", "D10"], ["T15", "D16"], ["T17", "D13"]],
-    76: [["T20", "D8"], ["T16", "D14"], ["T12", "D20"]],
-    75: [["T17", "D12"], ["T15", "D15"], ["T13", "D18"]],
-    74: [["T14", "D16"], ["T18", "D10"], ["T10", "D22"]],
-    73: [["T19", "D8"], ["T15", "D14"], ["T13", "D17"]],
-    72: [["T12", "D18"], ["T16", "D12"], ["T20", "D6"]],
-    71: [["T13", "D16"], ["T17", "D10"], ["T11", "D20"]],
-    70: [["T20", "D5"], ["T10", "D20"], ["T14", "D14"]],
-    69: [["T19", "D6"], ["T11", "D18"], ["T15", "D12"]],
-    68: [["T20", "D4"], ["T16", "D10"], ["T12", "D16"]],
-    67: [["T17", "D8"], ["T19", "D5"], ["T9", "D20"]],
-    66: [["T12", "D15"], ["T10", "D18"], ["T14", "D12"]],
-    65: [["T15", "D10"], ["T19", "D4"], ["T11", "D16"]],
-    64: [["T16", "D8"], ["T12", "D14"], ["T10", "D17"]],
-    63: [["T13", "D12"], ["T17", "D6"], ["T11", "D15"]],
-    62: [["T10", "D16"], ["T14", "D10"], ["T12", "D13"]],
-    61: [["T15", "D8"], ["T11", "D14"], ["T13", "D11"]],
-    60: [["T20"], ["D15", "D15"], ["S20", "D20"]],
-    59: [["S19", "D20"], ["S11", "T16"], ["S9", "BULL"]],
-    58: [["S18", "D20"], ["D19", "D10"], ["S8", "BULL"]],
-    57: [["T19"], ["S17", "D20"], ["D18", "D10.5"]],
-    56: [["T12", "D10"], ["S16", "D20"], ["D18", "D10"]],
-    55: [["S15", "D20"], ["S19", "D18"], ["S7", "BULL"]],
-    54: [["T18"], ["S14", "D20"], ["D17", "D10"]],
-    53: [["S13", "D20"], ["S17", "D18"], ["S3", "BULL"]],
-    52: [["T14", "D5"], ["S12", "D20"], ["D16", "D10"]],
-    51: [["T17"], ["S11", "D20"], ["D15", "D10.5"]],
-    50: [["BULL"], ["D15", "D10"], ["S10", "D20"]],
-    49: [["S9", "D20"], ["S17", "D16"], ["S1", "BULL"]],
-    48: [["T16"], ["D14", "D10"], ["S16", "D16"]],
-    47: [["S7", "D20"], ["S15", "D16"], ["S11", "D18"]],
-    46: [["D13", "D10"], ["S14", "D16"], ["S6", "D20"]],
-    45: [["T15"], ["D12", "D10.5"], ["S13", "D16"]],
-    44: [["D12", "D10"], ["S12", "D16"], ["S4", "D20"]],
-    43: [["S11", "D16"], ["S3", "D20"], ["S7", "D18"]],
-    42: [["T14"], ["D11", "D10"], ["S10", "D16"]],
-    41: [["S9", "D16"], ["S1", "D20"], ["S5", "D18"]],
-    40: [["D20"], ["S20", "D10"], ["D10", "D10"]],
-    39: [["T13"], ["S19", "D10"], ["S7", "D16"]],
-    38: [["D19"], ["S18", "D10"], ["D10", "D9"]],
-    37: [["S17", "D10"], ["S5", "D16"], ["S1", "D18"]],
-    36: [["T12"], ["D18"], ["S16", "D10"]],
-    35: [["S15", "D10"], ["S3", "D16"], ["S19", "D8"]],
-    34: [["D17"], ["S14", "D10"], ["D10", "D7"]],
-    33: [["T11"], ["S13", "D10"], ["S1", "D16"]],
-    32: [["D16"], ["S12", "D10"], ["D8", "D8"]],
-    31: [["S11", "D10"], ["S15", "D8"], ["S7", "D12"]],
-    30: [["T10"], ["D15"], ["S10", "D10"]],
-    29: [["S9", "D10"], ["S13", "D8"], ["S5", "D12"]],
-    28: [["D14"], ["S8", "D10"], ["D7", "D7"]],
-    27: [["T9"], ["S7", "D10"], ["S11", "D8"]],
-    26: [["D13"], ["S6", "D10"], ["D10", "D3"]],
-    25: [["S9", "D8"], ["S5", "D10"], ["S1", "D12"]],
-    24: [["T8"], ["D12"], ["S4", "D10"]],
-    23: [["S7", "D8"], ["S3", "D10"], ["S15", "D4"]],
-    22: [["D11"], ["S2", "D10"], ["D6", "D5"]],
-    21: [["T7"], ["S5", "D8"], ["S1", "D10"]],
-    20: [["D10"], ["S10", "D5"], ["D5", "D5"]],
-    19: [["S3", "D8"], ["S11", "D4"], ["S7", "D6"]],
-    18: [["T6"], ["D9"], ["S2", "D8"]],
-    17: [["S1", "D8"], ["S9", "D4"], ["S5", "D6"]],
-    16: [["D8"], ["S8", "D4"], ["D4", "D4"]],
-    15: [["T5"], ["S7", "D4"], ["S5", "D5"]],
-    14: [["D7"], ["S6", "D4"], ["D4", "D3"]],
-    13: [["S5", "D4"], ["S9", "D2"], ["S1", "D6"]],
-    12: [["T4"], ["D6"], ["S4", "D4"]],
-    11: [["S3", "D4"], ["S7", "D2"], ["S1", "D5"]],
-    10: [["D5"], ["S2", "D4"], ["D3", "D2"]],
-    9: [["T3"], ["S5", "D2"], ["S1", "D4"]],
-    8: [["D4"], ["S4", "D2"], ["D2", "D2"]],
-    7: [["S3", "D2"], ["S5", "D1"], ["S1", "D3"]],
-    6: [["T2"], ["D3"], ["S2", "D2"]],
-    5: [["S1", "D2"], ["S3", "D1"], ["S5", "D0"]],
-    4: [["D2"], ["S2", "D1"], ["D1", "D1"]],
-    3: [["T1"], ["S1", "D1"], ["S2", "D0.5"]],
-    2: [["D1"], ["S1", "S1"], ["S2", "D0"]]
-}
\ No newline at end of file
+try:
+    from games.checkout_engine import checkout_routes, format_route
+except ImportError:
+    from .checkout_engine import checkout_routes, format_route
+
+def get_m_checkouts(score, darts=3):
+    """Bis zu 3 Checkwege als Text ("T20 - T20 - Bull"), darts: übrige Pfeile der Aufnahme."""
+    return [format_route(r) for r in checkout_routes(score, "Master Out", darts)[:3]]
@@ -1,6 +1,10 @@
 import pygame
 import os
 import sys
+import time
+from array import array
+from collections import OrderedDict
+from ui_render import Renderer
 
 # --- EXE-Pfad-Korrektur für Ressourcen ---
 def resource_path(relative_path):
@@ -13,17 +17,100 @@ def resource_path(relative_path):
 
 # EXE-kompatibler Import der Checkouts
 try:
-    from games.d_checkouts import get_d_checkouts
+    from games.checkout_engine import checkout_routes, format_route
 except ImportError:
     try:
-        from .d_checkouts import get_d_checkouts
+        from .checkout_engine import checkout_routes, format_route
     except ImportError:
-        def get_d_checkouts(score): return [] # Fallback falls Datei fehlt
+        def checkout_routes(score, out_mode="Double Out", darts=3): return [] # Fallback falls Datei fehlt
+        def format_route(route): return " - ".join(route)
+
+# Flags eines Wurfs im ThrowLog
+ACTIVE_IN_BEFORE = 1 # Spieler war vor dem Wurf schon "drin" (Double In)
+REACHED_170 = 2      # Wurf hat den Score erstmals im Leg auf <= 170 gebracht (zählt in ø to 170)
+
+class ThrowLog:
+    """Wurf-Historie eines Spielers für undo_last_throw: Ringpuffer aus festen Typ-Arrays statt
+    einem Dict pro Wurf. Pro Wurf steht drin, was er an den Summen des Spielers geändert hat,
+    undo zieht genau das wieder ab. Ist der Puffer voll, fällt der älteste Wurf heraus
+    (so weit zurück geht undo nicht), der Speicher bleibt über beliebig lange Sessions gleich."""
+    def __init__(self, capacity=96):
+        self.capacity = capacity
+        self.score_before = array("h", [0]) * capacity
+        self.points = array("h", [0]) * capacity     # zu points_total addiert
+        self.darts = array("b", [0]) * capacity      # zu darts_total addiert (Bust: Rest der Aufnahme)
+        self.f9_points = array("h", [0]) * capacity
+        self.f9_darts = array("b", [0]) * capacity
+        self.avg_170 = array("d", [0.0]) * capacity  # zu avg_170_sum addiert
+        self.flags = array("B", [0]) * capacity
+        self.end = 0   # nächster freier Platz
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, score_before, flags):
+        """Neuer Eintrag (Summen-Änderungen 0, setzt der Aufrufer). Gibt den Platz zurück."""
+        i = self.end
+        self.score_before[i] = score_before
+        self.flags[i] = flags
+        self.points[i] = self.darts[i] = self.f9_points[i] = self.f9_darts[i] = 0
+        self.avg_170[i] = 0.0
+        self.end = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return i
+
+    def pop(self):
+        """Platz des letzten Eintrags (bis zum nächsten push gültig), None wenn leer."""
+        if not self.count: return None
+        self.end = (self.end - 1) % self.capacity
+        self.count -= 1
+        return self.end
+
+    def clear(self):
+        self.count = 0
+
+class X01Player:
+    """Zustand eines Spielers mit festen Feldern (__slots__). Die Summen werden pro Wurf
+    fortgeschrieben, die Durchschnitte sind daraus in O(1) berechnet."""
+    __slots__ = ("name", "score", "active_in", "legs", "sets",
+                 "darts_total", "points_total", "first_9_points", "first_9_darts",
+                 "avg_170_sum", "avg_170_count", "reached_170_this_leg", "visit", "history")
+
+    def __init__(self, name, score, active_in):
+        self.name = name
+        self.score = score
+        self.active_in = active_in
+        self.legs = self.sets = 0
+        self.darts_total = self.points_total = 0
+        self.first_9_points = self.first_9_darts = 0
+        self.avg_170_sum, self.avg_170_count = 0.0, 0
+        self.reached_170_this_leg = False
+        self.visit = [] # Punkte der laufenden Aufnahme (max. 3, wird geleert statt neu angelegt)
+        self.history = ThrowLog()
+
+    @property
+    def avg_3(self):
+        return (self.points_total / (self.darts_total / 3)) if self.darts_total > 0 else 0.0
+
+    @property
+    def first_9_avg(self):
+        return (self.first_9_points / (self.first_9_darts / 3)) if self.first_9_darts > 0 else 0.0
+
+    @property
+    def avg_170(self):
+        return (self.avg_170_sum / self.avg_170_count) if self.avg_170_count > 0 else 0.0
 
 class X01Game:
-    def __init__(self, screen, config, player_names=None):
+    # Gerenderte Checkwege für so viele (Score, Out-Modus, Pfeile)-Kombinationen:
+    # alle Scores bis 170 mit 1, 2 und 3 übrigen Pfeilen (der Out-Modus ist pro Spiel fest)
+    CHECKOUT_CACHE_SIZE = 3 * 170
+
+    def __init__(self, screen, config, player_names=None, ui=None):
         self.screen = screen
         self.config = config
+        # Zeichnet nur geänderte Bereiche (ui_render), der Besitzer ruft ui.present() auf
+        self.ui = ui if ui is not None else Renderer(screen)
         
         # Fonts - Größen-Anpassung
         self.font_big_score = pygame.font.SysFont("Impact", 220) 
@@ -33,38 +120,35 @@ class X01Game:
         
         self.font_co_title = pygame.font.SysFont("Arial", 70, bold=True) 
         self.font_co = pygame.font.SysFont("Arial", 63, bold=True)      
+        self.checkout_cache = OrderedDict()
         
         self.font_msg = pygame.font.SysFont("Arial", 42, bold=True) # Angepasst für kleine Box
         self.font_bust = pygame.font.SysFont("Arial", 60, bold=True)
+        self.font_hint = pygame.font.SysFont("Arial", 24, bold=True)
         
         self.players = []
         names = player_names if player_names else [f"P{i+1}" for i in range(config["player_count"])]
 
         for name in names:
-            self.players.append({
-                "name": name, 
-                "score": config["start_score"],
-                "active_in": (config["in_mode"] == "Single In"),
-                "legs": 0, "sets": 0,
-                "darts_total": 0, "points_total": 0,
-                "first_9_points": 0, "first_9_darts": 0,
-                "avg_170_sum": 0, "avg_170_count": 0,
-                "reached_170_this_leg": False,
-                "visit": [], "history": [] 
-            })
+            self.players.append(X01Player(name, config["start_score"], config["in_mode"] == "Single In"))
             
         self.current_idx = 0
         self.waiting_for_remove = False
         self.is_bust = False
+        
+        # Latenzmessung: Zeitstempel der Kamera-Treffer, bis draw() sie zum ersten Mal zeigt
+        self.pending_timings = []
+        self.on_rendered = None
 
     def reset_current_throw(self):
         """Wird aufgerufen, wenn die Kamera erkannt hat, dass die Pfeile gezogen wurden"""
         if self.waiting_for_remove:
             self.confirm_remove()
 
-    def handle_throw(self, val, mult):
-        """ Verarbeitet einen Wurf von Kamera oder Tastatur """
+    def handle_throw(self, val, mult, timing=None):
+        """ Verarbeitet einen Wurf von Kamera oder Tastatur (timing: Zeitstempel des Kamera-Treffers) """
         if self.waiting_for_remove: return
+        if timing is not None: self.pending_timings.append(timing)
         
         try: 
             val, mult = int(val), int(mult)
@@ -74,29 +158,26 @@ class X01Game:
         p = self.players[self.current_idx]
         pts = val * mult
         
-        p["history"].append({
-            "score_before": p["score"], 
-            "pts": pts, 
-            "active_in_before": p["active_in"], 
-            "f9_valid": (p["darts_total"] < 9), 
-            "was_170_check": p["reached_170_this_leg"]
-        })
+        # Wurf protokollieren; was er an den Summen ändert, wird unten mitgeschrieben
+        log = p.history
+        i = log.push(p.score, ACTIVE_IN_BEFORE if p.active_in else 0)
         
-        if not p["active_in"]:
+        if not p.active_in:
             if (self.config["in_mode"] == "Double In" and mult == 2) or self.config["in_mode"] == "Single In": 
-                p["active_in"] = True
+                p.active_in = True
             else:
-                p["visit"].append(0)
-                p["darts_total"] += 1
+                p.visit.append(0)
+                p.darts_total += 1
+                log.darts[i] = 1
                 self.check_end_visit(p)
                 return
         
         # 🚀 HIER: Verarbeitung von Missed Feldern (val=0)
         if val == 0:
-            target = p["score"] # Keine Punkte
+            target = p.score # Keine Punkte
             bust = False
         else:
-            target = p["score"] - pts
+            target = p.score - pts
             bust = False
             
             if target < 0: 
@@ -109,52 +190,60 @@ class X01Game:
         
         if bust:
             self.is_bust = True
-            p["visit"].append(pts)
-            remaining_darts = 3 - len(p["visit"])
-            p["darts_total"] += (remaining_darts + 1)
+            p.visit.append(pts)
+            remaining_darts = 3 - len(p.visit)
+            p.darts_total += (remaining_darts + 1)
+            log.darts[i] = remaining_darts + 1
             self.waiting_for_remove = True
         else:
-            p["score"] = target
-            p["points_total"] += pts
-            if p["darts_total"] < 9: 
-                p["first_9_points"] += pts
-                p["first_9_darts"] += 1
-            p["darts_total"] += 1
-            p["visit"].append(pts)
+            p.score = target
+            p.points_total += pts
+            log.points[i] = pts
+            if p.darts_total < 9: 
+                p.first_9_points += pts
+                p.first_9_darts += 1
+                log.f9_points[i], log.f9_darts[i] = pts, 1
+            p.darts_total += 1
+            log.darts[i] = 1
+            p.visit.append(pts)
             
-            if p["score"] <= 170 and not p["reached_170_this_leg"]:
-                c_avg = (p["points_total"] / (p["darts_total"] / 3)) if p["darts_total"] > 0 else 0
-                p["avg_170_sum"] += c_avg
-                p["avg_170_count"] += 1
-                p["reached_170_this_leg"] = True
+            if p.score <= 170 and not p.reached_170_this_leg:
+                c_avg = p.avg_3
+                p.avg_170_sum += c_avg
+                p.avg_170_count += 1
+                p.reached_170_this_leg = True
+                log.avg_170[i] = c_avg
+                log.flags[i] |= REACHED_170
             
-            if p["score"] == 0: 
+            if p.score == 0: 
                 self.process_leg_win(p)
             else: 
                 self.check_end_visit(p)
 
     def undo_last_throw(self):
         p = self.players[self.current_idx]
-        if not p["history"]: return
-        last = p["history"].pop()
+        log = p.history
+        i = log.pop()
+        if i is None: return
         self.is_bust = False
         
-        if p["reached_170_this_leg"] and not last["was_170_check"]:
-            if p["avg_170_count"] > 0: p["avg_170_count"] -= 1
-            p["reached_170_this_leg"] = False
+        # Genau das abziehen, was der Wurf addiert hat (auch bei Bust und vor dem Double In)
+        if log.flags[i] & REACHED_170:
+            p.avg_170_sum -= log.avg_170[i]
+            p.avg_170_count -= 1
+            p.reached_170_this_leg = False
             
-        p["score"] = last["score_before"]
-        p["active_in"] = last["active_in_before"]
-        if p["visit"]: p["visit"].pop()
-        p["points_total"] -= last["pts"]
-        if last["f9_valid"]: 
-            p["first_9_points"] -= last["pts"]
-            p["first_9_darts"] -= 1
-        p["darts_total"] = max(0, p["darts_total"] - 1)
+        p.score = log.score_before[i]
+        p.active_in = bool(log.flags[i] & ACTIVE_IN_BEFORE)
+        if p.visit: p.visit.pop()
+        p.points_total -= log.points[i]
+        p.first_9_points -= log.f9_points[i]
+        p.first_9_darts -= log.f9_darts[i]
+        p.darts_total -= log.darts[i]
         self.waiting_for_remove = False
 
     def check_end_visit(self, p):
-        if len(p["visit"]) == 3: 
+        if len(p.visit) == 3: 
             self.waiting_for_remove = True
 
     def confirm_remove(self):
@@ -163,7 +252,7 @@ class X01Game:
             p = self.players[self.current_idx]
             
             # 1. Aufnahme des aktuellen Spielers zurücksetzen
-            p["visit"] = []
+            p.visit.clear()
             
             # 2. Zum nächsten Spieler wechseln.
             self.current_idx = (self.current_idx + 1) % len(self.players)
@@ -173,76 +262,165 @@ class X01Game:
             self.is_bust = False # Bust Status zurücksetzen
 
     def process_leg_win(self, winner):
-        winner["legs"] += 1
-        if not self.config["endlos"] and winner["legs"] >= self.config["legs_to_win"]:
-            winner["sets"] += 1
-            for pl in self.players: pl["legs"] = 0
+        winner.legs += 1
+        if not self.config["endlos"] and winner.legs >= self.config["legs_to_win"]:
+            winner.sets += 1
+            for pl in self.players: pl.legs = 0
             
         for pl in self.players:
-            pl["score"] = self.config["start_score"]
-            pl["active_in"] = (self.config["in_mode"] == "Single In")
-            pl["visit"], pl["reached_170_this_leg"] = [], False
-            pl["history"] = []
+            pl.score = self.config["start_score"]
+            pl.active_in = (self.config["in_mode"] == "Single In")
+            pl.visit.clear()
+            pl.reached_170_this_leg = False
+            pl.history.clear()
             
         self.waiting_for_remove = True
 
+    def checkout_surfaces(self, score, darts):
+        """Checkwege als fertige Text-Surfaces pro (Score, Out-Modus, übrige Pfeile der Aufnahme).
+        draw() läuft mit 60 FPS, der Score ändert sich nur ein paar Mal pro Minute -> einmal rendern."""
+        key = (score, self.config["out_mode"], darts)
+        surfaces = self.checkout_cache.get(key)
+        if surfaces is not None:
+            self.checkout_cache.move_to_end(key)
+            return surfaces
+        ways = checkout_routes(score, self.config["out_mode"], darts)[:3]
+        surfaces = [self.font_co.render(f"Weg {i+1}: {format_route(w)}", True, (255, 255, 255)) for i, w in enumerate(ways)]
+        self.checkout_cache[key] = surfaces
+        if len(self.checkout_cache) > self.CHECKOUT_CACHE_SIZE: self.checkout_cache.popitem(last=False)
+        return surfaces
+
     def draw(self):
-        self.screen.fill((10, 15, 25))
+        self.ui.clear((10, 15, 25))
         p = self.players[self.current_idx]
         
         # Hauptfeld
-        pygame.draw.rect(self.screen, (25, 40, 70), (50, 40, 1040, 620), border_radius=30)
-        self.screen.blit(self.font_player_name.render(p["name"], True, (255, 255, 255)), (100, 60))
-        score_surf = self.font_big_score.render(str(p["score"]), True, (255, 255, 0))
-        self.screen.blit(score_surf, (100, 140))
+        self.ui.rect((25, 40, 70), (50, 40, 1040, 620), border_radius=30)
+        self.ui.text(self.font_player_name, p.name, (255, 255, 255), (100, 60))
+        score_surf = self.ui.text_surface(self.font_big_score, str(p.score), (255, 255, 0))
+        self.ui.blit(score_surf, (100, 140))
         
         if self.is_bust:
-            self.screen.blit(self.font_bust.render("BUST!", True, (255, 50, 50)), (100, 390))
+            self.ui.text(self.font_bust, "BUST!", (255, 50, 50), (100, 390))
         else:
-            v_txt = "  ".join([str(x) for x in p["visit"]])
-            self.screen.blit(self.font_info.render(f"Aufnahme: {v_txt}", True, (0, 255, 150)), (100, 390))
-        
-        # Stats
-        avg_3 = (p["points_total"] / (p["darts_total"] / 3)) if p["darts_total"] > 0 else 0.0
-        f9_avg = (p["first_9_points"] / (p["first_9_darts"] / 3)) if p["first_9_darts"] > 0 else 0.0
-        avg_170 = (p["avg_170_sum"] / p["avg_170_count"]) if p["avg_170_count"] > 0 else 0.0
+            v_txt = "  ".join([str(x) for x in p.visit])
+            self.ui.text(self.font_info, f"Aufnahme: {v_txt}", (0, 255, 150), (100, 390))
         
+        # Stats (laufende Summen aus X01Player)
         sy, lh = 460, 50
-        self.screen.blit(self.font_info.render(f"ø Gesamt: {avg_3:.2f}", True, (200, 200, 200)), (100, sy))
-        self.screen.blit(self.font_info.render(f"ø First 9: {f9_avg:.2f}", True, (200, 200, 200)), (100, sy + lh))
-        self.screen.blit(self.font_info.render(f"ø to 170: {avg_170:.2f}", True, (0, 200, 255)), (100, sy + lh * 2))
-        self.screen.blit(self.font_info.render(f"Darts: {p['darts_total']}", True, (150, 150, 150)), (850, 590))
+        self.ui.text(self.font_info, f"ø Gesamt: {p.avg_3:.2f}", (200, 200, 200), (100, sy))
+        self.ui.text(self.font_info, f"ø First 9: {p.first_9_avg:.2f}", (200, 200, 200), (100, sy + lh))
+        self.ui.text(self.font_info, f"ø to 170: {p.avg_170:.2f}", (0, 200, 255), (100, sy + lh * 2))
+        self.ui.text(self.font_info, f"Darts: {p.darts_total}", (150, 150, 150), (850, 590))
         
         # Spielerliste rechts
-        pygame.draw.rect(self.screen, (20, 25, 40), (1140, 40, 730, 620), border_radius=20)
+        self.ui.rect((20, 25, 40), (1140, 40, 730, 620), border_radius=20)
         for i, pl in enumerate(self.players):
             y = 70 + i * 75
             c = (255, 255, 255) if i == self.current_idx else (100, 100, 110)
-            l_avg = (pl["points_total"] / (pl["darts_total"] / 3)) if pl["darts_total"] > 0 else 0.0
-            suffix = f"L:{pl['legs']}" if self.config["endlos"] else f"L:{pl['legs']} S:{pl['sets']}"
-            txt = f"{pl['name']}: {pl['score']} (ø {l_avg:.1f}) | {suffix}"
-            self.screen.blit(self.font_list.render(txt, True, c), (1170, y))
-
-        # Checkout-Bereich
-        if p["score"] <= 170:
-            ways = get_d_checkouts(p["score"])
-            if ways:
-                pygame.draw.rect(self.screen, (10, 50, 90), (50, 680, 1820, 380), border_radius=20)
-                self.screen.blit(self.font_co_title.render("Mögliche Checkwege:", True, (0, 255, 255)), (100, 700))
-                for i, w in enumerate(ways[:3]):
-                    self.screen.blit(self.font_co.render(f"Weg {i+1}: {w}", True, (255, 255, 255)), (100, 800 + i * 85))
+            suffix = f"L:{pl.legs}" if self.config["endlos"] else f"L:{pl.legs} S:{pl.sets}"
+            txt = f"{pl.name}: {pl.score} (ø {pl.avg_3:.1f}) | {suffix}"
+            self.ui.text(self.font_list, txt, c, (1170, y))
+
+        # Checkout-Bereich (Wege mit den übrigen Pfeilen der Aufnahme, ist sie vorbei wieder mit 3)
+        darts_left = 3 if self.waiting_for_remove else 3 - len(p.visit)
+        ways = self.checkout_surfaces(p.score, darts_left) if p.score <= 170 else []
+        if ways:
+            self.ui.rect((10, 50, 90), (50, 680, 1820, 380), border_radius=20)
+            self.ui.text(self.font_co_title, "Mögliche Checkwege:", (0, 255, 255), (100, 700))
+            for i, surf in enumerate(ways):
+                self.ui.blit(surf, (100, 800 + i * 85))
 
         # --- KLEINES HINWEISFELD RECHTS UNTEN ---
         if self.waiting_for_remove:
             # Hintergrund-Box (Rot)
             msg_rect = pygame.Rect(1420, 950, 450, 100)
-            pygame.draw.rect(self.screen, (180, 0, 0), msg_rect, border_radius=15)
-            pygame.draw.rect(self.screen, (255, 255, 255), msg_rect, width=3, border_radius=15)
+            self.ui.rect((180, 0, 0), msg_rect, border_radius=15)
+            self.ui.rect((255, 255, 255), msg_rect, width=3, border_radius=15)
             
             # Texte
-            t1 = self.font_msg.render("PFEILE ZIEHEN!", True, (255, 255, 255))
-            t2 = pygame.font.SysFont("Arial", 24, bold=True).render("[BACKSPACE] ZUM BESTÄTIGEN", True, (255, 255, 255))
+            t1 = self.ui.text_surface(self.font_msg, "PFEILE ZIEHEN!", (255, 255, 255))
+            t2 = self.ui.text_surface(self.font_hint, "[BACKSPACE] ZUM BESTÄTIGEN", (255, 255, 255))
             
             # Positionierung in der Box
-            self.screen.blit(t1, (msg_rect.centerx - t1.get_width()//2, msg_rect.y + 15))
-            self.screen.blit(t2, (msg_rect.centerx - t2.get_width()//2, msg_rect.y + 60))
\ No newline at end of file
+            self.ui.blit(t1, (msg_rect.centerx - t1.get_width()//2, msg_rect.y + 15))
+            self.ui.blit(t2, (msg_rect.centerx - t2.get_width()//2, msg_rect.y + 60))
+        
+        # Neue Treffer sind jetzt gezeichnet
+        if self.pending_timings:
+            now = time.time()
+            for timing in self.pending_timings:
+                timing["render"] = now
+                if self.on_rendered: self.on_rendered(timing)
+            self.pending_timings = []
+
+# --- SELBSTTEST ---
+
+def self_test():
+    """undo_last_throw gegen ein Spiel, in dem die zurückgenommenen Würfe nie geworfen wurden:
+    über einen Bust, über ein gewonnenes Leg und über den Überlauf des ThrowLog hinaus."""
+    pygame.font.init()
+    screen = pygame.Surface((1920, 1080))
+    config = {"start_score": 301, "in_mode": "Single In", "out_mode": "Double Out",
+              "player_count": 1, "endlos": True, "legs_to_win": 3}
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    def play(actions):
+        # Aktionen: (Wert, Multiplikator) oder "remove" (Pfeile gezogen)
+        game = X01Game(screen, config, ["A"])
+        for a in actions:
+            if a == "remove": game.confirm_remove()
+            else: game.handle_throw(*a)
+        return game
+
+    def stats(game):
+        p = game.players[0]
+        return (p.score, p.darts_total, round(p.avg_3, 9), round(p.first_9_avg, 9), round(p.avg_170, 9),
+                p.avg_170_count, p.reached_170_this_leg, p.active_in)
+
+    def undo_matches(name, actions, undos, kept):
+        # Nach `undos` Mal Undo muss das Spiel aussehen wie eins mit den ersten `kept` Aktionen
+        game = play(actions)
+        for _ in range(undos): game.undo_last_throw()
+        check(name, stats(game) == stats(play(actions[:kept])))
+
+    T20, D20, MISS = (20, 3), (20, 2), (0, 1)
+    visit = [T20, T20, T20, "remove"]
+    # 301 -> 241 -> 181 -> 121 (erstmals <= 170) | 61 -> 1: Bust
+    bust = visit + [T20, T20]
+    undo_matches("Undo des Bust-Wurfs", bust, 1, 5)
+    undo_matches("Undo über den Bust hinaus", bust, 2, 4)
+    undo_matches("Undo bis vor das Erreichen von 170", bust, 3, 2)
+
+    # Leg 1: 301 -> 121 | 76 -> 16 -> D8 | Leg 2: 301 -> 121 (zweites ø to 170)
+    leg = visit + [(15, 3), T20, (8, 2), "remove"] + visit[:3]
+    game = play(leg)
+    check("Leg gewonnen, zweites ø to 170", game.players[0].legs == 1 and game.players[0].avg_170_count == 2)
+    undo_matches("Undo im zweiten Leg", leg, 1, len(leg) - 1)
+    undo_matches("Undo bis zum Leg-Anfang", leg, 3, len(leg) - 3)
+    # Das Leg ist abgeschlossen, weiter zurück geht undo nicht
+    undo_matches("Undo über das Leg hinaus", leg, 5, len(leg) - 3)
+
+    # Überlauf: 9 Punkte-Pfeile (First 9), 80 Fehlwürfe, 170 erreicht, 30 Fehlwürfe
+    actions = []
+    def darts(throws):
+        for t in throws:
+            actions.append(t)
+            if sum(1 for a in reversed(actions) if a != "remove") % 3 == 0: actions.append("remove")
+    darts([(5, 1)] * 9 + [MISS] * 80 + [T20, T20, D20] + [MISS] * 30)
+    thrown = [i for i, a in enumerate(actions) if a != "remove"]
+    capacity = X01Player("", 0, True).history.capacity
+    check("mehr Würfe als der ThrowLog fasst", len(thrown) > capacity)
+    # Undo bis zum ältesten gespeicherten Wurf; ein Wurf davor bleibt stehen, weitere Undos ändern nichts
+    oldest = thrown[len(thrown) - capacity]
+    undo_matches(f"{capacity} Undos über den Überlauf", actions, capacity, oldest)
+    undo_matches(f"{capacity + 5} Undos (Puffer leer)", actions, capacity + 5, oldest)
+    undo_matches("Undo bis vor das Erreichen von 170 (nach Überlauf)", actions, 31, thrown[-31])
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if self_test() else 1)
@@ -0,0 +1,80 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# Abschnitte der Treffer-Latenz: (Name, von, bis). Zeitstempel kommen aus dem "timing"-Dict der Treffer.
+SEGMENTS = (
+    ("Kamera -> Detektion", "capture", "detect"),
+    ("Detektion -> Fusion", "detect", "fusion"),
+    ("Fusion -> Queue", "fusion", "dequeue"),
+    ("Queue -> Anzeige", "dequeue", "render"),
+    ("Gesamt", "capture", "render"),
+)
+
+class LatencyStats:
+    """Rollierende Statistik der letzten `window` Treffer, pro Abschnitt als Histogramm (ms)."""
+    def __init__(self, window=200, bin_ms=10, max_ms=500):
+        self.window = window
+        self.bins = np.arange(0, max_ms + bin_ms, bin_ms)
+        self.samples = {name: deque(maxlen=window) for name, _, _ in SEGMENTS}
+        self.timings = deque(maxlen=window)
+
+    def add(self, timing):
+        """Ein Treffer mit Zeitstempeln (Sekunden, time.time()). Fehlende Abschnitte werden übersprungen."""
+        self.timings.append(dict(timing))
+        for name, start, end in SEGMENTS:
+            if timing.get(start) is not None and timing.get(end) is not None:
+                self.samples[name].append((timing[end] - timing[start]) * 1000)
+
+    def histogram(self, name):
+        """Anzahl pro Bin; alles über max_ms landet im letzten Bin."""
+        values = np.clip(np.asarray(self.samples[name], dtype=np.float64), 0, self.bins[-1] - 1e-6)
+        return np.histogram(values, self.bins)[0]
+
+    def summary(self):
+        stats = {}
+        for name, _, _ in SEGMENTS:
+            values = self.samples[name]
+            if not values: continue
+            p50, p95 = np.percentile(values, [50, 95])
+            stats[name] = {"n": len(values), "p50": float(p50), "p95": float(p95), "max": float(np.max(values))}
+        return stats
+
+    def export(self, path=None):
+        """Schreibt Zusammenfassung, Histogramme und Rohdaten als JSON. Gibt den Pfad zurück."""
+        if path is None: path = time.strftime("latency_%Y%m%d_%H%M%S.json")
+        data = {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "summary": self.summary(),
+            "bins_ms": self.bins.tolist(),
+            "histograms": {name: self.histogram(name).tolist() for name, _, _ in SEGMENTS if self.samples[name]},
+            "timings": list(self.timings),
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def draw(self, ui, font, x=50, y=50, width=820):
+        """Overlay mit p50/p95 und Mini-Histogramm pro Abschnitt (über den Renderer aus ui_render)."""
+        row_h, bar_h = 70, 40
+        height = 60 + row_h * len(SEGMENTS)
+        ui.rect((0, 0, 0, 200), (x, y, width, height))
+        title = f"Treffer-Latenz (letzte {len(self.timings)} Treffer)  [F3] aus  [F4] Export"
+        ui.text(font, title, (0, 220, 255), (x + 15, y + 12))
+
+        stats = self.summary()
+        hist_x, hist_w = x + 450, width - 470
+        for i, (name, _, _) in enumerate(SEGMENTS):
+            ry = y + 55 + i * row_h
+            s = stats.get(name)
+            text = f"{name}: {s['p50']:.0f} / {s['p95']:.0f} ms" if s else f"{name}: -"
+            ui.text(font, text, (255, 255, 255), (x + 15, ry + 10))
+            if not s: continue
+            counts = self.histogram(name)
+            bw = hist_w / len(counts)
+            scale = bar_h / max(counts.max(), 1)
+            for k, c in enumerate(counts):
+                if c: ui.rect((0, 200, 120), (hist_x + k * bw, ry + bar_h + 10 - c * scale, max(1, bw - 1), c * scale))
+            ui.line((120, 120, 120), (hist_x, ry + bar_h + 10), (hist_x + hist_w, ry + bar_h + 10))
@@ -2,6 +2,8 @@ import pygame
 import sys
 import os
 import threading
+import time
+import multiprocessing
 from queue import Queue
 import json
 import calibrate # <--- Importiert die calibrate.py
@@ -25,6 +27,12 @@ from games.x01 import X01Game
 from throw import ThrowSimulator
 from database.database import DatabaseManager
 from vision import DartVisionSystem 
+from vision_sources import FAILED, OPENING, READY
+from latency import LatencyStats
+from ui_render import Renderer
+
+# Weckt die Hauptschleife, wenn die Vision etwas in die hit_queue gelegt hat
+VISION_EVENT = pygame.event.custom_type()
 
 class MainManager:
     def __init__(self):
@@ -34,6 +42,12 @@ class MainManager:
         # --- Update auf Version 1.9.5 (Missed Feld Fix) ---
         pygame.display.set_caption("ProjectDart Pro - Version 1.9.5 (Missed Feld Fix)")
         self.clock = pygame.time.Clock()
+        # Ohne Ereignis schläft die Hauptschleife höchstens so lange (ms). Die Lobby zeigt den
+        # Kamera-Status, der sich ohne eigenes Ereignis ändert -> öfter nachsehen.
+        self.IDLE_WAKEUP = 1000
+        self.LOBBY_WAKEUP = 250
+        # Retained-Mode: Screens beschreiben den Frame, ausgegeben werden nur geänderte Bereiche
+        self.ui = Renderer(self.screen)
         
         # --- FONT INITIALISIERUNG ---
         self.font_title = pygame.font.SysFont("Segoe UI", 100, bold=True)
@@ -47,10 +61,14 @@ class MainManager:
         
         # Kommunikation zwischen Kamera-Thread und Spiel
         self.hit_queue = Queue()
+        # Treffer-Latenz (Kamera -> Anzeige): [F3] anzeigen, [F4] exportieren
+        self.latency = LatencyStats()
+        self.show_latency = False
         
         # --- VISION INITIALISIERUNG ---
         self.vision_system = None
         self.start_vision_thread()
+        self.calibrated_cams = self.check_calibration_status()
         
         self.state = "LOBBY" 
         self.game_instance = None
@@ -74,15 +92,28 @@ class MainManager:
         self.buttons = {}
 
     def start_vision_thread(self):
-        """Initialisiert und startet das Vision System"""
+        """Initialisiert und startet das Vision System. Blockiert nicht: die Kameras öffnen parallel
+        im Hintergrund, ihren Zustand zeigt die Lobby (render_camera_status)."""
         try:
-            self.vision_system = DartVisionSystem(hit_callback=self.hit_queue.put)
+            # --workers: eine Vision-Pipeline pro Kamera in eigenem Prozess (entlastet die UI)
+            use_workers = "--workers" in sys.argv
+            # --debug: Kamera-Debugfenster (5 Hz, eigener Thread), sonst headless
+            show_debug = "--debug" in sys.argv
+            self.vision_system = DartVisionSystem(hit_callback=self.on_vision_item, use_workers=use_workers, show_debug=show_debug)
             self.vision_thread = threading.Thread(target=self.vision_system.run, daemon=True)
             self.vision_thread.start()
             print("[INFO] Kamera-Thread erfolgreich gestartet.")
         except Exception as e:
             print(f"[FEHLER] Vision System konnte nicht geladen werden: {e}")
 
+    def on_vision_item(self, item):
+        """Aus dem Vision-Thread: Treffer/NEXT_PLAYER in die Queue und die Hauptschleife aufwecken."""
+        self.hit_queue.put(item)
+        try:
+            pygame.event.post(pygame.event.Event(VISION_EVENT))
+        except pygame.error:
+            pass # Anzeige schon beendet
+
     def check_calibration_status(self):
         """Prüft anhand der Dateien, ob alle Kameras kalibriert sind."""
         calibrated_cams = 0
@@ -110,23 +141,23 @@ class MainManager:
         if active and action != "NONE" and rect.collidepoint(m_pos):
             curr_col = tuple(min(255, c + 35) for c in color)
         
-        pygame.draw.rect(self.screen, curr_col, rect, border_radius=12)
-        pygame.draw.rect(self.screen, (255, 255, 255), rect, 2, border_radius=12)
+        self.ui.rect(curr_col, rect, border_radius=12)
+        self.ui.rect((255, 255, 255), rect, 2, border_radius=12)
         
         f = self.font_menu_bold if font_type == "bold" else (self.font_kb if font_type == "kb" else self.font_menu)
-        txt_surf = f.render(text, True, (255, 255, 255) if active else (100, 100, 100))
-        self.screen.blit(txt_surf, (x + (w - txt_surf.get_width()) // 2, y + (h - txt_surf.get_height()) // 2))
+        txt_surf = self.ui.text_surface(f, text, (255, 255, 255) if active else (100, 100, 100))
+        self.ui.blit(txt_surf, (x + (w - txt_surf.get_width()) // 2, y + (h - txt_surf.get_height()) // 2))
         
         if action != "NONE" and active:
             self.buttons[action] = rect
 
     def render_lobby(self, m_pos):
         # Titel
-        title = self.font_title.render("SPIEL SETUP", True, (0, 220, 255))
-        self.screen.blit(title, (960 - title.get_width() // 2, 40))
+        title = self.ui.text_surface(self.font_title, "SPIEL SETUP", (0, 220, 255))
+        self.ui.blit(title, (960 - title.get_width() // 2, 40))
         
-        # --- KAMERA STATUS ANZEIGE (DATEIBASIERT) ---
-        calibrated_cams = self.check_calibration_status()
+        # --- KAMERA STATUS ANZEIGE (DATEIBASIERT, gelesen beim Start und nach der Kalibrierung) ---
+        calibrated_cams = self.calibrated_cams
         
         # Hart auf True setzen, falls 3 gefunden wurden
         is_ready = (calibrated_cams == 3)
@@ -134,8 +165,11 @@ class MainManager:
         status_color = (0, 255, 100) if is_ready else (255, 50, 50)
         status_text = "SYSTEM BEREIT" if is_ready else f"KALIBRIERUNG: {calibrated_cams}/3 Kameras"
         
-        status_surf = self.font_status.render(status_text, True, status_color)
-        self.screen.blit(status_surf, (960 - status_surf.get_width() // 2, 160))
+        status_surf = self.ui.text_surface(self.font_status, status_text, status_color)
+        self.ui.blit(status_surf, (960 - status_surf.get_width() // 2, 160))
+
+        # --- KAMERA VERBINDUNG (Öffnen läuft im Hintergrund) ---
+        self.render_camera_status(950, 760)
 
         # --- KALIBRIERUNGS-BUTTON ---
         if not is_ready:
@@ -149,7 +183,7 @@ class MainManager:
             self.draw_button(str(i), x, y, 85, 85, m_pos, f"SET_COUNT_{i}", color=col)
 
         # Virtuelle Tastatur
-        pygame.draw.rect(self.screen, (30, 40, 60), (950, 210, 870, 500), border_radius=20)
+        self.ui.rect((30, 40, 60), (950, 210, 870, 500), border_radius=20)
         for i, char in enumerate(self.kb_chars):
             col, row = i % 9, i // 9
             self.draw_button(char, 980 + col*85, 240 + row*75, 75, 65, m_pos, f"KEY_{char}", color=(60, 65, 90), font_type="kb")
@@ -162,23 +196,34 @@ class MainManager:
                 y_pos = 450 + i * 70
                 box_rect = pygame.Rect(180, y_pos, 450, 55)
                 is_active = (self.active_input_idx == i)
-                pygame.draw.rect(self.screen, (0, 100, 200) if is_active else (30, 40, 60), box_rect, border_radius=10)
-                self.screen.blit(self.font_menu.render(self.selected_names[i], True, (255, 255, 255)), (195, y_pos + 5))
+                self.ui.rect((0, 100, 200) if is_active else (30, 40, 60), box_rect, border_radius=10)
+                self.ui.text(self.font_menu, self.selected_names[i], (255, 255, 255), (195, y_pos + 5))
                 self.buttons[f"FOCUS_{i}"] = box_rect
 
         # Weiter-Button
         ready = self.selected_player_count > 0 and self.selected_names[0].strip() != "" and is_ready
         self.draw_button("WEITER ZUR AUSWAHL", 1320, 920, 500, 100, m_pos, "GO_TO_SELECT", active=ready, color=(0, 150, 70))
 
+    def render_camera_status(self, x, y):
+        """Eine Zeile pro Kamera: verbindet / bereit / Fehler (neuer Versuch läuft automatisch)."""
+        labels = {OPENING: ("verbindet...", (255, 200, 0)), READY: ("bereit", (0, 255, 100)),
+                  FAILED: ("Fehler (neuer Versuch)", (255, 50, 50))}
+        if self.vision_system is None:
+            self.ui.text(self.font_status, "KAMERAS: Vision nicht geladen", (255, 50, 50), (x, y))
+            return
+        for i, (cam_id, status) in enumerate(self.vision_system.camera_status().items()):
+            text, color = labels[status]
+            self.ui.text(self.font_status, f"KAMERA {cam_id}: {text}", color, (x, y + i * 40))
+
     def render_game_select(self, m_pos):
-        title = self.font_title.render("SPIELAUSWAHL", True, (0, 220, 255))
-        self.screen.blit(title, (960 - title.get_width() // 2, 100))
+        title = self.ui.text_surface(self.font_title, "SPIELAUSWAHL", (0, 220, 255))
+        self.ui.blit(title, (960 - title.get_width() // 2, 100))
         self.draw_button("X01 GAME", 760, 450, 400, 120, m_pos, "SELECT_X01", color=(0, 100, 200), font_type="bold")
         self.draw_button("ZURÜCK", 100, 920, 400, 100, m_pos, "GO_TO_LOBBY", color=(100, 20, 20))
 
     def render_settings(self, m_pos):
-        title = self.font_title.render("X01 EINSTELLUNGEN", True, (0, 220, 255))
-        self.screen.blit(title, (960 - title.get_width() // 2, 50))
+        title = self.ui.text_surface(self.font_title, "X01 EINSTELLUNGEN", (0, 220, 255))
+        self.ui.blit(title, (960 - title.get_width() // 2, 50))
         
         self.draw_button("<", 750, 250, 60, 75, m_pos, "DEC_SCORE")
         self.draw_button(f"SCORE: {self.config['start_score']}", 820, 250, 280, 75, m_pos, "NONE")
@@ -219,7 +264,8 @@ class MainManager:
                 elif action == "START_GAME":
                     names = [self.selected_names[i] for i in range(self.selected_player_count)]
                     self.config["player_count"] = self.selected_player_count
-                    self.game_instance = X01Game(self.screen, self.config, player_names=names)
+                    self.game_instance = X01Game(self.screen, self.config, player_names=names, ui=self.ui)
+                    self.game_instance.on_rendered = self.latency.add
                     self.state = "GAME"
                 
                 # --- KALIBRIERUNG DIREKT AUFRUFEN ---
@@ -236,6 +282,8 @@ class MainManager:
                     
                     # 3. Kameras für Vision neu initialisieren
                     self.start_vision_thread()
+                    self.calibrated_cams = self.check_calibration_status()
+                    self.ui.invalidate()
                     print("[SYSTEM] Kalibrierung beendet, Status aktualisiert.")
 
                 elif action.startswith("KEY_"):
@@ -249,6 +297,11 @@ class MainManager:
 
     def run(self):
         while True:
+            # --- 0. SCHLAFEN BIS ETWAS PASSIERT ---
+            # Eingaben, Vision-Treffer (VISION_EVENT) und Fenster-Ereignisse wecken sofort auf,
+            # sonst nach spätestens IDLE_WAKEUP/LOBBY_WAKEUP ms (NOEVENT)
+            timeout = self.LOBBY_WAKEUP if self.state == "LOBBY" else self.IDLE_WAKEUP
+            events = [pygame.event.wait(timeout)] + pygame.event.get()
             m_pos = pygame.mouse.get_pos()
             
             # --- 1. KAMERA INPUTS VERARBEITEN ---
@@ -263,29 +316,42 @@ class MainManager:
                     
                     # 🚀 GEÄNDERT: Verarbeitung des Dicts aus vision_absdiff.py
                     elif isinstance(item, dict) and self.state == "GAME" and self.game_instance:
-                        # item Struktur: {"sector": 1-20, "is_missed": True/False, ...}
+                        # item Struktur: {"sector": 1-20, "is_missed": True/False, ..., "timing": {...}}
+                        timing = item.get("timing")
+                        if timing is not None: timing["dequeue"] = time.time()
                         
                         if item.get("is_missed", False):
                             print(f"[MAIN] Pfeil im Randbereich (Missed) -> 0 Punkte")
                             # Registriere einen Wurf mit 0 Punkten (Single Ring Multiplier)
-                            self.game_instance.handle_throw(0, 1) 
+                            self.game_instance.handle_throw(0, 1, timing=timing) 
                         else:
                             # Normaler Treffer im Board
                             sector = item.get("sector", 0)
                             print(f"[MAIN] Treffer im Board: Sector {sector}")
                             # Sektor an Spiel übergeben. Der Multiplier wird im Game bestimmt.
-                            self.game_instance.handle_throw(sector, 1) 
+                            self.game_instance.handle_throw(sector, 1, timing=timing) 
 
             # --- 2. EVENTS ---
-            for ev in pygame.event.get():
+            for ev in events:
                 if ev.type == pygame.QUIT: 
                     if self.vision_system: self.vision_system.stop()
                     pygame.quit()
                     sys.exit()
                 
+                # Fenster war verdeckt/minimiert -> beim nächsten Frame alles neu ausgeben
+                if ev.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE):
+                    self.ui.invalidate()
+                
                 if ev.type == pygame.MOUSEBUTTONDOWN: 
                     self.handle_click(m_pos)
                 
+                if ev.type == pygame.KEYDOWN and ev.key == pygame.K_F3:
+                    self.show_latency = not self.show_latency
+                    continue
+                if ev.type == pygame.KEYDOWN and ev.key == pygame.K_F4:
+                    print(f"[INFO] Latenz exportiert: {self.latency.export()}")
+                    continue
+                
                 if ev.type == pygame.KEYDOWN and self.state == "GAME":
                     if ev.key == pygame.K_BACKSPACE:
                         if self.game_instance.waiting_for_remove: 
@@ -298,7 +364,7 @@ class MainManager:
                             self.game_instance.handle_throw(res[0], res[1])
 
             # --- 3. ZEICHNEN ---
-            self.screen.fill((15, 20, 30))
+            self.ui.clear((15, 20, 30))
             self.buttons = {} # Buttons pro Frame neu registrieren
             
             if self.state == "LOBBY": 
@@ -310,8 +376,13 @@ class MainManager:
             elif self.state == "GAME": 
                 self.game_instance.draw()
             
-            pygame.display.flip()
+            if self.show_latency: self.latency.draw(self.ui, self.font_status)
+            
+            self.ui.present()
+            # Höchstens 60 Frames/s, auch wenn viele Ereignisse kommen (Mausbewegung).
+            # Nach dem Schlafen ist der Frame-Abstand schon erreicht -> kein zusätzliches Warten.
             self.clock.tick(60)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Nötig für Worker-Prozesse in der EXE
     MainManager().run()
\ No newline at end of file
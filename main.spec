@@ -14,10 +14,21 @@ a = Analysis(
     hiddenimports=[
         'games.x01',
         'games.d_checkouts',
+        'games.checkout_engine',
         'database.database',
         'vision',
         'vision_absdiff',
         'vision_takeout',
+        'vision_capture',
+        'vision_workers',
+        'vision_sources',
+        'vision_geometry',
+        'vision_debug',
+        'vision_background',
+        'vision_state',
+        'vision_fusion',
+        'latency',
+        'ui_render',
         'throw',
         'calibrate',
         'cv2',
@@ -0,0 +1,156 @@
+from collections import OrderedDict
+
+import pygame
+
+class TextCache:
+    """Gerenderte Texte pro (Font, Text, Farbe). font.render kostet bei großen Schriften mehr als
+    das ganze restliche Zeichnen, die meisten Texte ändern sich aber über viele Frames nicht."""
+    def __init__(self, size=512):
+        self.size = size
+        self.surfaces = OrderedDict()
+
+    def get(self, font, text, color):
+        key = (font, text, tuple(color))
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            return surf
+        surf = font.render(text, True, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.size: self.surfaces.popitem(last=False)
+        return surf
+
+def merge_rects(rects):
+    """Überlappende Rechtecke zusammenfassen (weniger, größere Bereiche für display.update)."""
+    merged = []
+    for r in rects:
+        r = pygame.Rect(r)
+        while True:
+            hits = r.collidelistall(merged)
+            if not hits: break
+            for i in reversed(hits): r.union_ip(merged.pop(i))
+        merged.append(r)
+    return merged
+
+class Renderer:
+    """Retained-Mode-Zeichnen für pygame. Die Screens beschreiben jeden Frame wie bisher mit
+    clear/rect/text/blit/line, gezeichnet wird aber erst in present(): dort wird der Frame mit dem
+    letzten verglichen, nur geänderte Bereiche werden neu gezeichnet (Hintergrund + alle Elemente,
+    die den Bereich berühren) und per display.update ausgegeben. Unveränderter Frame -> nichts zu tun."""
+    def __init__(self, screen, full_redraw=0.5):
+        self.screen = screen
+        self.texts = TextCache()
+        # Ab diesem Anteil geänderter Fläche lieber alles neu zeichnen (Screen-Wechsel)
+        self.FULL_REDRAW = full_redraw
+        self.background_color = None
+        self.background = None
+        self.background_key = None
+        self.alpha_surfaces = {}
+
+        self.items = []   # aktueller Frame: (key, rect), key beschreibt das Element vollständig
+        self.shown = {}   # zuletzt ausgegeben: key -> rect
+        self.full = True
+        self.updates = 0  # Anzahl display.update/flip (Statistik)
+
+    def invalidate(self):
+        """Nächster present() zeichnet alles (Fenster war verdeckt, fremdes Fenster, z.B. Kalibrierung)."""
+        self.full = True
+
+    # --- Frame beschreiben ---
+
+    def clear(self, color):
+        """Neuer Frame auf einfarbigem Hintergrund (ersetzt screen.fill). Mehrfaches clear im selben
+        Frame ist erlaubt, es zählt der letzte Aufruf."""
+        self.background_color = tuple(color)
+        self.items = []
+
+    def rect(self, color, rect, width=0, border_radius=0):
+        """Wie pygame.draw.rect. Farben mit Alpha (RGBA) werden transparent darübergelegt."""
+        rect = pygame.Rect(rect)
+        self.items.append((("rect", tuple(color), tuple(rect), width, border_radius), rect))
+
+    def line(self, color, start, end, width=1):
+        x0, y0 = min(start[0], end[0]), min(start[1], end[1])
+        rect = pygame.Rect(x0, y0, abs(end[0] - start[0]) + 1, abs(end[1] - start[1]) + 1).inflate(width * 2, width * 2)
+        self.items.append((("line", tuple(color), tuple(start), tuple(end), width), rect))
+
+    def text_surface(self, font, text, color):
+        """Gerenderter Text aus dem Cache (z.B. um vor dem Zeichnen die Breite zu kennen)."""
+        return self.texts.get(font, text, color)
+
+    def text(self, font, text, color, pos):
+        """Text an pos (links oben). Gibt die Surface zurück."""
+        surf = self.texts.get(font, text, color)
+        self.blit(surf, pos)
+        return surf
+
+    def blit(self, surf, pos):
+        """Fertige Surface. Gilt als unverändert, solange es dasselbe Objekt an derselben Stelle ist."""
+        pos = (int(pos[0]), int(pos[1]))
+        self.items.append((("blit", surf, pos), pygame.Rect(pos, surf.get_size())))
+
+    # --- Ausgeben ---
+
+    def draw(self, key):
+        kind = key[0]
+        if kind == "blit":
+            self.screen.blit(key[1], key[2])
+        elif kind == "rect":
+            _, color, rect, width, radius = key
+            if len(color) == 4:
+                self.screen.blit(self.alpha_surface(color, rect[2:], width, radius), rect[:2])
+            else:
+                pygame.draw.rect(self.screen, color, rect, width, border_radius=radius)
+        elif kind == "line":
+            _, color, start, end, width = key
+            pygame.draw.line(self.screen, color, start, end, width)
+
+    def alpha_surface(self, color, size, width, radius):
+        key = (color, size, width, radius)
+        surf = self.alpha_surfaces.get(key)
+        if surf is None:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surf, color, surf.get_rect(), width, border_radius=radius)
+            if len(self.alpha_surfaces) > 64: self.alpha_surfaces.clear()
+            self.alpha_surfaces[key] = surf
+        return surf
+
+    def present(self):
+        """Geänderte Bereiche zeichnen und ausgeben. Gibt die Liste der aktualisierten Rechtecke zurück."""
+        current = dict(self.items)
+        if self.background_color != self.background_key:
+            # Anderer Hintergrund (Screen-Wechsel): neue Fläche, alles neu
+            self.background = pygame.Surface(self.screen.get_size()).convert()
+            self.background.fill(self.background_color)
+            self.background_key = self.background_color
+            self.full = True
+        if self.full:
+            return self.redraw_all(current)
+
+        changed = [rect for key, rect in self.shown.items() if key not in current]
+        changed += [rect for key, rect in current.items() if key not in self.shown]
+        if not changed: return []
+        dirty = [r for r in merge_rects(changed) if r.w > 0 and r.h > 0]
+        screen_area = self.screen.get_width() * self.screen.get_height()
+        if sum(r.w * r.h for r in dirty) > self.FULL_REDRAW * screen_area:
+            return self.redraw_all(current)
+
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.blit(self.background, area, area)
+            for key, rect in self.items:
+                if rect.colliderect(area): self.draw(key)
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+        self.shown = current
+        self.updates += 1
+        return dirty
+
+    def redraw_all(self, current):
+        self.screen.blit(self.background, (0, 0))
+        for key, _ in self.items: self.draw(key)
+        pygame.display.flip()
+        self.shown = current
+        self.full = False
+        self.updates += 1
+        return [self.screen.get_rect()]
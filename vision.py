@@ -4,8 +4,15 @@ import json
 import os
 import sys
 import time
-from vision_absdiff import AbsDiffDetector
+from vision_absdiff import AbsDiffDetector, board_roi
+from vision_background import BackgroundModel
 from vision_takeout import TakeoutDetector
+from vision_capture import CaptureGovernor, CaptureGroup
+from vision_sources import CAPTURE_MODES, CameraSource, Recorder, RecordingSource
+from vision_debug import DebugRenderer
+from vision_state import IDLE, ThrowStateMachine
+from vision_fusion import Triangulator, camera_center
+from vision_geometry import board_mm_to_px, board_radii, build_score_map, label_score, score_map_edges, score_point
 
 def get_external_path(filename):
     if getattr(sys, 'frozen', False):
@@ -15,7 +22,7 @@ def get_external_path(filename):
     return os.path.join(base_path, filename)
 
 class CameraHandler:
-    def __init__(self, cam_id):
+    def __init__(self, cam_id, source=None):
         self.cam_id = cam_id
         self.config_file = get_external_path(f"cam{cam_id}_config.json")
         self.src_points = []
@@ -24,25 +31,19 @@ class CameraHandler:
         # Geschätzte Verzerrungskoeffizienten für Linsenkorrektur
         self.distortion_values = {0: 1.8, 1: 1.8, 2: 1.8}
         
-        print(f"[DEBUG] Initialisiere Kamera {cam_id}...")
-        self.cap = cv2.VideoCapture(cam_id, cv2.CAP_DSHOW)
-        if not self.cap.isOpened():
-            print(f"[ERROR] Kamera {cam_id} konnte nicht geöffnet werden!")
-        else:
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-            time.sleep(1.0)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            # Exposure Einstellungen für Stabilität
-            self.cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1) # 1 = Manual
-            self.cap.set(cv2.CAP_PROP_EXPOSURE, -7) 
-            self.cap.set(cv2.CAP_PROP_GAIN, 10)
-            if self.cam_id == 2: self.cap.set(cv2.CAP_PROP_BRIGHTNESS, 100)
-            else: self.cap.set(cv2.CAP_PROP_BRIGHTNESS, 150)
-            print(f"[DEBUG] Kamera {cam_id} initialisiert.")
+        # Bildquelle: echte Kamera, Aufnahme (Replay) oder Synthetik, siehe vision_sources.
+        # Ohne Quelle (None) nur Geometrie: Kalibrierung, Warp, Kameraposition
+        self.cap = source
+        if source is not None: print(f"[DEBUG] Initialisiere Kamera {cam_id}...")
         
         self.reference_gray = None
         self.matrix = None
+        self.camera_matrix = None
+        # Vorberechnete Remap-Tabellen (Entzerrung + Warp) pro Rohbild-Größe, siehe compute_warp_matrix
+        self.remap_tables = {}
+        # Aufnahme-Modus (CAPTURE_MODES): angefordert vom Vision-Thread, gesetzt vom Thread, der grabbt
+        self.capture_mode = "active"
+        self.requested_mode = None
         
         # Output Auflösung fest auf 1000x1000
         self.output_width = 1000
@@ -109,13 +110,80 @@ class CameraHandler:
             pts1_undistorted = pts1_undistorted.reshape(-1, 2)
             
             self.matrix = cv2.getPerspectiveTransform(pts1_undistorted, pts2)
+            self.camera_matrix = camera_matrix
+            self.build_remap_tables(camera_matrix, dist_coeffs, (w, h))
         except Exception as e:
             print(f"[ERROR] Warp Matrix Fehler für Cam {self.cam_id}: {e}")
             self.matrix = None
+            self.remap_tables = {}
+
+    def request_capture_mode(self, mode):
+        """Modus anfordern (aus CAPTURE_MODES), umgeschaltet wird vor dem nächsten Grab."""
+        if mode != self.capture_mode: self.requested_mode = mode
+
+    def apply_capture_mode(self):
+        """Vom Thread/Prozess aufrufen, der die Kamera liest: angeforderten Modus setzen (Gerät bleibt offen).
+        Quellen mit fester Auflösung liefern weiter dieselben Bilder, nur die Verarbeitung schaltet um."""
+        mode, self.requested_mode = self.requested_mode, None
+        if mode is None or mode == self.capture_mode: return
+        if self.cap is not None and self.cap.set_mode(mode):
+            print(f"[DEBUG] Cam {self.cam_id}: Aufnahme {mode} ({CAPTURE_MODES[mode][0]}x{CAPTURE_MODES[mode][1]} @ {CAPTURE_MODES[mode][2]} FPS)")
+        self.capture_mode = mode
+
+    def camera_center(self):
+        """Geschätzte Kameraposition über dem Board in Canvas-Pixeln (für die Triangulation), None ohne Kalibrierung."""
+        if self.matrix is None: return None
+        return camera_center(self.matrix, self.camera_matrix)
+
+    def build_remap_tables(self, camera_matrix, dist_coeffs, src_size):
+        """Baut die kombinierten Remap-Tabellen (Entzerrung + Warp) für das Canvas,
+        eine pro Rohbild-Größe der Aufnahme-Modi (kleinere Modi: Koordinaten skaliert)."""
+        # Jedes Zielpixel per inverser Homographie ins entzerrte Kamerabild ...
+        xs, ys = np.meshgrid(np.arange(self.output_width, dtype=np.float32),
+                             np.arange(self.output_height, dtype=np.float32))
+        grid = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2)
+        undist = cv2.perspectiveTransform(grid, np.linalg.inv(self.matrix)).reshape(-1, 2).astype(np.float64)
+        
+        # ... und von dort mit demselben Linsenmodell wie cv2.undistort ins Rohbild
+        fx, fy = camera_matrix[0, 0], camera_matrix[1, 1]
+        cx, cy = camera_matrix[0, 2], camera_matrix[1, 2]
+        k1, k2, p1, p2, k3 = [float(v) for v in dist_coeffs[:5]]
+        x = (undist[:, 0] - cx) / fx
+        y = (undist[:, 1] - cy) / fy
+        r2 = x * x + y * y
+        radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+        xd = x * radial + 2 * p1 * x * y + p2 * (r2 + 2 * x * x)
+        yd = y * radial + p1 * (r2 + 2 * y * y) + 2 * p2 * x * y
+        raw = np.stack([xd * fx + cx, yd * fy + cy], axis=-1)
+        
+        # Ungültige Punkte (Horizont) landen außerhalb des Bildes -> schwarz wie bei warpPerspective
+        raw[~np.isfinite(raw).all(axis=1)] = -1
+        raw = raw.reshape(self.output_height, self.output_width, 2).astype(np.float32)
+        
+        # Festkomma-Maps: deutlich schneller in cv2.remap als float Maps
+        self.remap_tables = {src_size: cv2.convertMaps(raw, None, cv2.CV_16SC2)}
+        for w, h, _ in CAPTURE_MODES.values():
+            if (w, h) in self.remap_tables: continue
+            # Gleiches Sichtfeld, weniger Pixel: Pixelmitten skalieren
+            scale = np.float32([w / src_size[0], h / src_size[1]])
+            self.remap_tables[(w, h)] = cv2.convertMaps((raw + 0.5) * scale - 0.5, None, cv2.CV_16SC2)
 
     def get_warped(self, frame):
         if self.matrix is None or frame is None: return None
         
+        h, w = frame.shape[:2]
+        tables = self.remap_tables.get((w, h))
+        if tables is not None:
+            # Entzerren + WARP auf 1000x1000 in einem Schritt
+            return cv2.remap(frame, tables[0], tables[1], cv2.INTER_LINEAR)
+        
+        # Fallback für abweichende Auflösungen: klassischer Zwei-Schritt-Weg
+        return self.get_warped_two_step(frame)
+
+    def get_warped_two_step(self, frame):
+        """Referenzpfad: erst cv2.undistort, dann cv2.warpPerspective."""
+        if self.matrix is None or frame is None: return None
+        
         # Bild entzerren, VOR dem WarpPerspective
         cam_mat, dist_coeffs = self.get_cam_intrinsic(frame)
         undistorted_frame = cv2.undistort(frame, cam_mat, dist_coeffs)
@@ -123,17 +191,186 @@ class CameraHandler:
         # WARP auf 1000x1000
         return cv2.warpPerspective(undistorted_frame, self.matrix, (self.output_width, self.output_height))
 
+class CameraPipeline:
+    """Verarbeitung einer Kamera: Warp -> Grau -> Vorprüfung -> Detektion.
+    Läuft im Vision-Thread oder in einem eigenen Worker-Prozess (vision_workers)."""
+    def __init__(self, index, cam, board_mask, freeze_mean, freeze_max, radii=None, winkel_offset=0):
+        self.index = index
+        self.cam = cam
+        self.board_mask = board_mask
+        self.FREEZE_MEAN = freeze_mean
+        self.FREEZE_MAX = freeze_max
+        self.detector = AbsDiffDetector(board_mask, freeze_mean, freeze_max, radii=radii, winkel_offset=winkel_offset)
+        self.takeout_detector = TakeoutDetector(board_mask)
+        # Laufende Referenz (Detektor und Vorprüfung teilen sich background.reference)
+        self.background = BackgroundModel(board_mask)
+        # Hintergrund nur lernen, solange kein Wurf läuft (setzt DartVisionSystem nach der ThrowStateMachine)
+        self.learn_background = True
+        self.mask_roi = board_roi(board_mask)
+        # Idle-Vorprüfung auf 1/4 der Auflösung (Referenz dort einmal verkleinert, bis sie sich ändert)
+        x0, y0, x1, y1 = self.mask_roi
+        self.idle_mask = cv2.threshold(cv2.pyrDown(cv2.pyrDown(board_mask[y0:y1, x0:x1])), 127, 255, cv2.THRESH_BINARY)[1]
+        self.idle_reference = None
+        
+        self.warped = None
+        self.gray = None
+        self.diff = None
+        self.ts = 0.0
+        # Bild aus einem kleineren Aufnahme-Modus (schmaler als die größten bisher gesehenen Bilder)
+        self.low_res = False
+        self.full_width = 0
+        # Bilder einer Kamera, die erst nach dem Start bereit wurde (noch ohne Referenz), siehe warm_up
+        self.warmup_frames = 0
+
+    def prepare(self, frame, ts):
+        """Warp + Grau einmal pro Bild. False, wenn das Bild nicht nutzbar ist."""
+        warped = self.cam.get_warped(frame)
+        if warped is None: return False
+        self.warped = warped
+        self.gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
+        self.diff = None
+        self.ts = ts
+        self.full_width = max(self.full_width, frame.shape[1])
+        self.low_res = frame.shape[1] < self.full_width
+        return True
+
+    def reference_diff(self):
+        """absdiff zur Referenz, einmal pro Bild (Vorprüfung und Freeze-Check teilen es)."""
+        if self.diff is None:
+            self.diff = cv2.absdiff(self.gray, self.cam.reference_gray)
+        return self.diff
+
+    def set_reference(self, warped, clean_board=False):
+        """Hintergrundmodell hart auf dieses Bild setzen."""
+        self.background.reset(cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY))
+        self.detector.set_reference_gray(self.background.reference)
+        self.cam.reference_gray = self.background.reference
+        self.diff = None
+        self.idle_reference = None
+        if clean_board: self.takeout_detector.set_clean_board(warped)
+
+    def warm_up(self, skip=10):
+        """Kamera ohne Referenz (im Hintergrund geöffnet, nach dem Start bereit): die ersten `skip` Bilder
+        verwerfen (Belichtung schwingt ein), dann Referenz setzen. True, solange das Bild nicht nutzbar ist."""
+        if self.cam.reference_gray is not None: return False
+        self.warmup_frames += 1
+        if self.warmup_frames > skip:
+            self.set_reference(self.warped, clean_board=True)
+            print(f"[DEBUG] Referenz für Cam {self.cam.cam_id} gesetzt (Kamera nachträglich bereit).")
+        return True
+
+    def settle_reference(self, duration):
+        """Nach einem Treffer: Referenz folgt dem Bild noch `duration` Sekunden (ab dem letzten Bild)."""
+        self.background.settle(self.ts + duration)
+
+    def coarse_change(self):
+        """Grobe Vorprüfung ohne teure PCA: sieht diese Kamera überhaupt eine Änderung?
+        Liegt eine Änderung außerhalb der aktiven ROI des Detektors (zweiter Pfeil woanders),
+        sucht der Detektor im nächsten detect wieder auf der ganzen Maske."""
+        if self.cam.reference_gray is None: return False
+        # Außerhalb der Maske bleibt nach dem AND nichts übrig -> nur die Bounding Box
+        x0, y0, x1, y1 = self.mask_roi
+        diff = self.reference_diff()[y0:y1, x0:x1]
+        _, thr = cv2.threshold(diff, 40, 255, cv2.THRESH_BINARY)
+        thr = cv2.bitwise_and(thr, self.board_mask[y0:y1, x0:x1])
+        contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+        changed = False
+        for cnt in contours:
+            if cv2.contourArea(cnt) > 200: # Grobe Änderung
+                changed = True
+                if self.detector.active_roi is None: break
+                if self.detector.outside_active_roi(cv2.boundingRect(cnt)):
+                    self.detector.release_active_roi()
+                    break
+        return changed
+
+    def idle_change(self):
+        """Vorprüfung im Idle-Modus: wie coarse_change, aber Bild und Referenz auf 1/4 verkleinert.
+        Die Bilder des kleinen Aufnahme-Modus sind unschärfer als die Referenz, auf der groben Stufe
+        gleicht sich das aus (sonst schlägt jede Feldkante an)."""
+        if self.cam.reference_gray is None: return False
+        x0, y0, x1, y1 = self.mask_roi
+        if self.idle_reference is None:
+            self.idle_reference = cv2.pyrDown(cv2.pyrDown(self.cam.reference_gray[y0:y1, x0:x1]))
+        diff = cv2.absdiff(cv2.pyrDown(cv2.pyrDown(self.gray[y0:y1, x0:x1])), self.idle_reference)
+        _, thr = cv2.threshold(diff, 40, 255, cv2.THRESH_BINARY)
+        thr = cv2.bitwise_and(thr, self.idle_mask)
+        contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for cnt in contours:
+            if cv2.contourArea(cnt) > 200 / 16: # Grobe Änderung (Fläche auf 1/16)
+                return True
+        return False
+
+    def process(self, last_hit_contours, last_hit_coords=None, debug=False):
+        """Motion-Freeze-Check und Detektion (Takeout-Check nur für das Debug-Bild).
+        Gibt ein kleines Ergebnis-Dict zurück (Spitze, Fläche, Konfidenz, Kontur).
+        Debug-Bilder nur mit debug=True, das Ergebnis ist davon unabhängig."""
+        cam_id = self.cam.cam_id
+        result = {"index": self.index, "cam_id": cam_id, "ts": self.ts,
+                  "moving": False, "best": None, "debug": None, "done": None}
+        
+        # --- MOTION FREEZE CHECK ---
+        if self.cam.reference_gray is not None:
+            diff_motion = self.reference_diff()
+            mean_val = cv2.mean(diff_motion)[0]
+            _, max_val, _, _ = cv2.minMaxLoc(diff_motion)
+            
+            if mean_val > self.FREEZE_MEAN and max_val < self.FREEZE_MAX:
+                result["moving"] = True
+                if debug: result["debug"] = self.warped.copy()
+                return result
+        
+        detected_objects, debug_img = self.detector.detect(self.warped, self.gray, debug=debug)
+        # Takeout entscheidet die ThrowStateMachine ("cleared"/"pulled"), der Check liefert nur noch das
+        # Debug-Bild -> nur rechnen, wenn eins angefordert ist
+        takeout_debug = None
+        if debug:
+            _, takeout_debug = self.takeout_detector.check_takeout(self.warped, last_hit_contours, debug=True, gray=self.gray)
+        
+        # Zeichne alte Treffer (Persistenz)
+        if debug and last_hit_coords and cam_id in last_hit_contours:
+            px = int(last_hit_coords[0])
+            py = int(last_hit_coords[1])
+            cv2.drawContours(takeout_debug, [last_hit_contours[cam_id]], 0, (0, 255, 255), 2)
+            cv2.circle(takeout_debug, (px, py), 10, (255, 255, 0), 3)
+        
+        best_obj = None
+        max_conf = 0
+        for obj in detected_objects:
+            if obj["confidence"] > max_conf:
+                max_conf = obj["confidence"]
+                best_obj = obj
+        
+        if best_obj:
+            # Nur das Nötigste zurückgeben (klein genug für eine Prozess-Queue)
+            result["best"] = {key: best_obj[key] for key in ("tip", "area", "confidence", "contour")}
+        result["debug"] = takeout_debug
+
+        # Ruhiges Bild -> Hintergrund nachführen (Pfeile und Hände bleiben eingefroren).
+        # Nicht mit Bildern aus dem kleinen Aufnahme-Modus, die würden das Modell verwischen.
+        if self.cam.reference_gray is not None and not self.low_res:
+            self.background.update(self.gray, self.reference_diff(), self.ts, learn=self.learn_background)
+            self.diff = None
+            self.idle_reference = None
+        # Detektion fertig (Latenzmessung, siehe latency.py)
+        result["done"] = time.time()
+        return result
+
 class DartVisionSystem:
-    def __init__(self, hit_callback):
+    def __init__(self, hit_callback, cam_ids=(0, 1, 2), use_workers=False, source_factory=None, show_debug=False, debug_rate=5.0):
         self.hit_callback = hit_callback
-        self.cameras = [CameraHandler(i) for i in range(3)]
+        self.cam_ids = list(cam_ids)
+        self.use_workers = use_workers
+        # Headless (Standard): keine Debug-Bilder. Mit show_debug zeigt ein eigener Thread sie mit debug_rate Hz.
+        self.show_debug = show_debug
+        self.debug_rate = debug_rate
+        self.debug_renderer = None
         
         self.canvas_size = 1000
         self.board_mask = np.zeros((self.canvas_size, self.canvas_size), dtype=np.uint8)
         
         # mm_to_px basierend auf dem Faktor
-        target_radius_px = (self.canvas_size / 2) * 0.70
-        self.mm_to_px = target_radius_px / 170.0 
+        self.mm_to_px = board_mm_to_px(self.canvas_size)
         
         center_px = self.canvas_size // 2
         # Maske etwas größer als das Board
@@ -142,315 +379,444 @@ class DartVisionSystem:
         self.FREEZE_MEAN = 10 
         self.FREEZE_MAX = 50
         
-        self.detectors = [
-            AbsDiffDetector(self.board_mask, self.FREEZE_MEAN, self.FREEZE_MAX)
-            for _ in range(3)
-        ]
-        self.takeout_detectors = [TakeoutDetector(self.board_mask) for _ in range(3)]
-        
-        # TRIPLE-RING KORREKTUR: 1mm nach innen gesetzt
-        self.radii = {
-            "bull": 6.35 * self.mm_to_px, 
-            "single_bull": 15.9 * self.mm_to_px,
-            "triple_outer": (107.0 - 1.0) * self.mm_to_px, # 1mm nach innen
-            "triple_inner": (107.0 - 8.0 - 1.0) * self.mm_to_px, # 1mm nach innen
-            "double_outer": 170.0 * self.mm_to_px, 
-            "double_inner": (170.0 - 8.0) * self.mm_to_px  
-        }
+        # Feld-Radien in Pixeln (gemeinsam mit Detektor und Auswertung, siehe vision_geometry)
+        self.radii = board_radii(self.mm_to_px)
         
         # WINKEL OFFSET für die Berechnung (20 oben)
         self.WINKEL_OFFSET = 0 
         
-        self.last_hit_time = 0
+        # Maximaler Zeitversatz zwischen den Bildern eines Kamera-Sets (Sekunden)
+        self.MAX_FRAME_SKEW = 0.05
+        # Nach einem Treffer übernimmt die Referenz so lange das aktuelle Bild (Pfeil schwingt aus)
+        self.SETTLE_TIME = 0.3
+        
+        # Entweder alles im Vision-Thread oder ein Worker-Prozess pro Kamera
+        self.workers = None
+        self.cameras = []
+        self.pipelines = []
+        if use_workers:
+            from vision_workers import WorkerPool
+            self.workers = WorkerPool(self.cam_ids, self.board_mask, self.FREEZE_MEAN, self.FREEZE_MAX, source_factory,
+                                      radii=self.radii, winkel_offset=self.WINKEL_OFFSET)
+        else:
+            for i, cam_id in enumerate(self.cam_ids):
+                # source_factory darf None liefern: Kamera nur mit Geometrie (z.B. Tests der Fusion)
+                source = source_factory(cam_id) if source_factory else CameraSource(cam_id)
+                cam = CameraHandler(cam_id, source=source)
+                self.cameras.append(cam)
+                self.pipelines.append(CameraPipeline(i, cam, self.board_mask, self.FREEZE_MEAN, self.FREEZE_MAX,
+                                                     radii=self.radii, winkel_offset=self.WINKEL_OFFSET))
+        self.detectors = [p.detector for p in self.pipelines]
+        self.takeout_detectors = [p.takeout_detector for p in self.pipelines]
+        
+        # Fusion über die Sichtlinien der Kameras (vision_fusion). Im Worker-Modus nur die Geometrie laden.
+        geometry = self.cameras or [CameraHandler(cam_id) for cam_id in self.cam_ids]
+        self.triangulator = Triangulator({cam.cam_id: cam.camera_center() for cam in geometry})
+        self.last_fusion = None
+        
+        # Label pro Canvas-Pixel (Sektor + Multiplikator), neu gebaut wenn sich Offset oder Radien ändern
+        self.score_labels = None
+        self.score_edges = None
+        self.score_map_key = None
+        # Spider-Overlay als fertige Ebene (Farbbild, Maske), baut score_map im Vision-Thread
+        self.spider_overlay = None
+        self.score_map()
+        
         self.running = True
-        self.waiting_for_reset = False
-        self.quiet_frames = 0
         
         self.last_hit_coords = None
         self.last_hit_score = None
         self.last_hit_contours = {}
         
-        self.hit_candidate = None
-        self.hit_candidate_time = 0
+        # Ablauf eines Wurfs (idle -> motion -> settling -> confirmed -> takeout), siehe vision_state
+        self.throws = ThrowStateMachine(on_event=self.on_throw_state)
+        
+        # Capture-Threads (einer pro Kamera), werden in run() gestartet
+        self.capture = None
+        # Volle Qualität nur, solange am Board etwas passiert (siehe CaptureGovernor)
+        self.governor = CaptureGovernor()
+        # Optionaler Recorder (vision_sources.Recorder) für Rohbilder und Treffer
+        self.recorder = None
+        
+        # Durchsatz-Messung (Frames pro Sekunde der Hauptschleife)
+        self.fps = 0.0
+        self.fps_frames = 0
+        self.fps_start = time.time()
+        self.frames_total = 0
+
+    def update_fps(self):
+        """Zählt Loop-Durchläufe und gibt einmal pro Sekunde die FPS aus."""
+        self.fps_frames += 1
+        self.frames_total += 1
+        elapsed = time.time() - self.fps_start
+        if elapsed >= 1.0:
+            self.fps = self.fps_frames / elapsed
+            self.fps_frames = 0
+            self.fps_start = time.time()
+            print(f"[VISION] FPS: {self.fps:.1f}")
+
+    def score_map(self):
+        """Label-Map (uint8, Canvas-Größe) für den aktuellen WINKEL_OFFSET und die Radien.
+        Ändert sich die Geometrie, bekommen auch die Detektoren (bzw. Worker) die neuen Werte und das
+        Spider-Overlay wird neu gebaut. Nur aus dem Vision-Thread aufrufen."""
+        key = (self.WINKEL_OFFSET, *self.radii.values())
+        if key != self.score_map_key:
+            self.score_labels = build_score_map(self.radii, self.WINKEL_OFFSET, self.canvas_size)
+            self.score_edges = score_map_edges(self.score_labels)
+            self.spider_overlay = self.build_spider_overlay(self.score_edges)
+            if self.score_map_key is not None:
+                for detector in self.detectors: detector.set_geometry(dict(self.radii), self.WINKEL_OFFSET)
+                if self.workers is not None: self.workers.broadcast("geometry", dict(self.radii), self.WINKEL_OFFSET)
+            self.score_map_key = key
+        return self.score_labels
+
+    def build_spider_overlay(self, edges):
+        """Dartboard-Raster als fertige Ebene. Die Linien sind die Feldgrenzen der Label-Map,
+        also genau das, was get_score zählt. Wird danach nur noch gelesen (schreibgeschützt)."""
+        layer = np.zeros((*edges.shape, 3), np.uint8)
+        layer[edges] = (0, 255, 0) # HELLGRÜN (BGR)
+        mask = edges.astype(np.uint8)
+        layer.flags.writeable = mask.flags.writeable = False
+        return layer, mask
 
     def draw_spider_overlay(self, frame):
-        """Zeichnet das Dartboard-Raster basierend auf dem OFFSET."""
-        center = self.canvas_size // 2
-        color = (0, 255, 0) # HELLGRÜN (BGR)
-        
-        # Kreise zeichnen
-        cv2.circle(frame, (center, center), int(self.radii["double_outer"]), color, 2)
-        cv2.circle(frame, (center, center), int(self.radii["double_inner"]), color, 2)
-        cv2.circle(frame, (center, center), int(self.radii["triple_outer"]), color, 2)
-        cv2.circle(frame, (center, center), int(self.radii["triple_inner"]), color, 2)
-        cv2.circle(frame, (center, center), int(self.radii["bull"]), color, 1)
-        cv2.circle(frame, (center, center), int(self.radii["single_bull"]), color, 1)
-
-        # Sektorenlinien berechnen mit OFFSET (20 ist oben = -90°)
-        for i in range(20):
-            # Der Winkel wird hier mit dem OFFSET angepasst
-            angle = i * 18 - 90 + self.WINKEL_OFFSET
-            
-            x1 = int(center + self.radii["double_outer"] * np.cos(np.radians(angle)))
-            y1 = int(center + self.radii["double_outer"] * np.sin(np.radians(angle)))
-            
-            cv2.line(frame, (center, center), (x1, y1), color, 1)
+        """Zeichnet das Dartboard-Raster (im DebugRenderer-Thread). Liest nur die fertige Ebene,
+        bei neuer Geometrie ersetzt der Vision-Thread sie als Ganzes."""
+        layer, mask = self.spider_overlay
+        if frame.shape == layer.shape: cv2.copyTo(layer, mask, frame)
 
     def run(self):
         print("[VISION] System bereit (1000x1000)...") 
         try:
+            if self.workers is not None:
+                if self.recorder is not None:
+                    print("[WARN] Aufnahme im Worker-Modus nicht möglich (Rohbilder bleiben in den Workern).")
+                    self.recorder = None
+                self.workers.start()
             print("[DEBUG] Versuche Referenzen zu setzen...")
             self.reset_references()
             print("[VISION] Referenzen gesetzt. Starte Loop...")
+            if self.workers is None:
+                self.capture = CaptureGroup(self.cameras)
+                self.capture.start()
+            if self.show_debug:
+                self.debug_renderer = DebugRenderer(overlay=self.draw_spider_overlay, rate=self.debug_rate)
+                self.debug_renderer.start()
+            tick = self.capture.tick if self.capture else 0
+            self.fps_frames, self.fps_start = 0, time.time()
             
             while self.running:
-                valid_cam_data = [] 
-                max_area_found = 0
-                debug_frames = {}
-                all_cameras_empty = True
-                board_is_moving = False
-                
-                # --- ZWEI-STUFEN-LOGIK: CHECKEN OB EINE CAM WAS SIEHT ---
-                for i, cam in enumerate(self.cameras):
-                    if cam.cap is None or not cam.cap.isOpened(): continue
-                    ret, frame = cam.cap.read()
-                    if not ret: continue
-                    
-                    warped = cam.get_warped(frame)
-                    if warped is None: continue
-                    
-                    # Hier schauen wir nur kurz auf die Fläche, ohne teure PCA
-                    gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
-                    if cam.reference_gray is not None:
-                        diff = cv2.absdiff(gray, cam.reference_gray)
-                        _, thr = cv2.threshold(diff, 40, 255, cv2.THRESH_BINARY)
-                        thr = cv2.bitwise_and(thr, self.board_mask)
-                        contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                        for cnt in contours:
-                            if cv2.contourArea(cnt) > 200: # Grobe Änderung
-                                all_cameras_empty = False
-                                break
-
-                # --- MODUS UMSCHALTEN ---
-                if not all_cameras_empty:
-                    for detector in self.detectors: detector.high_sensitivity_mode = True
+                if self.workers is not None:
+                    results, all_cameras_empty = self.collect_worker_results()
                 else:
-                    for detector in self.detectors: detector.high_sensitivity_mode = False
-
-                # --- EIGENTLICHE VERARBEITUNG ---
-                for i, cam in enumerate(self.cameras):
-                    if cam.cap is None or not cam.cap.isOpened(): continue
-                    ret, frame = cam.cap.read()
-                    if not ret: continue
-                    
-                    warped = cam.get_warped(frame)
-                    if warped is None: continue
-                    
-                    self.draw_spider_overlay(warped)
-                    gray_warped = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
-                    
-                    # --- MOTION FREEZE CHECK ---
-                    if cam.reference_gray is not None:
-                        diff_motion = cv2.absdiff(gray_warped, cam.reference_gray)
-                        mean_val = cv2.mean(diff_motion)[0]
-                        _, max_val, _, _ = cv2.minMaxLoc(diff_motion)
-                        
-                        if mean_val > self.FREEZE_MEAN and max_val < self.FREEZE_MAX:
-                            board_is_moving = True
-                            debug_frames[cam.cam_id] = warped
-                            continue 
-                    
-                    detected_objects, debug_img = self.detectors[i].detect(warped, gray_warped)
-                    takeout_detected, takeout_debug = self.takeout_detectors[i].check_takeout(warped, self.last_hit_contours)
-                    
-                    # Zeichne alte Treffer (Persistenz)
-                    if self.last_hit_coords and cam.cam_id in self.last_hit_contours:
-                        px = int(self.last_hit_coords[0])
-                        py = int(self.last_hit_coords[1])
-                        cv2.drawContours(takeout_debug, [self.last_hit_contours[cam.cam_id]], 0, (0, 255, 255), 2)
-                        cv2.circle(takeout_debug, (px, py), 10, (255, 255, 0), 3)
-
-                    best_obj = None
-                    max_conf = 0
-                    
-                    for obj in detected_objects:
-                        if obj["confidence"] > max_conf:
-                            max_conf = obj["confidence"]
-                            best_obj = obj
-                    
-                    if best_obj:
-                        area = best_obj["area"]
-                        if area > max_area_found: max_area_found = area
-                        
-                        # FILTER: Mindestkonfidenz 
-                        if best_obj["confidence"] < 3000:
-                            debug_frames[cam.cam_id] = takeout_debug
-                            continue
-                        
-                        # Takeout Initialisierung
-                        if area > 25000 and best_obj["confidence"] > 25000:
-                            if not self.waiting_for_reset: self.waiting_for_reset = True
-                        
-                        elif area > 300: 
-                            if (time.time() - self.last_hit_time > 0.3):
-                                tip = best_obj["tip"]
-                                valid_cam_data.append((cam.cam_id, tip, area, best_obj["contour"], best_obj["confidence"]))
-                                cv2.circle(takeout_debug, (int(tip[0]), int(tip[1])), 7, (0, 0, 255), -1) 
-                    
-                    debug_frames[cam.cam_id] = takeout_debug
-                
-                # --- Takeout Race Condition Fix ---
-                if board_is_moving:
-                    self.hit_candidate = None
-                    time.sleep(0.01)
-
-                # --- TAKE OUT ERGEBNIS AN SPIELLOGIK ---
-                if all_cameras_empty and self.last_hit_coords:
-                    print("[INFO] Alle Darts entfernt.")
-                    self.last_hit_coords = None
-                    self.last_hit_contours = {}
-                    self.reset_references()
-                    self.hit_callback("NEXT_PLAYER")
-                    
-                # --- SCORE BERECHNUNG & OUTLIER FILTERUNG ---
-                if len(valid_cam_data) >= 2:
-                    all_points = np.array([c[1] for c in valid_cam_data])
-                    median_point = np.median(all_points, axis=0)
-                    
-                    # FILTER: Outlier
-                    filtered_data = []
-                    for data in valid_cam_data:
-                        dist_to_median = np.linalg.norm(np.array(data[1]) - median_point)
-                        if dist_to_median < 150: 
-                            filtered_data.append(data)
-                    
-                    # Nur mit den guten Daten weiterarbeiten
-                    if len(filtered_data) >= 2:
-                        filtered_data.sort(key=lambda x: x[4], reverse=True)
-                        
-                        weights = [c[4] for c in filtered_data[:3]]
-                        points = [c[1] for c in filtered_data[:3]]
-                        
-                        final_x = int(np.average([p[0] for p in points], weights=weights))
-                        final_y = int(np.average([p[1] for p in points], weights=weights))
-                        
-                        c1, c2 = filtered_data[0], filtered_data[1]
-                        dist = np.linalg.norm(np.array(c1[1]) - np.array(c2[1]))
-
-                        # SCHWELLE & PLAUSIBILITÄTSPRÜFUNG
-                        if dist < 150:
-                            current_point = (final_x, final_y)
-                            if self.hit_candidate is None:
-                                self.hit_candidate = current_point
-                                self.hit_candidate_time = time.time()
-                                continue
-                            
-                            dist_prev = np.linalg.norm(np.array(current_point) - np.array(self.hit_candidate))
-                            if dist_prev < 20 and (time.time() - self.hit_candidate_time) < 0.2:
-                                pass
-                            else:
-                                self.hit_candidate = current_point
-                                self.hit_candidate_time = time.time()
-                                continue
-
-                            is_new_dart = True
-                            if self.last_hit_coords:
-                                old_dist = np.linalg.norm(np.array((final_x, final_y)) - np.array(self.last_hit_coords))
-                                if old_dist < 40:
-                                    is_new_dart = False
-                            
-                            if is_new_dart:
-                                hit_result = self.get_score(final_x, final_y)
-                                if not hit_result.get("is_missed", True) or hit_result.get("sector", 0) > 0:
-                                    self.last_hit_score = hit_result
-                                    print(f"[SCORE FOUND] {self.last_hit_score} at {final_x},{final_y}")                
-                                    self.last_hit_coords = (final_x, final_y)
-                                    # Speichere Konturen aller Cams, die diesen Wurf sehen
-                                    self.last_hit_contours = {data[0]: data[3] for data in filtered_data}                
-                                    
-                                    self.hit_callback(self.last_hit_score)
-                                    self.last_hit_time = time.time()
-                                    time.sleep(0.3) 
-                                    self.update_all_references()
-                                    self.waiting_for_reset = False
-                                    self.hit_candidate = None
-                
-                # --- Fenster anzeigen ---
-                for cam_id, img in debug_frames.items():
-                    cv2.imshow(f"Cam {cam_id} Debug", img)
-                cv2.waitKey(1)
+                    tick, results, all_cameras_empty = self.collect_results(tick)
+                if not results: continue
                 
-                # RESET LOGIK
-                if self.waiting_for_reset:
-                    if max_area_found < 500: self.quiet_frames += 1
-                    else: self.quiet_frames = 0
-                    if self.quiet_frames > 15:
-                        print("[INFO] Pfeile wurden gezogen.")
-                        self.reset_references()
-                        self.waiting_for_reset = False
-                        self.quiet_frames = 0
-                        self.last_hit_coords = None
-                        self.last_hit_contours = {}
+                self.update_fps()
+                self.fuse(results, all_cameras_empty)
                 
         except Exception as e: 
             import traceback
             print(f"[ERROR] Hauptschleifen-Fehler: {e}")
             traceback.print_exc()
 
-    def update_all_references(self):
+    def collect_results(self, tick):
+        """Ein Takt im Vision-Thread: jedes Kamerabild genau einmal verarbeiten."""
+        # --- EIN GRAB + WARP + GRAU PRO KAMERA UND TICK ---
+        # Beide Stufen arbeiten auf demselben Bild (gleicher Zeitpunkt, halbe Arbeit)
+        tick = self.capture.wait_set(tick)
+        frames = self.capture.latest_set()
+        if not frames and self.capture.all_finished():
+            print("[VISION] Alle Bildquellen beendet.")
+            self.running = False
+        
+        active = []
+        for i, frame, ts in frames:
+            pipeline = self.pipelines[i]
+            if pipeline.prepare(frame, ts) and not pipeline.warm_up():
+                active.append(pipeline)
+        if not active: return tick, [], True
+        ts = max(p.ts for p in active)
+        
+        # --- IDLE / KLEINE BILDER: NUR GROBE PRÜFUNG, KEINE DETEKTION ---
+        # Detektor und Schwellen sind für volle Auflösung ausgelegt. Sieht eine Kamera etwas, wird auf
+        # "active" umgeschaltet und erst das nächste Set in voller Auflösung verarbeitet (auch Bilder,
+        # die nach dem Umschalten noch im kleinen Modus ankommen, werden nur grob geprüft)
+        if self.governor.idle or any(p.low_res for p in active):
+            wake = any(p.idle_change() for p in active)
+            self.update_governor(ts, activity=wake)
+            return tick, [], True
+        
+        # --- ZWEI-STUFEN-LOGIK: CHECKEN OB EINE CAM WAS SIEHT ---
+        # Jede Kamera prüfen (nicht beim ersten Fund aufhören): coarse_change gibt auch die aktive ROI
+        # des Detektors frei, wenn sich außerhalb etwas ändert
+        changes = [pipeline.coarse_change() for pipeline in active]
+        all_cameras_empty = not any(changes)
+        self.update_governor(ts, activity=not all_cameras_empty)
+
+        # --- MODUS UMSCHALTEN ---
+        for detector in self.detectors: detector.high_sensitivity_mode = not all_cameras_empty
+
+        # --- EIGENTLICHE VERARBEITUNG ---
+        # Debug-Bilder nur, wenn der Renderer wieder eins haben will (sonst keine Kopien, kein Zeichnen)
+        debug = self.debug_renderer is not None and self.debug_renderer.due()
+        results = []
+        for pipeline in active:
+            results.append(pipeline.process(self.last_hit_contours, self.last_hit_coords, debug=debug))
+        return tick, results, all_cameras_empty
+
+    def collect_worker_results(self):
+        """Ein Ergebnis-Set aus den Worker-Prozessen abholen (nur kleine Dicts, keine Bilder)."""
+        results = self.workers.collect()
+        # Idle-Worker schicken nur Zeitstempel und ob die grobe Prüfung etwas sieht (wake)
+        ts = max((r["ts"] for r in results), default=None)
+        wake = any(r.get("wake") for r in results)
+        results = [r for r in results if not r.get("idle")]
+        all_cameras_empty = not any(r["coarse_change"] for r in results)
+        if ts is not None: self.update_governor(ts, activity=wake or not all_cameras_empty)
+        # Modus geht mit einem Takt Verzögerung an die Worker
+        self.workers.set_high_sensitivity(not all_cameras_empty)
+        return results, all_cameras_empty
+
+    def camera_status(self):
+        """Zustand pro Kamera {cam_id: OPENING/READY/FAILED} (vision_sources), z.B. für die Lobby."""
+        if self.workers is not None: return self.workers.camera_status()
+        return {cam.cam_id: cam.cap.status for cam in self.cameras}
+
+    def update_governor(self, ts, activity):
+        """Aufnahme-Modus nachführen: aktiv, solange eine Kamera etwas sieht oder ein Wurf läuft."""
+        if not self.governor.update(ts, activity or self.throws.state != IDLE): return
+        mode = self.governor.mode
+        print(f"[VISION] Aufnahme-Modus: {mode}")
+        for cam in self.cameras: cam.request_capture_mode(mode)
+        if self.workers is not None: self.workers.set_capture_mode(mode)
+
+    def fuse(self, results, all_cameras_empty):
+        """Fusion der Kamera-Ergebnisse: Outlier-Filter und Score, den Ablauf steuert die ThrowStateMachine."""
+        self.score_map() # Radien/Offset geändert -> Label-Map und Detektoren nachziehen
+        valid_cam_data = [] 
+        max_area_found = 0
+        debug_frames = {}
+        board_is_moving = False
+        hand_detected = False
+        
+        for r in results:
+            debug_frames[r["cam_id"]] = r["debug"]
+            if r["moving"]:
+                board_is_moving = True
+                continue
+            
+            best_obj = r["best"]
+            if best_obj:
+                area = best_obj["area"]
+                if area > max_area_found: max_area_found = area
+                
+                # FILTER: Mindestkonfidenz 
+                if best_obj["confidence"] < 3000: continue
+                
+                # Takeout Initialisierung
+                if area > 25000 and best_obj["confidence"] > 25000:
+                    hand_detected = True
+                
+                elif area > 300: 
+                    tip = best_obj["tip"]
+                    valid_cam_data.append((r["cam_id"], tip, area, best_obj["contour"], best_obj["confidence"], r["ts"], r["done"]))
+                    if r["debug"] is not None:
+                        cv2.circle(r["debug"], (int(tip[0]), int(tip[1])), 7, (0, 0, 255), -1) 
+        
+        # --- SCORE BERECHNUNG & OUTLIER FILTERUNG ---
+        point, filtered_data = self.fuse_point(valid_cam_data)
+        score = None
+        if point is not None:
+            hit_result = self.get_score(*point)
+            if not hit_result.get("is_missed", True) or hit_result.get("sector", 0) > 0:
+                score = hit_result
+        
+        # --- ABLAUF (Zeitstempel der Bilder, kein sleep) ---
+        ts = max((r["ts"] for r in results), default=self.throws.ts)
+        actions = self.throws.step(ts, moving=board_is_moving, empty=all_cameras_empty, hand=hand_detected,
+                                   quiet=max_area_found < 500, point=point, score=score)
+        for action in actions:
+            if action[0] == "hit":
+                self.last_hit_score = action[2]
+                print(f"[SCORE FOUND] {self.last_hit_score} at {point[0]:.1f},{point[1]:.1f} (±{self.last_fusion['sigma']:.1f} px)")
+                self.last_hit_coords = point
+                # Speichere Konturen aller Cams, die diesen Wurf sehen
+                self.set_last_hit_contours({data[0]: data[3] for data in filtered_data})
+                # Zeitstempel für die Latenzmessung: Aufnahme der Bilder, Detektion fertig, Fusion bestätigt.
+                # MainManager ergänzt "dequeue", X01Game.draw "render".
+                timing = {"capture": min(data[5] for data in filtered_data),
+                          "detect": max(data[6] for data in filtered_data), "fusion": time.time()}
+                self.emit(dict(self.last_hit_score, timing=timing))
+                self.settle_references()
+            elif action[0] == "cleared":
+                # --- TAKE OUT ERGEBNIS AN SPIELLOGIK ---
+                print("[INFO] Alle Darts entfernt.")
+                self.last_hit_coords = None
+                self.set_last_hit_contours({})
+                self.rebase_references()
+                self.emit("NEXT_PLAYER")
+            elif action[0] == "pulled":
+                print("[INFO] Pfeile wurden gezogen.")
+                self.rebase_references()
+                self.last_hit_coords = None
+                self.set_last_hit_contours({})
+        # Hintergrund nur im Ruhezustand lernen: ab dem ersten Kandidaten bis zum Treffer (bzw. bis nach
+        # dem Ziehen) bleibt das Modell stehen, ein neuer Pfeil ändert die Referenz nur über settle
+        self.set_background_learning(self.throws.state == IDLE)
+        
+        # --- Fenster anzeigen (im Debug-Thread) ---
+        if self.debug_renderer is not None:
+            if self.workers is not None and self.debug_renderer.due():
+                # Bilder der letzten Anfrage abholen und die nächsten anfordern
+                debug_frames = self.workers.debug_frames()
+                if not debug_frames: self.workers.request_debug_frames()
+            if any(img is not None for img in debug_frames.values()):
+                self.debug_renderer.submit(debug_frames)
+
+    def fuse_point(self, valid_cam_data):
+        """Triangulation der Kamera-Spitzen (vision_fusion) mit Ausreißer-Test über die Residuen.
+        Gibt ((x, y) als Kommazahlen, gefilterte Daten) zurück oder (None, None), wenn die Kameras sich nicht einig sind.
+        Unsicherheit und Residuen der letzten Lösung stehen in self.last_fusion."""
+        if len(valid_cam_data) < 2: return None, None
+        
+        # Höchstens drei Kameras, die sichersten zuerst
+        data = sorted(valid_cam_data, key=lambda x: x[4], reverse=True)[:3]
+        fused = self.triangulator.fuse([c[0] for c in data], [c[1] for c in data], [c[4] for c in data])
+        if fused is None: return None, None
+        filtered_data = [c for c in data if c[0] in fused["cams"]]
+        
+        # FILTER: Bilder des Sets zu weit auseinander -> Set verwerfen
+        timestamps = [c[5] for c in filtered_data]
+        if max(timestamps) - min(timestamps) > self.MAX_FRAME_SKEW:
+            return None, None
+        
+        self.last_fusion = fused
+        return fused["point"], filtered_data
+
+    def on_throw_state(self, event):
+        """Zustandswechsel der ThrowStateMachine (mit Zeitstempel) in die Aufnahme schreiben."""
+        if self.recorder is not None: self.recorder.add_event({"state": event}, ts=event["ts"])
+
+    def start_recording(self, path):
+        """Schreibt ab jetzt alle Rohbilder und Treffer mit (vor run() aufrufen)."""
+        self.recorder = Recorder(path, self.cam_ids)
         for i, cam in enumerate(self.cameras):
-            if cam.cap is None or not cam.cap.isOpened(): continue
-            for _ in range(5): cam.cap.read()
-            r, f = cam.cap.read()
-            if r:
-                w = cam.get_warped(f)
-                if w is not None:
-                    self.detectors[i].set_reference(w)
-                    cam.reference_gray = cv2.cvtColor(w, cv2.COLOR_BGR2GRAY)
+            cam.cap = RecordingSource(cam.cap, self.recorder, i)
+
+    def emit(self, event):
+        """Gibt ein Ereignis (Treffer-Dict oder "NEXT_PLAYER") an die Spiellogik weiter."""
+        if self.recorder is not None: self.recorder.add_event(event)
+        self.hit_callback(event)
+
+    def set_last_hit_contours(self, contours):
+        self.last_hit_contours = contours
+        if self.workers is not None: self.workers.set_last_hit_contours(contours)
+
+    def set_background_learning(self, flag):
+        if self.workers is not None:
+            self.workers.set_background_learning(flag)
+            return
+        for pipeline in self.pipelines: pipeline.learn_background = flag
+
+    def read_frame(self, index, skip=0):
+        """Liest ein frisches Rohbild, über die Capture-Threads, sobald diese laufen."""
+        if self.capture is not None and self.capture.running:
+            return self.capture.read(index, skip)
+        cam = self.cameras[index]
+        for _ in range(skip): cam.cap.read()
+        return cam.cap.read()
+
+    def settle_references(self):
+        """Nach einem Treffer: der Pfeil wird ohne Warten Teil der Referenz (siehe BackgroundModel.settle)."""
+        if self.workers is not None:
+            self.workers.broadcast("settle", self.SETTLE_TIME)
+            return
+        for pipeline in self.pipelines:
+            pipeline.settle_reference(self.SETTLE_TIME)
+
+    def rebase_references(self):
+        """Nach dem Ziehen: Referenz und leeres Board aus dem aktuellen Bild, ohne Bilder zu verwerfen."""
+        if self.workers is not None:
+            self.workers.update_references(skip=0, clean_board=True)
+            return
+        for pipeline in self.pipelines:
+            if pipeline.warped is not None:
+                pipeline.set_reference(pipeline.warped, clean_board=True)
 
     def reset_references(self):
+        """Start: Configs laden und Referenzen aus frischen Bildern (verwirft die ersten Bilder)."""
+        if self.workers is not None:
+            self.workers.update_references(skip=10, clean_board=True, reload=True)
+            return
         for i, cam in enumerate(self.cameras):
             print(f"[DEBUG] Lade Config für Cam {i}...")
             cam.load_config()
             cam.compute_warp_matrix()
             if cam.matrix is not None and cam.cap is not None and cam.cap.isOpened():
                 print(f"[DEBUG] Setze Referenz für Cam {i}...")
-                for _ in range(10): cam.cap.read()
-                ret, frame = cam.cap.read()
+                ret, frame = self.read_frame(i, skip=10)
                 if ret:
                     warped = cam.get_warped(frame)
                     if warped is not None:
-                        self.detectors[i].set_reference(warped)
-                        cam.reference_gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
-                        self.takeout_detectors[i].set_clean_board(warped)
+                        self.pipelines[i].set_reference(warped, clean_board=True)
                         print(f"[DEBUG] Referenz für Cam {i} gesetzt.")
                 else:
                     print(f"[ERROR] Kamera {i} liefert kein Bild für Referenz!")
 
     def get_score(self, x, y):
-        """Berechnet Sektor, Multiplikator und Missed-Status."""
-        rel_x, rel_y = x - 500, y - 500
-        dist = np.linalg.norm([rel_x, rel_y])
-        
-        # Missed Überprüfung
-        if dist > self.radii["double_outer"]:
-            return {"sector": 0, "multiplier": 1, "is_missed": True}
-        
-        angle = (np.degrees(np.arctan2(-rel_y, rel_x)) + 360) % 360
-        angle = (angle + self.WINKEL_OFFSET) % 360 
-        segments = [6, 13, 4, 18, 1, 20, 5, 12, 9, 14, 11, 8, 16, 7, 19, 3, 17, 2, 15, 10]
-        val = segments[int((angle + 9) / 18) % 20]
-        
-        # Rückgabe als Dict
-        if dist <= self.radii["bull"]: return {"sector": 25, "multiplier": 2, "is_missed": False}
-        if dist <= self.radii["single_bull"]: return {"sector": 25, "multiplier": 1, "is_missed": False}
-        if self.radii["triple_inner"] <= dist <= self.radii["triple_outer"]: return {"sector": val, "multiplier": 3, "is_missed": False}
-        if self.radii["double_inner"] <= dist <= self.radii["double_outer"]: return {"sector": val, "multiplier": 2, "is_missed": False}
-        
-        return {"sector": val, "multiplier": 1, "is_missed": False}
+        """Berechnet Sektor, Multiplikator und Missed-Status.
+        Auf dem Canvas ein Zugriff auf die Label-Map am nächsten Pixel: Kommazahlen aus der Fusion werden
+        gerundet (höchstens 0.71 px, ~0.3 mm), gezählt wird also genau das Feld, das das Spider-Overlay zeigt."""
+        labels = self.score_map()
+        ix, iy = int(round(x)), int(round(y))
+        if 0 <= ix < labels.shape[1] and 0 <= iy < labels.shape[0]:
+            return label_score(labels[iy, ix])
+        # Außerhalb des Canvas (weit daneben) analytisch
+        return score_point(x, y, self.radii, self.WINKEL_OFFSET)
 
     def stop(self):
         self.running = False
+        if self.capture is not None: self.capture.stop()
+        if self.workers is not None: self.workers.stop()
         for cam in self.cameras: 
             if cam.cap is not None: cam.cap.release()
-        cv2.destroyAllWindows()
\ No newline at end of file
+        if self.debug_renderer is not None: self.debug_renderer.stop()
+
+# --- SELBSTTEST ---
+
+def textured_frame(width, height, seed=0):
+    """Glatte Zufallstextur als Testbild (Kanten überall, keine harten Sprünge)."""
+    small = np.random.default_rng(seed).integers(0, 256, (height // 20, width // 20, 3), dtype=np.uint8)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+
+def self_test(max_mean=1.0, max_p99=4):
+    """Kombinierte Remap-Tabelle gegen den Zwei-Schritt-Weg (undistort + warpPerspective) pro Kamera
+    und Aufnahme-Modus. Verglichen wird, wo beide Bilder Inhalt haben (Differenz in Graustufen)."""
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    full_size = max((w, h) for w, h, _ in CAPTURE_MODES.values())
+    for cam_id in (0, 1, 2):
+        cam = CameraHandler(cam_id)
+        if cam.matrix is None:
+            print(f"[WARN] Cam {cam_id}: keine Kalibrierung, übersprungen.")
+            continue
+        for mode, (w, h, _) in CAPTURE_MODES.items():
+            frame = textured_frame(w, h, seed=cam_id)
+            fast = cam.get_warped(frame).astype(np.int16)
+            # Referenz: die Kalibrierung gilt für die volle Auflösung -> kleinere Modi erst hochskalieren
+            full = frame if (w, h) == full_size else cv2.resize(frame, full_size, interpolation=cv2.INTER_LINEAR)
+            ref = cam.get_warped_two_step(full).astype(np.int16)
+            valid = (fast.max(axis=2) > 0) & (ref.max(axis=2) > 0)
+            diff = np.abs(fast - ref)[valid]
+            mean, p99 = float(diff.mean()), float(np.percentile(diff, 99))
+            print(f"  Cam {cam_id} {mode} ({w}x{h}): Differenz Mittel {mean:.2f}, p99 {p99:.0f}, max {diff.max()}")
+            check(f"Cam {cam_id} {mode}: Remap = Zwei-Schritt-Warp", mean <= max_mean and p99 <= max_p99)
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if self_test() else 1)
@@ -1,10 +1,117 @@
 import cv2
 import numpy as np
+from vision_debug import OverlayLayer
+from vision_geometry import board_radii, score_points
+
+def board_roi(mask, pad=8):
+    """Bounding Box (x0, y0, x1, y1) der Board-Maske plus Rand.
+    Der Rand deckt Blur- und Morphologie-Kernel ab, innerhalb der Maske bleibt alles identisch."""
+    x, y, w, h = cv2.boundingRect(mask)
+    mh, mw = mask.shape[:2]
+    return (max(0, x - pad), max(0, y - pad), min(mw, x + w + pad), min(mh, y + h + pad))
+
+def tip_candidates(contours, min_area):
+    """Spitze, Fläche und Konfidenz aller Konturen in einem NumPy-Durchlauf (statt PCA pro Kontur).
+    Hauptachse per PCA der Konturpunkte, Kontur an der Mitte in zwei Hälften geteilt,
+    Breite einer Hälfte = Ausdehnung quer zur Hauptachse, die schmalere Hälfte ist die Spitze."""
+    # Vorfilter (Rauschen sind viele winzige Konturen): contourArea ist ein billiger C-Aufruf
+    keep, areas = [], []
+    for cnt in contours:
+        if len(cnt) < 5: continue
+        area = cv2.contourArea(cnt)
+        if area < min_area: continue
+        keep.append(cnt)
+        areas.append(area)
+    if not keep: return []
+    area = np.array(areas)
+    lengths = np.array([len(c) for c in keep])
+    pts = np.concatenate(keep).reshape(-1, 2).astype(np.float64)
+    starts = np.zeros(len(keep), dtype=np.intp)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    seg = np.repeat(np.arange(len(keep)), lengths)
+
+    # --- PCA FÜR HAUPTACHSE (zentrale Momente 2. Ordnung der Punkte) ---
+    center = np.add.reduceat(pts, starts) / lengths[:, None]
+    d = pts - center[seg]
+    cxx = np.add.reduceat(d[:, 0] * d[:, 0], starts)
+    cyy = np.add.reduceat(d[:, 1] * d[:, 1], starts)
+    cxy = np.add.reduceat(d[:, 0] * d[:, 1], starts)
+    theta = 0.5 * np.arctan2(2 * cxy, cxx - cyy)
+    axis = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+    # Vorzeichen wie cv2.PCACompute (x + y >= 0): bei gleich breiten Hälften dieselbe Spitze wie bisher
+    axis[axis.sum(axis=1) < 0] *= -1
+
+    # --- SPITZE VS FLIGHT UNTERSCHEIDEN: eine Projektion ---
+    proj = d[:, 0] * axis[seg, 0] + d[:, 1] * axis[seg, 1]
+    min_proj = np.minimum.reduceat(proj, starts)
+    max_proj = np.maximum.reduceat(proj, starts)
+
+    # Breite jeder Hälfte quer zur Achse (Index 2*k: Seite < 0, 2*k+1: Seite > 0), Punkte auf der Mitte zählen nicht.
+    # Nicht die Diagonale der Bounding Box: die wächst mit der Länge, ein langer Pfeil hätte zwei "breite" Hälften.
+    side = proj != 0
+    half = (2 * seg + (proj > 0))[side]
+    across = (d[:, 1] * axis[seg, 0] - d[:, 0] * axis[seg, 1])[side]
+    n = 2 * len(keep)
+    counts = np.bincount(half, minlength=n)
+    lo = np.full(n, np.inf)
+    hi = np.full(n, -np.inf)
+    np.minimum.at(lo, half, across)
+    np.maximum.at(hi, half, across)
+    with np.errstate(invalid="ignore"):
+        width = hi - lo
+    width_left, width_right = width[0::2], width[1::2]
+
+    # Beide Hälften brauchen Punkte; wenn beide Seiten breit sind, ist es kein Pfeil
+    valid = (counts[0::2] >= 2) & (counts[1::2] >= 2) & ~((width_left > 30) & (width_right > 30))
+    left_tip = width_left < width_right
+    tip_proj = np.where(left_tip, min_proj, max_proj)
+    tip_width = np.where(left_tip, width_left, width_right)
+    tips = (center + axis * tip_proj[:, None]).astype(int)
+    # Konfidenz: Maß für "Schmalheit" an der Spitze
+    confidence = area * (100 / (tip_width + 1))
+
+    return [{"contour": keep[i], "area": areas[i], "confidence": confidence[i], "tip": tuple(tips[i])}
+            for i in np.flatnonzero(valid)]
+
+def merge_candidates(objects, dist=50):
+    """Kandidaten mit Spitzen näher als `dist` zusammenfassen (der mit höherer Konfidenz gewinnt).
+    Gitter mit Zellgröße `dist`: nur die 3x3 Nachbarzellen werden verglichen statt aller Paare."""
+    merged, grid = [], {}
+    def cell(tip): return (int(tip[0]) // dist, int(tip[1]) // dist)
+    for obj in objects:
+        cx, cy = cell(obj["tip"])
+        match = None
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for i in grid.get((gx, gy), ()):
+                    m = merged[i]
+                    # Erster passender Eintrag gewinnt (wie die Reihenfolge der Liste)
+                    if (match is None or i < match) and np.hypot(obj["tip"][0] - m["tip"][0], obj["tip"][1] - m["tip"][1]) < dist:
+                        match = i
+        if match is None:
+            grid.setdefault((cx, cy), []).append(len(merged))
+            merged.append(obj)
+        elif obj["confidence"] > merged[match]["confidence"]:
+            m = merged[match]
+            grid[cell(m["tip"])].remove(match)
+            m.update(obj)
+            grid.setdefault(cell(m["tip"]), []).append(match)
+    return merged
 
 class AbsDiffDetector:
-    def __init__(self, board_mask, freeze_mean=20, freeze_max=70):
+    def __init__(self, board_mask, freeze_mean=20, freeze_max=70, radii=None, winkel_offset=0):
         self.board_mask = board_mask
         self.reference_frame = None
+        
+        # Nur der Bereich der Board-Maske wird verarbeitet
+        self.mask_roi = board_roi(board_mask)
+        # Nach einer Detektion: nur noch die Umgebung der aktiven Änderung
+        self.active_roi = None
+        self.ACTIVE_ROI_MARGIN = 120
+        # Spätestens nach so vielen Bildern wieder einmal die ganze Maske (ein zweiter Pfeil
+        # außerhalb der ROI bleibt sonst unsichtbar, solange der erste steckt)
+        self.ACTIVE_ROI_MAX_FRAMES = 30
+        self.active_roi_frames = 0
         self.FREEZE_MEAN = freeze_mean
         self.FREEZE_MAX = freeze_max
         self.board_center = (500, 500)
@@ -12,29 +119,66 @@ class AbsDiffDetector:
         # MODUS-FLAG
         self.high_sensitivity_mode = False
         
-        self.radii = {
-            "outer": 450, "double": 420, "triple": 260,
-            "single_bull": 40, "bull": 15
-        }
+        # Feld-Radien und Winkel-Offset wie in DartVisionSystem (Sektor/Missed der Kandidaten = get_score)
+        self.radii = radii if radii is not None else board_radii()
+        self.winkel_offset = winkel_offset
+        # Virtuelles Board fürs Debug-Bild, einmal gezeichnet
+        self.board_layer = OverlayLayer(self.draw_virtual_board)
 
     def set_reference(self, frame):
-        self.reference_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.set_reference_gray(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+
+    def set_reference_gray(self, gray):
+        """Referenz als Graubild (z.B. BackgroundModel.reference, wird laufend aktualisiert)."""
+        self.reference_frame = gray
+        self.release_active_roi()
+
+    def release_active_roi(self):
+        """Nächstes Bild wieder auf der ganzen Board-Maske."""
+        self.active_roi = None
+        self.active_roi_frames = 0
+
+    def outside_active_roi(self, rect):
+        """True, wenn das Rechteck (x, y, w, h) nicht ganz in der aktiven ROI liegt."""
+        if self.active_roi is None: return False
+        x0, y0, x1, y1 = self.active_roi
+        x, y, w, h = rect
+        return x < x0 or y < y0 or x + w > x1 or y + h > y1
+
+    def update_active_roi(self, objects):
+        """Region um die erkannten Objekte für das nächste Bild (oder wieder die ganze Maske)."""
+        if not objects or self.active_roi_frames >= self.ACTIVE_ROI_MAX_FRAMES:
+            self.release_active_roi()
+            return
+        pts = np.concatenate([obj["contour"].reshape(-1, 2) for obj in objects])
+        m = self.ACTIVE_ROI_MARGIN
+        mx0, my0, mx1, my1 = self.mask_roi
+        self.active_roi = (max(mx0, int(pts[:, 0].min()) - m), max(my0, int(pts[:, 1].min()) - m),
+                           min(mx1, int(pts[:, 0].max()) + m + 1), min(my1, int(pts[:, 1].max()) + m + 1))
+        self.active_roi_frames += 1
+
+    def set_geometry(self, radii, winkel_offset):
+        """Neue Board-Geometrie (DartVisionSystem.score_map bei geänderten Radien/Offset)."""
+        self.radii = radii
+        self.winkel_offset = winkel_offset
 
     def draw_virtual_board(self, img, color=(255, 255, 0)):
         center = self.board_center
-        for r in [self.radii["outer"], self.radii["double"], self.radii["triple"]]:
-            cv2.circle(img, center, r, color, 1)
-        # ... (Rest der Zeichnung bleibt gleich)
-        cv2.circle(img, center, self.radii["bull"], color, 1)
+        for r in self.radii.values():
+            cv2.circle(img, center, int(round(r)), color, 1)
 
-    def detect(self, warped_frame, gray=None):
+    def detect(self, warped_frame, gray=None, debug=True):
+        """Findet Pfeil-Kandidaten. Mit debug=False wird kein Debug-Bild erzeugt (zweiter Wert None),
+        die Kandidaten sind identisch."""
         if self.reference_frame is None:
-            return [], warped_frame
+            return [], warped_frame if debug else None
         
         if gray is None:
             gray = cv2.cvtColor(warped_frame, cv2.COLOR_BGR2GRAY)
             
-        diff = cv2.absdiff(self.reference_frame, gray)
+        # Nur ROI verarbeiten, Konturen kommen per offset in Canvas-Koordinaten zurück
+        x0, y0, x1, y1 = self.active_roi or self.mask_roi
+        diff = cv2.absdiff(self.reference_frame[y0:y1, x0:x1], gray[y0:y1, x0:x1])
         
         # --- 🚀 PARAMETER ---
         if self.high_sensitivity_mode:
@@ -46,97 +190,34 @@ class AbsDiffDetector:
         
         diff_blurred = cv2.GaussianBlur(diff, (5, 5), 0)
         _, thr = cv2.threshold(diff_blurred, thresh_val, 255, cv2.THRESH_BINARY)
-        thr = cv2.bitwise_and(thr, self.board_mask)
+        thr = cv2.bitwise_and(thr, self.board_mask[y0:y1, x0:x1])
         
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
         thr = cv2.morphologyEx(thr, cv2.MORPH_OPEN, kernel, iterations=1)
         
-        contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
         
-        debug_img = warped_frame.copy()
-        self.draw_virtual_board(debug_img, color=(255, 255, 0))
+        debug_img = None
+        if debug:
+            debug_img = warped_frame.copy()
+            self.board_layer.apply(debug_img, (self.board_center, *self.radii.values()))
         
-        raw_objects = []
+        raw_objects = tip_candidates(contours, min_area)
         
-        for cnt in contours:
-            area = cv2.contourArea(cnt)
-            if area < min_area: continue
-            
-            # --- PCA FÜR HAUPTACHSE ---
-            if len(cnt) < 5: continue
-            cnt_pts = cnt.reshape(-1, 2).astype(np.float32)
-            mean, eigenvecs = cv2.PCACompute(cnt_pts, mean=None)
-            center = mean[0]
-            main_axis = eigenvecs[0]
-            
-            # --- SPITZE VS FLIGHT UNTERSCHEIDEN ---
-            projected = np.dot(cnt_pts - center, main_axis)
-            min_proj, max_proj = np.min(projected), np.max(projected)
-            
-            # Die Kontur in zwei Hälften teilen (Spitze/Flight)
-            left_half = cnt_pts[np.dot(cnt_pts - center, main_axis) < 0]
-            right_half = cnt_pts[np.dot(cnt_pts - center, main_axis) > 0]
-            
-            if len(left_half) < 2 or len(right_half) < 2: continue
-            
-            # Breite der Hälften messen
-            def get_width(pts):
-                if len(pts) < 2: return 0
-                return np.linalg.norm(np.max(pts, axis=0) - np.min(pts, axis=0))
-            
-            width_left = get_width(left_half)
-            width_right = get_width(right_half)
-            
-            # 🚀 FILTER: Wenn beide Seiten breit sind, ist es kein Pfeil
-            if width_left > 30 and width_right > 30: continue 
-
-            # Spitze ist das schmälere Ende
-            if width_left < width_right:
-                actual_tip = center + main_axis * min_proj
-                tip_width = width_left
-            else:
-                actual_tip = center + main_axis * max_proj
-                tip_width = width_right
-
-            # --- BEWERTUNG ---
-            dist_to_center = np.linalg.norm(actual_tip - self.board_center)
-            
-            # Sektor Berechnung
-            dx = actual_tip[0] - self.board_center[0]
-            dy = actual_tip[1] - self.board_center[1]
-            angle = np.degrees(np.arctan2(dy, dx))
-            if angle < 0: angle += 360
-            sector_num = int(((angle + 9) % 360) / 18)
-            sector_map = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5]
-            sector = sector_map[sector_num]
-            
-            # Konfidenz: Maß für "Schmalheit" an der Spitze
-            confidence = area * (100 / (tip_width + 1)) 
-            
-            raw_objects.append({
-                "contour": cnt,
-                "area": area,
-                "confidence": confidence,
-                "tip": tuple(actual_tip.astype(int)),
-                "sector": sector,
-                "is_missed": dist_to_center > self.radii["outer"]
-            })
+        # --- BEWERTUNG: Sektor + Missed aller Kandidaten in einem Aufruf ---
+        if raw_objects:
+            tips = np.array([obj["tip"] for obj in raw_objects], dtype=np.float64)
+            sectors, _, missed = score_points(tips[:, 0], tips[:, 1], self.radii, self.winkel_offset)
+            for obj, sector, is_missed in zip(raw_objects, sectors, missed):
+                obj["sector"], obj["is_missed"] = int(sector), bool(is_missed)
             
         # Merging
-        merged_objects = []
-        for obj in raw_objects:
-            merged = False
-            for m in merged_objects:
-                if np.linalg.norm(np.array(obj["tip"]) - np.array(m["tip"])) < 50:
-                    if obj["confidence"] > m["confidence"]:
-                        m.update(obj)
-                    merged = True
-                    break
-            if not merged:
-                merged_objects.append(obj)
+        merged_objects = merge_candidates(raw_objects)
+        
+        self.update_active_roi(merged_objects)
         
         # --- Debug Visualisierung ---
-        for obj in merged_objects:
+        for obj in merged_objects if debug else ():
             contour_color = (0, 0, 255) # Rot für erkannt
             cv2.drawContours(debug_img, [obj["contour"]], 0, contour_color, 2)
             cv2.circle(debug_img, obj["tip"], 7, (0, 0, 255), -1)
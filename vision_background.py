@@ -0,0 +1,146 @@
+import cv2
+import numpy as np
+from vision_absdiff import board_roi
+
+class BackgroundModel:
+    """Laufende Referenz einer Kamera: exponentieller Mittelwert plus Varianz pro Pixel (Graustufen).
+    Ruhige Bilder fließen mit `alpha` ein, Pixel die deutlich vom Modell abweichen (Pfeile, Hände)
+    bleiben eingefroren. `reference` ist das Modell als uint8 und wird an Ort und Stelle aktualisiert,
+    Detektor und Vorprüfung können es also direkt als Referenzbild verwenden."""
+    def __init__(self, board_mask, alpha=0.05, k=3.0, min_diff=15, init_std=4.0, every=4):
+        self.board_mask = board_mask
+        # Außerhalb der Maske wird nichts ausgewertet -> nur die Bounding Box pflegen
+        self.roi = board_roi(board_mask)
+        self.alpha = alpha
+        self.k = k
+        self.min_diff = min_diff
+        self.init_var = init_std ** 2
+        # Nur jedes `every`-te ruhige Bild einrechnen (Beleuchtung driftet langsam, spart ~3/4 der Rechenzeit)
+        self.every = every
+        self.count = 0
+
+        self.mean = None
+        self.var = None
+        self.reference = None
+        self.threshold = None
+        # Bis zu diesem Bild-Zeitstempel übernimmt das Modell das aktuelle Bild komplett (nach einem Treffer)
+        self.settle_until = 0.0
+
+    def reset(self, gray):
+        """Modell hart auf ein Bild setzen (Start, Takeout)."""
+        self.mean = gray.astype(np.float32)
+        self.var = np.full(gray.shape, self.init_var, np.float32)
+        self.reference = gray.copy()
+        self.threshold = np.zeros(gray.shape, np.uint8)
+        self.update_threshold()
+
+    def settle(self, until):
+        """Nach einem Treffer: bis `until` (Bild-Zeitstempel) folgt das Modell dem Bild vollständig,
+        danach ist der neue Pfeil Teil des Hintergrunds (ersetzt das Warten und Neuaufnehmen der Referenz)."""
+        self.settle_until = max(self.settle_until, until)
+
+    def update(self, gray, diff, ts, learn=True):
+        """Ein ruhiges Bild einrechnen. diff ist absdiff(gray, reference) desselben Bildes.
+        learn=False (ein Wurf läuft): kein Mittelwert, nur das Übernehmen nach settle, damit ein frisch
+        steckender Pfeil nicht an seinen Rändern ins Modell wandert, bevor er bestätigt ist."""
+        if self.mean is None: return
+        settling = ts < self.settle_until
+        self.count += 1
+        if not settling and (not learn or self.count % self.every): return
+        x0, y0, x1, y1 = self.roi
+        gray = gray[y0:y1, x0:x1]
+        mean = self.mean[y0:y1, x0:x1]
+        var = self.var[y0:y1, x0:x1]
+        mask = self.board_mask[y0:y1, x0:x1]
+
+        if settling:
+            # Treffer setzt sich: Bild komplett übernehmen, Varianz bleibt
+            np.copyto(mean, gray, where=mask.astype(bool))
+        else:
+            # Eingefroren, wo sich etwas um mehr als k Standardabweichungen (mind. min_diff) abhebt
+            foreground = cv2.compare(diff[y0:y1, x0:x1], self.threshold[y0:y1, x0:x1], cv2.CMP_GT)
+            update_mask = cv2.bitwise_and(mask, cv2.bitwise_not(foreground))
+            delta = cv2.subtract(gray, mean, dtype=cv2.CV_32F)
+            cv2.accumulateWeighted(cv2.multiply(delta, delta), var, self.alpha, mask=update_mask)
+            cv2.accumulateWeighted(gray, mean, self.alpha, mask=update_mask)
+            self.update_threshold()
+        cv2.convertScaleAbs(mean, dst=self.reference[y0:y1, x0:x1])
+
+    def update_threshold(self):
+        x0, y0, x1, y1 = self.roi
+        std = cv2.sqrt(self.var[y0:y1, x0:x1])
+        cv2.convertScaleAbs(cv2.max(std * self.k, float(self.min_diff)), dst=self.threshold[y0:y1, x0:x1])
+
+# --- SELBSTTEST ---
+
+def self_test(throws=3, max_change=0.5, max_residual=4.0):
+    """Synthetische Würfe durch den kompletten run-Loop (vision_synth): bis zum bestätigten Treffer bleibt
+    die Referenz an den Pixeln eines frisch steckenden Pfeils stehen, nach settle ist er Teil der Referenz."""
+    from functools import partial
+    from vision import DartVisionSystem
+    from vision_state import CONFIRMED, IDLE
+    from vision_synth import SynthScene, SynthSource
+
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    scene = SynthScene(throws=throws, seed=0)
+    masks = {}
+    # Pro Takt: Bild-Index, Zustand und pro (Wurf, Kamera) die Referenz an den Pfeil-Pixeln und |Referenz - Bild| dort
+    ticks = []
+
+    class Recording(DartVisionSystem):
+        def fuse(self, results, all_cameras_empty):
+            super().fuse(results, all_cameras_empty)
+            # Bild-Index aus dem Zeitstempel (scene.position ist das zuletzt gelesene, die Capture-Threads sind voraus)
+            k = int(round((max(p.ts for p in self.pipelines) - scene.t0) * scene.fps))
+            values = {}
+            for t in scene.throws:
+                if not t["frame"] - 5 <= k < t["removed"]: continue
+                for i, pipeline in enumerate(self.pipelines):
+                    mask = masks[t["index"], i]
+                    reference = pipeline.background.reference[mask].astype(np.int16)
+                    values[t["index"], i] = (reference, np.abs(reference - pipeline.gray[mask]).mean())
+            ticks.append((k, self.throws.state, values))
+
+    system = Recording(lambda event: None, source_factory=partial(SynthSource, scene), show_debug=False)
+    # Pfeil-Pixel im Canvas aus Sicht jeder Kamera (der Pfeil fällt von ihr weg)
+    for t in scene.throws:
+        for i, cam in enumerate(system.cameras):
+            canvas = np.zeros_like(scene.board)
+            scene.draw_dart(canvas, t, cam.cap.away)
+            masks[t["index"], i] = canvas.max(axis=2) > 0
+    system.run()
+
+    settle_frames = int(np.ceil(system.SETTLE_TIME * scene.fps)) + 2
+    for t in scene.throws:
+        n = t["index"]
+        before = [v for k, _, v in ticks if k < t["frame"] and (n, 0) in v]
+        landed = [(k, state, v) for k, state, v in ticks if t["frame"] <= k < t["removed"]]
+        hit = next((j for j, (_, state, _) in enumerate(landed) if state == CONFIRMED), None)
+        check(f"Wurf {n}: Treffer bestätigt", bool(before) and hit is not None)
+        if not before or hit is None: continue
+
+        # Bis zur Bestätigung: kein Lernen an den Pfeil-Pixeln, die Referenz-Differenz sieht den ganzen Pfeil
+        change = max(np.abs(v[n, i][0] - before[-1][n, i][0]).mean()
+                     for _, _, v in landed[:hit] for i in range(len(system.pipelines)))
+        seen = min(v[n, i][1] for _, _, v in landed[:hit] for i in range(len(system.pipelines)))
+        print(f"  Wurf {n}: Referenz an den Pfeil-Pixeln bis zum Treffer um max. Ø {change:.2f} Grauwerte geändert, "
+              f"|Referenz - Bild| dort min. Ø {seen:.1f}")
+        check(f"Wurf {n}: Pfeil bis zum Treffer nicht im Hintergrund", change <= max_change and seen > 4 * max_residual)
+
+        # Nach settle: Referenz folgt dem Bild, der Pfeil ist Hintergrund
+        settled = [v for k, _, v in landed[hit:] if k >= landed[hit][0] + settle_frames]
+        if settled:
+            residual = max(settled[0][n, i][1] for i in range(len(system.pipelines)))
+            print(f"  Wurf {n}: |Referenz - Bild| an den Pfeil-Pixeln nach settle Ø {residual:.2f}")
+            check(f"Wurf {n}: Pfeil nach settle Teil der Referenz", residual <= max_residual)
+    check("Kein Hängenbleiben (am Ende idle)", system.throws.state == IDLE)
+    return ok
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if self_test() else 1)
@@ -0,0 +1,226 @@
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from functools import partial
+
+import cv2
+import numpy as np
+
+try:
+    import resource # nicht auf Windows
+except ImportError:
+    resource = None
+
+STAGES = ("read", "warp", "coarse", "detect", "takeout", "fusion", "tick", "get_score", "score_batch")
+
+class StageTimer:
+    """Sammelt Laufzeiten (ms) pro Verarbeitungsstufe."""
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def add(self, stage, ms):
+        self.samples[stage].append(ms)
+
+    def wrap(self, obj, attr, stage):
+        """Ersetzt obj.attr durch eine Variante, die jede Ausführung unter `stage` misst."""
+        func = getattr(obj, attr)
+        def timed(*args, **kwargs):
+            t = time.perf_counter()
+            try: return func(*args, **kwargs)
+            finally: self.samples[stage].append((time.perf_counter() - t) * 1000)
+        setattr(obj, attr, timed)
+
+    def reset(self):
+        self.samples.clear()
+
+    def summary(self):
+        stats = {}
+        for stage in STAGES:
+            values = self.samples.get(stage)
+            if not values: continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats[stage] = {"n": len(values), "mean": float(np.mean(values)), "p50": float(p50),
+                            "p95": float(p95), "p99": float(p99), "max": float(np.max(values))}
+        return stats
+
+class SyncCapture:
+    """Ersatz für CaptureGroup: liest alle Kameras nacheinander im aufrufenden Thread.
+    Ohne Threads sind die Stufenzeiten reproduzierbar und nicht vom Scheduler verfälscht."""
+    # read_frame() (Referenzbilder) liest damit direkt von der Quelle
+    running = False
+
+    def __init__(self, cameras, timer):
+        self.cameras = cameras
+        self.timer = timer
+
+    def wait_set(self, last_tick, timeout=1.0):
+        return last_tick + 1
+
+    def latest_set(self):
+        frames = []
+        for i, cam in enumerate(self.cameras):
+            if cam.cap is None or not cam.cap.isOpened() or cam.cap.finished: continue
+            t = time.perf_counter()
+            ret, frame = cam.cap.read()
+            self.timer.add("read", (time.perf_counter() - t) * 1000)
+            if ret and frame is not None:
+                frames.append((i, frame, cam.cap.frame_time() or time.time()))
+        return frames
+
+    def all_finished(self):
+        return all(cam.cap.finished for cam in self.cameras if cam.cap is not None)
+
+    def stop(self):
+        pass
+
+def score_sweep(system, timer, count=2000, repeats=20):
+    """get_score auf zufälligen Kommazahl-Punkten im Board, so wie fuse() sie vom Triangulator bekommt
+    (Treffer allein sind zu selten für Perzentile), dazu dieselben Punkte als ein Aufruf von
+    score_points (score_batch, ms pro `count` Punkte)."""
+    from vision_geometry import score_points
+    rng = np.random.default_rng(0)
+    r = system.radii["double_outer"] * 1.1 * np.sqrt(rng.random(count))
+    phi = rng.random(count) * 2 * np.pi
+    xs, ys = 500 + r * np.cos(phi), 500 + r * np.sin(phi)
+    # Kommazahlen wie aus der Fusion (fuse -> get_score)
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        t = time.perf_counter()
+        system.get_score(x, y)
+        timer.add("get_score", (time.perf_counter() - t) * 1000)
+    for _ in range(repeats):
+        t = time.perf_counter()
+        score_points(xs, ys, system.radii, system.WINKEL_OFFSET)
+        timer.add("score_batch", (time.perf_counter() - t) * 1000)
+
+def run_bench(source_factory, cam_ids=(0, 1, 2), frames=300, warmup=5, label="synthetic"):
+    """Schickt eine Sequenz durch die echte Pipeline (collect_results + fuse) und misst jede Stufe."""
+    from vision import DartVisionSystem
+
+    timer = StageTimer()
+    hits = []
+    system = DartVisionSystem(hits.append, cam_ids=cam_ids, source_factory=source_factory, show_debug=False)
+    for cam in system.cameras:
+        timer.wrap(cam, "get_warped", "warp")
+    for pipeline in system.pipelines:
+        timer.wrap(pipeline, "coarse_change", "coarse")
+        timer.wrap(pipeline.detector, "detect", "detect")
+        timer.wrap(pipeline.takeout_detector, "check_takeout", "takeout")
+    timer.wrap(system, "fuse_point", "fusion")
+
+    system.capture = SyncCapture(system.cameras, timer)
+    system.reset_references()
+
+    tick, ticks = 0, 0
+    elapsed = 0.0
+    tracemalloc.start()
+    while system.running and ticks < frames + warmup:
+        if ticks == warmup:
+            # Referenzaufnahme und erste Bilder (Allokationen, Caches) nicht mitzählen
+            timer.reset()
+            tracemalloc.reset_peak()
+            elapsed = 0.0
+        t = time.perf_counter()
+        tick, results, all_cameras_empty = system.collect_results(tick)
+        if not system.running: break
+        system.fuse(results, all_cameras_empty)
+        dt = time.perf_counter() - t
+        timer.add("tick", dt * 1000)
+        elapsed += dt
+        ticks += 1
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    measured = max(0, ticks - warmup)
+
+    processing = elapsed - sum(timer.samples["read"]) / 1000
+    score_sweep(system, timer)
+    system.stop()
+
+    memory = {"traced_peak_mb": peak / 2**20}
+    if resource is not None:
+        # ru_maxrss: Linux in KB, macOS in Bytes
+        scale = 1 if sys.platform == "darwin" else 1024
+        memory["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+    return {
+        "meta": {"source": label, "cams": len(system.cameras), "frames": measured,
+                 "date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                 "opencv": cv2.__version__, "machine": platform.machine()},
+        "fps": measured / elapsed if elapsed > 0 else 0.0,
+        # Ohne Lesen/Dekodieren der Quelle (bei Aufnahmen sonst dominierend)
+        "fps_processing": measured / processing if processing > 0 else 0.0,
+        "hits": len([h for h in hits if h != "NEXT_PLAYER"]),
+        "stages": timer.summary(),
+        "memory": memory,
+    }
+
+def print_report(report):
+    meta = report["meta"]
+    print(f"[INFO] Quelle: {meta['source']} | Kameras: {meta['cams']} | Takte: {meta['frames']} | Treffer: {report['hits']}")
+    print(f"{'Stufe':>10} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for stage, s in report["stages"].items():
+        print(f"{stage:>10} {s['n']:>6} {s['p50']:>8.2f} {s['p95']:>8.2f} {s['p99']:>8.2f} {s['max']:>8.2f}")
+    print(f"[INFO] FPS: {report['fps']:.1f} (ohne Lesen: {report['fps_processing']:.1f})")
+    for key, value in report["memory"].items():
+        print(f"[INFO] {key}: {value:.1f}")
+
+def compare(report, baseline):
+    """Stellt zwei Läufe gegenüber (Basis -> aktuell, Differenz in Prozent)."""
+    def delta(old, new):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "-"
+
+    print(f"{'Stufe':>10} {'p50 alt':>9} {'p50 neu':>9} {'Δ':>8} {'p95 alt':>9} {'p95 neu':>9} {'Δ':>8}")
+    for stage in STAGES:
+        old, new = baseline["stages"].get(stage), report["stages"].get(stage)
+        if old is None or new is None: continue
+        print(f"{stage:>10} {old['p50']:>9.2f} {new['p50']:>9.2f} {delta(old['p50'], new['p50']):>8}"
+              f" {old['p95']:>9.2f} {new['p95']:>9.2f} {delta(old['p95'], new['p95']):>8}")
+    for key in ("fps", "fps_processing"):
+        if key in baseline:
+            print(f"{key:>10} {baseline[key]:>9.1f} {report[key]:>9.1f} {delta(baseline[key], report[key]):>8}")
+    for key, value in report["memory"].items():
+        if key in baseline["memory"]:
+            print(f"{key:>10} {baseline['memory'][key]:>9.1f} {value:>9.1f} {delta(baseline['memory'][key], value):>8}")
+
+def option(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args): return args[i + 1]
+    return default
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--help" in args or "-h" in args:
+        print("Verwendung: python vision_bench.py [--replay <ordner> | --synth] [--frames N] [--cams 0,1,2]")
+        print("                                   [--json <datei>] [--compare <basis.json>]")
+        sys.exit(0)
+
+    frames = int(option(args, "--frames", 300))
+    replay_dir = option(args, "--replay")
+    if replay_dir:
+        from vision_sources import ReplaySession
+        session = ReplaySession(replay_dir, realtime=False)
+        report = run_bench(session.source_for, session.cam_ids, frames, label=replay_dir)
+    elif "--synth" in args:
+        # Gerendertes Board mit Würfen, Rauschen und Wackeln (vision_synth)
+        from vision_synth import SynthScene, SynthSource
+        cam_ids = [int(c) for c in option(args, "--cams", "0,1,2").split(",")]
+        scene = SynthScene(throws=max(1, frames // 30))
+        report = run_bench(partial(SynthSource, scene), cam_ids, frames, label="synth")
+    else:
+        from vision_workers import BenchSource
+        cam_ids = [int(c) for c in option(args, "--cams", "0,1,2").split(",")]
+        report = run_bench(partial(BenchSource, fps=0), cam_ids, frames)
+
+    print_report(report)
+    out = option(args, "--json")
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Ergebnis gespeichert: {out}")
+    base = option(args, "--compare")
+    if base:
+        with open(base) as f:
+            compare(report, json.load(f))
@@ -0,0 +1,263 @@
+import sys
+import threading
+import time
+
+import numpy as np
+
+from vision_sources import FrameSource
+
+class CaptureThread(threading.Thread):
+    """Liest eine Kamera im Hintergrund und hält nur das neueste Bild (1-Slot-Puffer)."""
+    def __init__(self, index, cam, group):
+        super().__init__(daemon=True)
+        self.index = index
+        self.cam = cam
+        self.group = group
+        self.running = True
+
+        self.lock = threading.Lock()
+        self.consumed = threading.Condition(self.lock)
+        self.frame = None
+        self.timestamp = 0.0
+        self.seq = 0
+        self.consumed_seq = 0
+        self.dropped = 0
+
+    def run(self):
+        tick = -1
+        while self.running:
+            tick = self.group.wait_tick(tick)
+            if not self.running: break
+
+            # Kamera wird noch (im Hintergrund) geöffnet: nicht Teil des Takts, die anderen warten nicht
+            if not self.cam.cap.isOpened():
+                time.sleep(0.1)
+                continue
+
+            # Lockstep-Quellen (Replay max. Tempo): erst grabben, wenn das letzte Bild abgeholt ist
+            if self.cam.cap.lockstep:
+                with self.lock:
+                    while self.running and self.seq != self.consumed_seq:
+                        self.consumed.wait(0.1)
+
+            # Angeforderten Aufnahme-Modus hier setzen (nur dieser Thread greift auf das Gerät zu)
+            self.cam.apply_capture_mode()
+
+            # grab() blockiert, bis das Bild da ist -> Zeitstempel danach nehmen (Zeitpunkt des Bildes,
+            # nicht des Takts), sonst sieht MAX_FRAME_SKEW eine verspätete Kamera nie
+            ok = self.cam.cap.grab()
+            if ok:
+                ts = self.cam.cap.frame_time() or time.time()
+                ret, frame = self.cam.cap.retrieve()
+                if ret and frame is not None:
+                    with self.lock:
+                        # Nicht abgeholtes Bild wird verworfen, nie gepuffert
+                        if self.seq != self.consumed_seq: self.dropped += 1
+                        self.frame, self.timestamp = frame, ts
+                        self.seq += 1
+            else:
+                time.sleep(0.05) # Kamera hängt / getrennt -> nicht im Kreis drehen
+
+            self.group.frame_done(self, tick)
+
+    def take(self):
+        """Gibt (frame, timestamp) zurück, falls seit dem letzten Abholen ein neues Bild da ist."""
+        with self.lock:
+            if self.frame is None or self.seq == self.consumed_seq:
+                return None, 0.0
+            self.consumed_seq = self.seq
+            self.consumed.notify_all()
+            return self.frame, self.timestamp
+
+class CaptureGroup:
+    """Ein CaptureThread pro Kamera, alle greifen auf einen gemeinsamen Takt (grab) zu.
+    Kameras, die noch geöffnet werden, bekommen schon ihren Thread und nehmen am Takt teil, sobald sie bereit sind."""
+    def __init__(self, cameras, tick_timeout=0.5):
+        self.tick_timeout = tick_timeout
+        self.cond = threading.Condition()
+        self.tick = 0
+        self.tick_start = time.time()
+        self.running = False
+
+        self.threads = [CaptureThread(i, cam, self) for i, cam in enumerate(cameras) if cam.cap is not None]
+        self.pending = {t.index for t in self.threads if t.cam.cap.isOpened()}
+
+    def start(self):
+        self.running = True
+        self.tick_start = time.time()
+        for t in self.threads: t.start()
+        print(f"[VISION] {len(self.threads)} Capture-Threads gestartet.")
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            for t in self.threads: t.running = False
+            self.cond.notify_all()
+        for t in self.threads:
+            if t.is_alive(): t.join(timeout=1.0)
+
+    def _advance(self):
+        # Neuer Takt: alle Threads dürfen wieder grabben
+        self.tick += 1
+        self.pending = {t.index for t in self.threads if t.is_alive() and t.cam.cap.isOpened()}
+        self.tick_start = time.time()
+        self.cond.notify_all()
+
+    def wait_tick(self, last_tick):
+        """Blockiert, bis ein neuer Takt nach last_tick beginnt."""
+        with self.cond:
+            while self.running and self.tick == last_tick:
+                remaining = self.tick_timeout - (time.time() - self.tick_start)
+                if remaining <= 0:
+                    # Eine hängende Kamera darf die anderen nicht blockieren
+                    self._advance()
+                    break
+                self.cond.wait(remaining)
+            return self.tick
+
+    def frame_done(self, thread, tick):
+        with self.cond:
+            if tick != self.tick: return # verspätet, gehört zu einem alten Takt
+            self.pending.discard(thread.index)
+            if not self.pending: self._advance()
+
+    def all_finished(self):
+        """True, wenn alle (endlichen) Quellen keine Bilder mehr liefern."""
+        return all(t.cam.cap.finished for t in self.threads)
+
+    def wait_set(self, last_tick, timeout=1.0):
+        """Wartet, bis seit last_tick ein Takt abgeschlossen ist. Gibt den aktuellen Takt zurück."""
+        with self.cond:
+            end = time.time() + timeout
+            while self.running and self.tick == last_tick:
+                remaining = end - time.time()
+                if remaining <= 0: break
+                self.cond.wait(remaining)
+            return self.tick
+
+    def latest_set(self):
+        """Liste von (index, frame, timestamp) aller Kameras mit neuem Bild."""
+        result = []
+        for t in self.threads:
+            frame, ts = t.take()
+            if frame is not None:
+                result.append((t.index, frame, ts))
+        return result
+
+    def read(self, index, skip=0, timeout=2.0):
+        """Wie cap.read(), aber über den Capture-Thread: verwirft `skip` Bilder und liefert das nächste."""
+        thread = next((t for t in self.threads if t.index == index), None)
+        if thread is None: return False, None
+
+        tick = self.tick
+        for _ in range(skip + 1):
+            new_tick = self.wait_set(tick, timeout)
+            if new_tick == tick: return False, None
+            tick = new_tick
+            # Bilder der anderen Kameras sind damit ebenfalls verbraucht (sonst stauen Lockstep-Quellen)
+            for t in self.threads:
+                with t.lock:
+                    t.consumed_seq = t.seq
+                    t.consumed.notify_all()
+        with thread.lock:
+            return thread.frame is not None, thread.frame
+
+class CaptureGovernor:
+    """Schaltet die Kameras zwischen voller Qualität ("active") und dem Idle-Modus (kleine Auflösung,
+    wenig FPS, siehe CAPTURE_MODES). Entscheidet nur anhand der Bild-Zeitstempel:
+    `idle_after` Sekunden ohne Aktivität -> idle, jede Aktivität -> sofort active.
+    Im Idle wird alle `wake_every` Sekunden für `wake_for` Sekunden aufgewacht, damit das
+    Hintergrundmodell der Beleuchtung folgt. idle_after=None: immer volle Qualität."""
+    def __init__(self, idle_after=5.0, wake_every=20.0, wake_for=2.0):
+        self.idle_after = idle_after
+        self.wake_every = wake_every
+        self.wake_for = wake_for
+        self.mode = "active"
+        self.last_activity = None
+        self.idle_since = 0.0
+        self.wake_until = None
+
+    @property
+    def idle(self):
+        return self.mode == "idle"
+
+    def update(self, ts, activity):
+        """Ein Takt. Gibt True zurück, wenn sich der Modus geändert hat."""
+        if self.idle_after is None: return False
+        if activity or self.last_activity is None:
+            self.last_activity = ts
+            self.wake_until = None
+            if activity and self.idle:
+                self.mode = "active"
+                return True
+            return False
+
+        if self.idle:
+            if ts - self.idle_since < self.wake_every: return False
+            self.mode = "active"
+            self.wake_until = ts + self.wake_for
+            return True
+        if self.wake_until is not None and ts < self.wake_until: return False
+        if self.wake_until is None and ts - self.last_activity < self.idle_after: return False
+        self.mode = "idle"
+        self.idle_since = ts
+        self.wake_until = None
+        return True
+
+# --- SELBSTTEST ---
+
+class DelayedSource(FrameSource):
+    """Testquelle: das Bild kommt `delay` Sekunden später an als bei den anderen Kameras."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def grab(self):
+        time.sleep(0.01 + self.delay)
+        return True
+
+    def retrieve(self):
+        return True, np.zeros((8, 8, 3), dtype=np.uint8)
+
+class TestCamera:
+    def __init__(self, source):
+        self.cap = source
+
+    def apply_capture_mode(self): pass
+
+def measure_sets(delays, sets=8):
+    """Startet eine CaptureGroup mit den Verzögerungen pro Kamera, gibt die Zeitstempel vollständiger Sets zurück."""
+    group = CaptureGroup([TestCamera(DelayedSource(d)) for d in delays])
+    group.start()
+    result, tick = [], group.tick
+    while len(result) < sets:
+        tick = group.wait_set(tick)
+        frames = group.latest_set()
+        if len(frames) == len(delays): result.append([ts for _, _, ts in frames])
+    group.stop()
+    return result
+
+def self_test():
+    from vision import DartVisionSystem
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    # Nur Geometrie (fuse_point), keine Bildquellen
+    system = DartVisionSystem(hit_callback=print, source_factory=lambda cam_id: None)
+    def fuse(timestamps):
+        # Alle Kameras sehen die Spitze am selben Punkt auf dem Board
+        data = [(cam_id, (500.0, 400.0), 1000, None, 10000, ts, ts) for cam_id, ts in zip(system.cam_ids, timestamps)]
+        return system.fuse_point(data)[0]
+
+    synced = measure_sets([0.0, 0.0, 0.0])
+    late = measure_sets([0.0, 0.0, 0.08])
+    skew = lambda sets: float(np.median([max(ts) - min(ts) for ts in sets]))
+    print(f"  Versatz im Set: synchron {skew(synced) * 1000:.1f} ms, eine Kamera +80 ms {skew(late) * 1000:.1f} ms")
+    check("synchrones Set wird fusioniert", all(fuse(ts) is not None for ts in synced))
+    check("verspätete Kamera -> Set verworfen (MAX_FRAME_SKEW)", all(fuse(ts) is None for ts in late))
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if self_test() else 1)
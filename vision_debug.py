@@ -0,0 +1,73 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+class OverlayLayer:
+    """Einmal gezeichnetes Overlay (Farbbild + Maske), das per cv2.copyTo in einem Schritt aufs Bild kommt.
+    draw(img) zeichnet auf ein schwarzes Bild; neu gezeichnet wird nur, wenn sich key (Geometrie) ändert."""
+    def __init__(self, draw):
+        self.draw = draw
+        self.key = None
+        self.layer = None
+        self.mask = None
+
+    def apply(self, frame, key=None):
+        key = (frame.shape, key)
+        if self.layer is None or key != self.key:
+            self.layer = np.zeros(frame.shape, frame.dtype)
+            self.draw(self.layer)
+            self.mask = self.layer.reshape(frame.shape[0], frame.shape[1], -1).any(axis=2).astype(np.uint8)
+            self.key = key
+        cv2.copyTo(self.layer, self.mask, frame)
+        return frame
+
+class DebugRenderer(threading.Thread):
+    """Debug-Fenster in einem eigenen Thread mit begrenzter Rate (Standard 5 Hz).
+    Der Vision-Loop erzeugt Debug-Bilder nur, wenn due() True ist, und übergibt sie mit submit().
+    Overlay, imshow und waitKey laufen komplett hier, nie im Vision-Loop."""
+    def __init__(self, overlay=None, rate=5.0):
+        super().__init__(daemon=True, name="VisionDebug")
+        self.overlay = overlay
+        self.interval = 1.0 / rate
+        self.next_due = 0.0
+        self.running = True
+        self.shown = False
+
+        self.lock = threading.Lock()
+        self.pending = None
+        self.new_frames = threading.Event()
+
+    def due(self):
+        """True, wenn in diesem Takt Debug-Bilder erzeugt werden sollen."""
+        return self.running and time.time() >= self.next_due
+
+    def submit(self, frames):
+        """frames: {cam_id: Bild}. Die Bilder gehören ab jetzt dem Renderer (nicht mehr verändern)."""
+        with self.lock:
+            self.pending = frames
+            self.next_due = time.time() + self.interval
+        self.new_frames.set()
+
+    def run(self):
+        while self.running:
+            if not self.new_frames.wait(0.1): continue
+            self.new_frames.clear()
+            with self.lock:
+                frames, self.pending = self.pending, None
+            if not frames: continue
+
+            for cam_id, img in frames.items():
+                if img is None: continue
+                if self.overlay is not None: self.overlay(img)
+                cv2.imshow(f"Cam {cam_id} Debug", img)
+                self.shown = True
+            cv2.waitKey(1)
+        # Fenster gehören diesem Thread -> hier auch schließen
+        if self.shown: cv2.destroyAllWindows()
+
+    def stop(self):
+        self.running = False
+        self.new_frames.set()
+        if self.is_alive(): self.join(timeout=1.0)
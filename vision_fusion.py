@@ -0,0 +1,139 @@
+import sys
+
+import numpy as np
+
+def camera_center(matrix, camera_matrix):
+    """Kameraposition (x, y, Höhe) in Canvas-Pixeln aus der Homographie (entzerrtes Bild -> Canvas)
+    und der Kamera-Matrix. Die Höhe ist positiv auf der Seite des Boards, auf der die Kamera steht."""
+    # Canvas -> normierte Kamerakoordinaten: Spalten sind (bis auf den Maßstab) r1, r2, t
+    h = np.linalg.inv(camera_matrix) @ np.linalg.inv(matrix)
+    scale = 2 / (np.linalg.norm(h[:, 0]) + np.linalg.norm(h[:, 1]))
+    if h[2, 2] < 0: scale = -scale # Board liegt vor der Kamera
+    r1, r2, t = (h * scale).T
+    rot = np.stack([r1, r2, np.cross(r1, r2)], axis=1)
+    # Geschätzte Intrinsik -> Rotation nur näherungsweise orthogonal, nächste echte Rotation nehmen
+    u, _, vt = np.linalg.svd(rot)
+    center = -(u @ vt).T @ t
+    return np.array([center[0], center[1], abs(center[2])])
+
+class Triangulator:
+    """Fusion der Kamera-Spitzen über die Sichtlinien (Kleinste Quadrate) statt Mittelwert der Warp-Punkte.
+    Jede Kamera sieht die Spitze als Punkt p auf der Board-Ebene (Canvas nach dem Warp). Ein Punkt in Höhe z
+    über dem Board landet dort um z * (p - C_xy) / C_z verschoben (Sichtlinie von der Kamera C durch den Punkt).
+    Pro Kamera also zwei lineare Gleichungen  (x, y) + z * (p - C_xy) / C_z = p,  gelöst für (x, y, z).
+    Liegt die Spitze auf dem Board, ist z = 0 und das Ergebnis das gewichtete Mittel.
+    Alle Längen in Canvas-Pixeln (~2 px/mm)."""
+    def __init__(self, centers, tip_noise=3.0, height_prior=40.0, max_residual=30.0):
+        # {cam_id: (x, y, Höhe)}; ohne Position (None) zählt die Kamera wie ein Punkt auf dem Board
+        self.centers = centers
+        self.TIP_NOISE = tip_noise         # px, erwartete Streuung einer Spitze
+        self.HEIGHT_PRIOR = height_prior   # px, Spitze liegt nahe am Board (hält z bei schlechter Geometrie fest)
+        self.MAX_RESIDUAL = max_residual   # px, weiter weg von der Lösung -> Kamera passt nicht zum Set
+
+    def solve(self, cam_ids, tips, weights):
+        """Eine Lösung mit allen Kameras. Gibt ein Dict mit point (x, y), height, sigma
+        (1-Sigma-Radius der Unsicherheit in px) und residuals {cam_id: px} zurück."""
+        tips = np.asarray(tips, dtype=np.float64)
+        n = len(tips)
+        w = np.asarray(weights, dtype=np.float64)
+        w = w / w.mean()
+
+        # Parallaxe pro Pixel Höhe
+        parallax = np.zeros((n, 2))
+        for i, cam_id in enumerate(cam_ids):
+            c = self.centers.get(cam_id)
+            if c is not None: parallax[i] = (tips[i] - c[:2]) / c[2]
+
+        a = np.zeros((2 * n + 1, 3))
+        a[0:2 * n:2, 0] = 1
+        a[1:2 * n:2, 1] = 1
+        a[:2 * n, 2] = parallax.ravel()
+        b = np.append(tips.ravel(), 0.0)
+        # Vorwissen z ~ 0 als zusätzliche Zeile
+        a[2 * n, 2] = 1
+        row_w = np.append(np.repeat(w, 2), (self.TIP_NOISE / self.HEIGHT_PRIOR) ** 2)
+
+        sw = np.sqrt(row_w)
+        normal = (a * row_w[:, None]).T @ a
+        x = np.linalg.lstsq(a * sw[:, None], b * sw, rcond=None)[0]
+
+        # Residuen als Abstand auf dem Board (wo die Kamera die Spitze der Lösung sehen würde)
+        err = (a[:2 * n] @ x - b[:2 * n]).reshape(n, 2)
+        heights = np.array([self.centers[c][2] if self.centers.get(c) is not None else np.inf for c in cam_ids])
+        residuals = np.hypot(err[:, 0], err[:, 1]) * heights / (heights - x[2])
+
+        dof = 2 * n - 3
+        noise = self.TIP_NOISE ** 2
+        if dof > 0: noise = max(noise, float(np.sum(w * residuals ** 2)) / dof)
+        cov = noise * np.linalg.inv(normal)
+        sigma = float(np.sqrt(cov[0, 0] + cov[1, 1]))
+        return {"point": (float(x[0]), float(x[1])), "height": float(x[2]), "sigma": sigma,
+                "residuals": {c: float(r) for c, r in zip(cam_ids, residuals)}, "cams": list(cam_ids)}
+
+    def fuse(self, cam_ids, tips, weights):
+        """Lösung mit Ausreißer-Test: passt eine Kamera nicht (Residuum > MAX_RESIDUAL), wird das beste
+        Set ohne eine Kamera genommen, solange zwei übrig bleiben. None, wenn sich die Kameras nicht einig sind."""
+        result = self.solve(cam_ids, tips, weights)
+        if max(result["residuals"].values()) <= self.MAX_RESIDUAL: return result
+        if len(cam_ids) <= 2: return None
+        # Jede Kamera einmal weglassen (eine falsche Kamera mit hohem Gewicht zieht die Lösung sonst zu sich)
+        subsets = [[j for j in range(len(cam_ids)) if j != i] for i in range(len(cam_ids))]
+        results = [self.fuse([cam_ids[j] for j in s], [tips[j] for j in s], [weights[j] for j in s]) for s in subsets]
+        results = [r for r in results if r is not None]
+        if not results: return None
+        return min(results, key=lambda r: max(r["residuals"].values()))
+
+# --- SELBSTTEST ---
+
+def project(center, point):
+    """Punkt (x, y, z) entlang der Sichtlinie von center auf die Board-Ebene."""
+    point = np.asarray(point, dtype=np.float64)
+    s = center[2] / (center[2] - point[2])
+    return center[:2] + (point[:2] - center[:2]) * s
+
+def self_test():
+    centers = {0: np.array([220.0, 1350.0, 800.0]), 1: np.array([-350.0, 0.0, 800.0]), 2: np.array([1350.0, 0.0, 800.0])}
+    fusion = Triangulator(centers)
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    # Spitze auf dem Board: gleiches Ergebnis wie das gewichtete Mittel
+    tips = [project(centers[c], (612.4, 380.7, 0)) for c in centers]
+    r = fusion.fuse(list(centers), tips, [1, 1, 1])
+    check("Punkt auf dem Board", np.allclose(r["point"], (612.4, 380.7), atol=1e-6) and abs(r["height"]) < 1e-6)
+
+    # Sichtbares Ende 30 px über dem Board: Warp-Punkte liegen auseinander, Lösung trifft den Fußpunkt
+    tips = [project(centers[c], (612.4, 380.7, 30)) for c in centers]
+    mean = np.mean(tips, axis=0)
+    r = fusion.fuse(list(centers), tips, [1, 1, 1])
+    check("Höhe über dem Board", np.hypot(*(np.array(r["point"]) - (612.4, 380.7))) < 1.0 < np.hypot(*(mean - (612.4, 380.7))))
+    print(f"  Mittel der Warp-Punkte {mean.round(1)}, Triangulation {np.round(r['point'], 1)}, Höhe {r['height']:.1f} px")
+
+    # Rauschen: Unsicherheit in der Größenordnung der Streuung
+    rng = np.random.default_rng(0)
+    errors, sigmas = [], []
+    for _ in range(500):
+        truth = rng.uniform(200, 800, 2)
+        tips = [project(centers[c], (*truth, rng.uniform(0, 20))) + rng.normal(0, 3, 2) for c in centers]
+        r = fusion.fuse(list(centers), tips, [1, 1, 1])
+        errors.append(np.hypot(*(np.array(r["point"]) - truth)))
+        sigmas.append(r["sigma"])
+    check("Unsicherheit passt zum Fehler", 0.5 < np.percentile(errors, 68) / np.median(sigmas) < 2.0)
+    print(f"  Fehler p68 {np.percentile(errors, 68):.2f} px, sigma Median {np.median(sigmas):.2f} px")
+
+    # Eine Kamera sieht etwas anderes: wird verworfen, die anderen beiden bleiben
+    tips = [project(centers[c], (400, 600, 0)) for c in centers]
+    tips[2] = tips[2] + (90, -40)
+    r = fusion.fuse(list(centers), tips, [1, 1, 3])
+    check("Ausreißer-Kamera verworfen", r is not None and r["cams"] == [0, 1] and np.allclose(r["point"], (400, 600), atol=1e-6))
+
+    # Zwei Kameras, die sich widersprechen: kein Punkt
+    # (Versatz quer zur Parallaxe, lässt sich nicht durch eine Höhe erklären)
+    check("widersprüchliches Paar", fusion.fuse([1, 2], [(400, 600), (400, 680)], [1, 1]) is None)
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if self_test() else 1)
@@ -0,0 +1,175 @@
+import sys
+import time
+
+import cv2
+import numpy as np
+
+CANVAS_SIZE = 1000
+CENTER = (CANVAS_SIZE // 2, CANVAS_SIZE // 2)
+
+# Sektoren gegen den Uhrzeigersinn, beginnend rechts (0°), 20 oben
+SEGMENTS = [6, 13, 4, 18, 1, 20, 5, 12, 9, 14, 11, 8, 16, 7, 19, 3, 17, 2, 15, 10]
+SEGMENT_VALUES = np.array(SEGMENTS, dtype=np.int64)
+
+def board_mm_to_px(canvas_size=CANVAS_SIZE):
+    """Skalierung wie im Warp: Double-Außenring (170 mm) auf 70% des halben Canvas."""
+    return (canvas_size / 2) * 0.70 / 170.0
+
+def board_radii(mm_to_px=None):
+    """Radien der Felder in Canvas-Pixeln."""
+    if mm_to_px is None: mm_to_px = board_mm_to_px()
+    # TRIPLE-RING KORREKTUR: 1mm nach innen gesetzt
+    return {
+        "bull": 6.35 * mm_to_px,
+        "single_bull": 15.9 * mm_to_px,
+        "triple_outer": (107.0 - 1.0) * mm_to_px, # 1mm nach innen
+        "triple_inner": (107.0 - 8.0 - 1.0) * mm_to_px, # 1mm nach innen
+        "double_outer": 170.0 * mm_to_px,
+        "double_inner": (170.0 - 8.0) * mm_to_px
+    }
+
+def sector_indices(rel_x, rel_y, winkel_offset=0):
+    """Index in SEGMENTS für Punkte relativ zur Mitte (Bild-Koordinaten, y nach unten)."""
+    angle = (np.degrees(np.arctan2(-rel_y, rel_x)) + 360) % 360
+    angle = (angle + winkel_offset) % 360
+    return (angle + 9) // 18 % 20
+
+def score_points(xs, ys, radii, winkel_offset=0, center=CENTER):
+    """Score für beliebig viele Canvas-Punkte in einem Aufruf.
+    Gibt (sector, multiplier, missed) als Arrays zurück, mit denselben Regeln wie get_score:
+    außerhalb des Double-Rings sector 0 / multiplier 1 / missed, Bull 25x2, Single-Bull 25x1."""
+    rel_x = np.asarray(xs, dtype=np.float64) - center[0]
+    rel_y = np.asarray(ys, dtype=np.float64) - center[1]
+    dist = np.sqrt(rel_x * rel_x + rel_y * rel_y)
+    values = SEGMENT_VALUES[sector_indices(rel_x, rel_y, winkel_offset).astype(np.int64)]
+
+    missed = dist > radii["double_outer"]
+    bull = dist <= radii["bull"]
+    single_bull = ~bull & (dist <= radii["single_bull"])
+    # Reihenfolge wie in get_score: erster Treffer gewinnt
+    sector = np.select([missed, bull | single_bull], [0, 25], values)
+    multiplier = np.select(
+        [missed, bull, single_bull,
+         (radii["triple_inner"] <= dist) & (dist <= radii["triple_outer"]),
+         (radii["double_inner"] <= dist) & (dist <= radii["double_outer"])],
+        [1, 2, 1, 3, 2], 1)
+    return sector, multiplier, missed
+
+def score_point(x, y, radii, winkel_offset=0):
+    """Einzelpunkt als Dict (Format der Treffer-Events)."""
+    sector, multiplier, missed = score_points([x], [y], radii, winkel_offset)
+    return {"sector": int(sector[0]), "multiplier": int(multiplier[0]), "is_missed": bool(missed[0])}
+
+# --- LABEL-MAP ---
+# Ein uint8-Label pro Canvas-Pixel: 0 = daneben, 1..20 Single, 21..40 Double, 41..60 Triple,
+# 61 Single-Bull, 62 Bull. LABEL_SECTOR / LABEL_MULTIPLIER übersetzen zurück.
+
+LABEL_SECTOR = np.array([0] + list(range(1, 21)) * 3 + [25, 25], dtype=np.int64)
+LABEL_MULTIPLIER = np.array([1] + [1] * 20 + [2] * 20 + [3] * 20 + [1, 2], dtype=np.int64)
+
+def score_labels(sector, multiplier, missed):
+    """Ergebnis von score_points -> Labels (uint8)."""
+    labels = np.where(sector == 25, 60 + multiplier, (multiplier - 1) * 20 + sector)
+    return np.where(missed, 0, labels).astype(np.uint8)
+
+def build_score_map(radii, winkel_offset=0, size=CANVAS_SIZE):
+    """Label für jedes ganzzahlige Canvas-Pixel (x, y), berechnet mit score_points."""
+    ys, xs = np.mgrid[0:size, 0:size]
+    return score_labels(*score_points(xs, ys, radii, winkel_offset))
+
+def label_score(label):
+    """Ein Label als Dict (Format von get_score)."""
+    return {"sector": int(LABEL_SECTOR[label]), "multiplier": int(LABEL_MULTIPLIER[label]), "is_missed": bool(label == 0)}
+
+def score_map_edges(labels, thickness=2):
+    """Maske der Feldgrenzen (Label wechselt zum Nachbarn), z.B. für das Spider-Overlay."""
+    edges = np.zeros(labels.shape, np.uint8)
+    edges[:, 1:] |= labels[:, 1:] != labels[:, :-1]
+    edges[1:, :] |= labels[1:, :] != labels[:-1, :]
+    if thickness > 1:
+        edges = cv2.dilate(edges, np.ones((thickness, thickness), np.uint8))
+    return edges.astype(bool)
+
+def field_heatmap(labels, xs, ys):
+    """Färbt jedes Feld nach der Anzahl Treffer (xs, ys ganzzahlige Canvas-Punkte)."""
+    xs, ys = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+    inside = (xs >= 0) & (ys >= 0) & (xs < labels.shape[1]) & (ys < labels.shape[0])
+    counts = np.bincount(labels[ys[inside], xs[inside]], minlength=256).astype(np.float64)
+    counts[0] = 0 # daneben nicht einfärben
+    lut = (counts / max(counts.max(), 1) * 255).astype(np.uint8)
+    heat = cv2.applyColorMap(cv2.LUT(labels, lut), cv2.COLORMAP_JET)
+    heat[labels == 0] = 0
+    return heat
+
+# --- SELBSTTEST ---
+
+def legacy_score(x, y, radii, winkel_offset=0):
+    """Die bisherige Einzelberechnung aus DartVisionSystem.get_score (Referenz für den Selbsttest).
+    Abstand wie in score_points als sqrt(dx*dx + dy*dy) statt np.linalg.norm: norm rechnet je nach BLAS
+    anders gerundet, genau auf einer Grenze entschiede dann die letzte Stelle statt der Regel."""
+    rel_x, rel_y = x - 500, y - 500
+    dist = np.sqrt(rel_x * rel_x + rel_y * rel_y)
+    if dist > radii["double_outer"]:
+        return {"sector": 0, "multiplier": 1, "is_missed": True}
+    angle = (np.degrees(np.arctan2(-rel_y, rel_x)) + 360) % 360
+    angle = (angle + winkel_offset) % 360
+    val = SEGMENTS[int((angle + 9) / 18) % 20]
+    if dist <= radii["bull"]: return {"sector": 25, "multiplier": 2, "is_missed": False}
+    if dist <= radii["single_bull"]: return {"sector": 25, "multiplier": 1, "is_missed": False}
+    if radii["triple_inner"] <= dist <= radii["triple_outer"]: return {"sector": val, "multiplier": 3, "is_missed": False}
+    if radii["double_inner"] <= dist <= radii["double_outer"]: return {"sector": val, "multiplier": 2, "is_missed": False}
+    return {"sector": val, "multiplier": 1, "is_missed": False}
+
+def self_test(random_points=200000):
+    """Vergleicht score_points mit der Einzelberechnung an allen Ring- und Sektorgrenzen und zufälligen Punkten."""
+    radii = board_radii()
+    rng = np.random.default_rng(0)
+    xs, ys = [], []
+
+    # Jede Ringgrenze, exakt und knapp innen/außen, in vielen Richtungen
+    phi = np.radians(np.arange(0, 360, 0.7))
+    for r in radii.values():
+        for eps in (-1e-6, -1e-9, 0.0, 1e-9, 1e-6):
+            xs.append(500 + (r + eps) * np.cos(phi))
+            ys.append(500 - (r + eps) * np.sin(phi))
+    # Jede Sektorgrenze, knapp links/rechts, über den ganzen Radius
+    rad = np.linspace(0, radii["double_outer"] * 1.05, 400)
+    for k in range(20):
+        for eps in (-1e-6, 0.0, 1e-6):
+            a = np.radians(k * 18 - 9 + eps)
+            xs.append(500 + rad * np.cos(a))
+            ys.append(500 - rad * np.sin(a))
+    # Ganzzahlige Canvas-Punkte (so kommen Treffer aus der Fusion) und Zufallspunkte
+    grid = np.arange(100, 901, 3)
+    gx, gy = np.meshgrid(grid, grid)
+    xs += [gx.ravel(), rng.uniform(100, 900, random_points)]
+    ys += [gy.ravel(), rng.uniform(100, 900, random_points)]
+    xs, ys = np.concatenate(xs), np.concatenate(ys)
+
+    # Grenzregel: Ringe schließen ihren Radius ein (Abstand sqrt(dx*dx + dy*dy) in float64), ein Punkt
+    # genau auf einer Sektorgrenze gehört zum Sektor gegen den Uhrzeigersinn. Auch dort keine Ausnahme.
+    mismatches = 0
+    for offset in (0, 9):
+        sector, multiplier, missed = score_points(xs, ys, radii, offset)
+        for i in range(len(xs)):
+            ref = legacy_score(xs[i], ys[i], radii, offset)
+            if (ref["sector"], ref["multiplier"], ref["is_missed"]) != (sector[i], multiplier[i], missed[i]):
+                mismatches += 1
+                if mismatches <= 10: print(f"[ERROR] Abweichung bei ({xs[i]}, {ys[i]}): {ref} vs {sector[i]}x{multiplier[i]}")
+    print(f"[INFO] {2 * len(xs)} Punkte geprüft, {mismatches} Abweichungen.")
+
+    n = 1000000
+    px, py = rng.uniform(0, CANVAS_SIZE, n), rng.uniform(0, CANVAS_SIZE, n)
+    t = time.perf_counter()
+    score_points(px, py, radii)
+    print(f"[INFO] {n} Punkte in {(time.perf_counter() - t) * 1000:.0f} ms.")
+
+    # Label-Map gegen die Einzelberechnung, jedes Pixel
+    labels = build_score_map(radii)
+    map_mismatches = sum(1 for y in range(CANVAS_SIZE) for x in range(CANVAS_SIZE)
+                         if label_score(labels[y, x]) != legacy_score(x, y, radii))
+    print(f"[INFO] Label-Map: {CANVAS_SIZE * CANVAS_SIZE} Pixel geprüft, {map_mismatches} Abweichungen.")
+    return mismatches == 0 and map_mismatches == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if self_test() else 1)
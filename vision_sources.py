@@ -0,0 +1,402 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+# Aufnahme-Modi (Breite, Höhe, FPS): volle Qualität für Würfe, klein und langsam solange das Board ruhig ist
+CAPTURE_MODES = {"active": (1920, 1080, 30), "idle": (960, 540, 10)}
+
+# Zustand einer Bildquelle (z.B. für die Lobby): wird geöffnet, liefert Bilder, Öffnen fehlgeschlagen (neuer Versuch läuft)
+OPENING, READY, FAILED = "opening", "ready", "failed"
+CAMERA_STATES = (OPENING, READY, FAILED)
+
+class FrameSource(ABC):
+    """Bildquelle mit der Schnittstelle von cv2.VideoCapture (isOpened/grab/retrieve/read/set/get/release).
+    CameraHandler arbeitet nur gegen diese Schnittstelle, egal ob Kamera, Aufnahme oder Synthetik.
+    Abstrakt: jede Quelle implementiert grab und retrieve (ohne Quelle: CameraHandler(cam_id), nur Geometrie)."""
+    # True, wenn eine endliche Quelle (z.B. Replay) keine Bilder mehr hat
+    finished = False
+    # True: Capture-Thread wartet, bis das letzte Bild abgeholt wurde (kein Verwerfen, z.B. Replay max. Tempo)
+    lockstep = False
+
+    def isOpened(self): return True
+    @abstractmethod
+    def grab(self): ...
+    @abstractmethod
+    def retrieve(self): ...
+    def set(self, prop, value): return False
+    def get(self, prop): return 0.0
+    def release(self): pass
+
+    @property
+    def status(self):
+        """OPENING, READY oder FAILED. Quellen ohne Gerät sind sofort bereit."""
+        return READY if self.isOpened() else FAILED
+
+    def set_mode(self, mode):
+        """Aufnahme-Modus aus CAPTURE_MODES setzen, ohne das Gerät neu zu öffnen.
+        False: Quelle hat eine feste Auflösung (Aufnahme, Synthetik), die Bilder bleiben wie sie sind."""
+        return False
+
+    def read(self):
+        if not self.grab(): return False, None
+        return self.retrieve()
+
+    def frame_time(self):
+        """Aufnahmezeitpunkt des zuletzt gegrabbten Bildes oder None (dann zählt die Uhr beim Grab)."""
+        return None
+
+class CameraSource(FrameSource):
+    """DirectShow-Kamera, startet mit 1080p @ 30 FPS (CAPTURE_MODES["active"]).
+    Geöffnet wird in einem eigenen Thread (DSHOW + Einschwingen dauert über eine Sekunde), der Konstruktor
+    kehrt sofort zurück und mehrere Kameras öffnen parallel. Bis dahin ist isOpened() False und grab()
+    liefert nichts. Schlägt das Öffnen fehl, wird es alle `retry_every` Sekunden im Hintergrund wiederholt."""
+    def __init__(self, cam_id, retry_every=5.0):
+        self.cam_id = cam_id
+        self.retry_every = retry_every
+        self.cap = None
+        self.state = OPENING
+        self.attempts = 0
+
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.opener = threading.Thread(target=self._open_loop, daemon=True, name=f"CameraOpen-{cam_id}")
+        self.opener.start()
+
+    def _open(self):
+        """Ein Versuch: Gerät öffnen und einstellen. Gibt das VideoCapture oder None zurück."""
+        cap = cv2.VideoCapture(self.cam_id, cv2.CAP_DSHOW)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        width, height, fps = CAPTURE_MODES["active"]
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.closed.wait(1.0)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        # Exposure Einstellungen für Stabilität
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1) # 1 = Manual
+        cap.set(cv2.CAP_PROP_EXPOSURE, -7)
+        cap.set(cv2.CAP_PROP_GAIN, 10)
+        if self.cam_id == 2: cap.set(cv2.CAP_PROP_BRIGHTNESS, 100)
+        else: cap.set(cv2.CAP_PROP_BRIGHTNESS, 150)
+        return cap
+
+    def _open_loop(self):
+        while not self.closed.is_set():
+            self.attempts += 1
+            cap = self._open()
+            with self.lock:
+                if cap is not None and not self.closed.is_set():
+                    self.cap, self.state = cap, READY
+                    print(f"[DEBUG] Kamera {self.cam_id} initialisiert (Versuch {self.attempts}).")
+                    return
+                if cap is None: self.state = FAILED
+            if cap is not None:
+                # Während des Öffnens freigegeben (App beendet, Kalibrierung)
+                cap.release()
+                return
+            # Nur beim ersten Fehlschlag melden, danach leise im Hintergrund weiter versuchen
+            if self.attempts == 1:
+                print(f"[ERROR] Kamera {self.cam_id} konnte nicht geöffnet werden! Neuer Versuch alle {self.retry_every:g} s.")
+            self.closed.wait(self.retry_every)
+
+    @property
+    def status(self):
+        return self.state
+
+    def isOpened(self): return self.state == READY
+    def grab(self): return self.state == READY and self.cap.grab()
+    def retrieve(self): return self.cap.retrieve()
+    def set(self, prop, value): return self.state == READY and self.cap.set(prop, value)
+    def get(self, prop): return self.cap.get(prop) if self.state == READY else 0.0
+
+    def read(self):
+        if self.state != READY: return False, None
+        return self.cap.read()
+
+    def release(self):
+        with self.lock:
+            self.closed.set()
+            if self.cap is not None: self.cap.release()
+            self.cap = None
+            if self.state == READY: self.state = FAILED
+
+    def set_mode(self, mode):
+        # Nur aus dem Thread aufrufen, der auch grabbt (VideoCapture ist nicht threadsicher)
+        if self.state != READY: return False
+        width, height, fps = CAPTURE_MODES[mode]
+        ok = self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width) and self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        return ok
+
+# --- AUFNAHME ---
+# Ordner mit meta.json, events.jsonl und chunk_00000.npz, chunk_00001.npz, ...
+# Jeder Chunk enthält `chunk_size` Bilder (alle Kameras gemischt, in Aufnahme-Reihenfolge):
+# die kodierten Bilder hintereinander in `data`, dazu pro Bild `cams`, `ts`, `offsets`, `sizes`.
+
+class Recorder:
+    """Speichert die Rohbilder aller Kameras (mit Zeitstempel) plus Treffer-Events in Chunks.
+    add_frame wartet nie: Kodieren und Schreiben laufen in einem eigenen Thread. Kommt der nicht hinterher
+    (Queue voll), wird das Bild verworfen und gezählt, statt Capture und Vision auszubremsen."""
+    def __init__(self, path, cam_ids, chunk_size=300, encoding=".jpg", quality=90, max_pending=30):
+        self.path = path
+        self.cam_ids = list(cam_ids)
+        self.chunk_size = chunk_size
+        self.encoding = encoding # ".jpg" ~10 ms pro 1080p-Bild, ".png" verlustfrei, aber ~30x langsamer
+        self.encode_params = [cv2.IMWRITE_PNG_COMPRESSION, 1] if encoding == ".png" else [cv2.IMWRITE_JPEG_QUALITY, quality]
+        os.makedirs(path, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.chunk_index = 0
+        self.num_frames = 0 # geschrieben
+        self.dropped = 0    # verworfen, weil der Schreib-Thread nicht hinterherkam
+        self.t0 = None
+        self.events = open(os.path.join(path, "events.jsonl"), "w")
+
+        # Einzelbilder an den Schreib-Thread, höchstens `max_pending` Rohbilder im Speicher
+        self.write_queue = queue.Queue(maxsize=max_pending)
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {"cam_ids": self.cam_ids, "chunk_size": self.chunk_size, "encoding": self.encoding,
+                "t0": self.t0, "num_frames": self.num_frames, "dropped": self.dropped}
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def add_frame(self, cam_index, frame, ts):
+        """Aus dem Capture-Thread: Bild übergeben, ohne auf den Schreib-Thread zu warten."""
+        with self.lock:
+            if self.t0 is None: self.t0 = ts
+        try:
+            self.write_queue.put_nowait((cam_index, frame, ts))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 100 == 0:
+                print(f"[WARN] Aufnahme: Schreiben zu langsam, bisher {dropped} Bilder verworfen.")
+
+    def add_event(self, event, ts=None):
+        item = {"ts": ts if ts is not None else time.time(), "event": event}
+        with self.lock:
+            self.events.write(json.dumps(item) + "\n")
+            self.events.flush()
+
+    def _write_loop(self):
+        blobs, cams, ts = [], [], []
+        while True:
+            item = self.write_queue.get()
+            if item is not None:
+                blobs.append(cv2.imencode(self.encoding, item[1], self.encode_params)[1].reshape(-1))
+                cams.append(item[0])
+                ts.append(item[2])
+            if blobs and (item is None or len(blobs) >= self.chunk_size):
+                self._write_chunk(blobs, cams, ts)
+                blobs, cams, ts = [], [], []
+            if item is None: break
+
+    def _write_chunk(self, blobs, cams, ts):
+        sizes = np.array([b.size for b in blobs], dtype=np.int64)
+        offsets = np.cumsum(sizes) - sizes
+        np.savez(os.path.join(self.path, f"chunk_{self.chunk_index:05d}.npz"),
+                 data=np.concatenate(blobs), offsets=offsets, sizes=sizes,
+                 cams=np.array(cams, dtype=np.int16), ts=np.array(ts, dtype=np.float64))
+        self.chunk_index += 1
+        self.num_frames += len(blobs)
+
+    def close(self):
+        self.write_queue.put(None) # Rest noch schreiben (hier darf gewartet werden)
+        self.writer.join()
+        self.events.close()
+        self._write_meta()
+        print(f"[INFO] Aufnahme gespeichert: {self.path} ({self.num_frames} Bilder, {self.dropped} verworfen)")
+
+class RecordingSource(FrameSource):
+    """Hängt sich zwischen CameraHandler und Quelle und schreibt jedes gelieferte Bild mit."""
+    def __init__(self, source, recorder, cam_index):
+        self.source = source
+        self.recorder = recorder
+        self.cam_index = cam_index
+        self.grab_ts = 0.0
+        self.lockstep = source.lockstep
+
+    @property
+    def finished(self):
+        return self.source.finished
+
+    @property
+    def status(self):
+        return self.source.status
+
+    def isOpened(self): return self.source.isOpened()
+    def set(self, prop, value): return self.source.set(prop, value)
+    def get(self, prop): return self.source.get(prop)
+    def release(self): self.source.release()
+    def frame_time(self): return self.source.frame_time()
+    def set_mode(self, mode): return self.source.set_mode(mode)
+
+    def grab(self):
+        ok = self.source.grab()
+        self.grab_ts = time.time() # nach dem Grab: Ankunft des Bildes
+        return ok
+
+    def retrieve(self):
+        ret, frame = self.source.retrieve()
+        if ret and frame is not None:
+            self.recorder.add_frame(self.cam_index, frame, self.source.frame_time() or self.grab_ts)
+        return ret, frame
+
+# --- WIEDERGABE ---
+
+class ReplaySession:
+    """Liest eine Aufnahme Chunk für Chunk und liefert jeder Kamera ihre Bilder in Aufnahme-Reihenfolge."""
+    def __init__(self, path, realtime=True, cached_chunks=3):
+        self.path = path
+        self.realtime = realtime
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.cam_ids = meta["cam_ids"]
+        self.t0 = meta.get("t0") or 0.0
+        self.start_wall = None
+        self.lock = threading.Lock()
+
+        # Pro Kamera: Liste von (chunk, zeile), wird beim Lesen der Chunks aufgebaut
+        self.index = [[] for _ in self.cam_ids]
+        self.indexed_chunks = 0
+        self.cached_chunks = cached_chunks
+        self.chunks = {}
+
+        self.events = []
+        events_file = os.path.join(path, "events.jsonl")
+        if os.path.exists(events_file):
+            with open(events_file) as f:
+                self.events = [json.loads(line) for line in f if line.strip()]
+
+    def sources(self):
+        return [ReplaySource(self, i) for i in range(len(self.cam_ids))]
+
+    def source_for(self, cam_id):
+        return ReplaySource(self, self.cam_ids.index(cam_id))
+
+    def _load_chunk(self, index):
+        if index not in self.chunks:
+            file = os.path.join(self.path, f"chunk_{index:05d}.npz")
+            if not os.path.exists(file): return None
+            with np.load(file) as npz:
+                self.chunks[index] = {key: npz[key] for key in ("data", "offsets", "sizes", "cams", "ts")}
+            # Nur wenige Chunks im Speicher halten, ältere werden bei Bedarf neu geladen
+            while len(self.chunks) > self.cached_chunks:
+                del self.chunks[min(k for k in self.chunks if k != index)]
+        return self.chunks[index]
+
+    def frame(self, cam_index, k):
+        """(frame, ts) des k-ten Bildes dieser Kamera, (None, None) am Ende der Aufnahme."""
+        with self.lock:
+            while k >= len(self.index[cam_index]):
+                chunk = self._load_chunk(self.indexed_chunks)
+                if chunk is None: return None, None
+                for row, cam in enumerate(chunk["cams"]):
+                    self.index[cam].append((self.indexed_chunks, row))
+                self.indexed_chunks += 1
+
+            chunk_index, row = self.index[cam_index][k]
+            chunk = self._load_chunk(chunk_index)
+            offset, size = chunk["offsets"][row], chunk["sizes"][row]
+            buf = chunk["data"][offset:offset + size]
+            ts = float(chunk["ts"][row])
+        return cv2.imdecode(buf, cv2.IMREAD_COLOR), ts
+
+    def clock(self, ts):
+        """Aufnahmezeit -> Wiedergabezeit (gleiche Abstände, Start = erster Abruf)."""
+        with self.lock:
+            if self.start_wall is None: self.start_wall = time.time()
+        return self.start_wall + (ts - self.t0)
+
+class ReplaySource(FrameSource):
+    """Eine Kamera aus einer Aufnahme, in Echtzeit oder so schnell wie möglich."""
+    def __init__(self, session, cam_index):
+        self.session = session
+        self.cam_index = cam_index
+        self.position = 0
+        self.pending = None
+        self.pending_ts = None
+        # Bei maximalem Tempo darf kein Bild verworfen werden
+        self.lockstep = not session.realtime
+
+    def grab(self):
+        frame, ts = self.session.frame(self.cam_index, self.position)
+        if frame is None:
+            self.finished = True
+            return False
+        self.position += 1
+
+        play_ts = self.session.clock(ts)
+        if self.session.realtime:
+            delay = play_ts - time.time()
+            if delay > 0: time.sleep(delay)
+        self.pending, self.pending_ts = frame, play_ts
+        return True
+
+    def retrieve(self):
+        if self.pending is None: return False, None
+        return True, self.pending
+
+    def frame_time(self):
+        return self.pending_ts
+
+# --- KOMMANDOZEILE ---
+
+def record(path, seconds):
+    """Live-Aufnahme aller Kameras inkl. erkannter Treffer."""
+    from vision import DartVisionSystem
+    system = DartVisionSystem(hit_callback=lambda hit: print(f"[HIT] {hit}"))
+    system.start_recording(path)
+    thread = threading.Thread(target=system.run, daemon=True)
+    thread.start()
+    time.sleep(seconds)
+    system.stop()
+    thread.join(timeout=2.0)
+    system.recorder.close()
+
+def replay(path, realtime=True):
+    """Spielt eine Aufnahme headless durch den kompletten run-Loop und vergleicht die Treffer."""
+    from vision import DartVisionSystem
+    session = ReplaySession(path, realtime=realtime)
+    hits = []
+    system = DartVisionSystem(hit_callback=hits.append, cam_ids=session.cam_ids,
+                              source_factory=session.source_for, show_debug=False)
+    start = time.time()
+    system.run()
+    elapsed = time.time() - start
+
+    # Zustandswechsel (vision_state) sind keine Treffer-Ereignisse, Zeitstempel (timing) unterscheiden sich immer
+    def hit_only(event):
+        return {k: v for k, v in event.items() if k != "timing"} if isinstance(event, dict) else event
+    recorded = [hit_only(e["event"]) for e in session.events if not (isinstance(e["event"], dict) and "state" in e["event"])]
+    hits = [hit_only(h) for h in hits]
+    print(f"[INFO] Replay: {system.frames_total} Takte in {elapsed:.1f}s ({system.frames_total / max(elapsed, 1e-9):.1f} FPS)")
+    print(f"[INFO] Treffer Aufnahme: {len(recorded)} | Treffer Replay: {len(hits)}")
+    for i in range(max(len(recorded), len(hits))):
+        a = recorded[i] if i < len(recorded) else "-"
+        b = hits[i] if i < len(hits) else "-"
+        print(f"  {'OK ' if a == b else 'XX '} {a}  |  {b}")
+    return hits
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == "record":
+        record(args[1], float(args[2]) if len(args) > 2 else 60.0)
+    elif len(args) >= 2 and args[0] == "replay":
+        replay(args[1], realtime="--max-speed" not in args)
+    else:
+        print("Verwendung: python vision_sources.py record <ordner> [sekunden]")
+        print("            python vision_sources.py replay <ordner> [--max-speed]")
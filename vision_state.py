@@ -0,0 +1,200 @@
+import json
+import sys
+from collections import deque
+
+import numpy as np
+
+# Zustände eines Wurfs
+IDLE = "idle"           # Board ruhig, warten auf einen Pfeil
+MOTION = "motion"       # Board bewegt sich (Freeze-Check), Kandidat verworfen
+SETTLING = "settling"   # Fusionierter Punkt gesehen, warten auf Bestätigung im nächsten Takt
+CONFIRMED = "confirmed" # Treffer gemeldet, Referenz setzt sich (cooldown)
+TAKEOUT = "takeout"     # Hand/Pfeile ziehen, warten bis das Board wieder ruhig ist
+
+class ThrowStateMachine:
+    """Ablauf eines Wurfs als Zustandsautomat: idle -> motion -> settling -> confirmed -> takeout.
+    Arbeitet nur mit den Zeitstempeln der Bilder (nie time.time(), nie sleep), damit Aufnahmen und
+    Beobachtungs-Streams reproduzierbar sind. step() bekommt die Beobachtung eines Takts und gibt
+    die Aktionen für das Vision-System zurück:
+      ("hit", point, score)  Treffer bestätigt
+      ("cleared",)           Alle Darts entfernt (NEXT_PLAYER, neue Referenz)
+      ("pulled",)            Pfeile wurden gezogen, Board wieder ruhig (neue Referenz)
+    Jeder Zustandswechsel geht als Ereignis {"ts", "from", "to", "reason"} an on_event."""
+    def __init__(self, on_event=None, confirm_window=0.2, confirm_dist=20, hit_cooldown=0.3,
+                 repeat_dist=40, quiet_ticks=15, history=1000):
+        self.on_event = on_event
+        self.CONFIRM_WINDOW = confirm_window # Sekunden zwischen Kandidat und Bestätigung
+        self.CONFIRM_DIST = confirm_dist     # px zwischen Kandidat und Bestätigung
+        self.HIT_COOLDOWN = hit_cooldown     # Sekunden nach einem Treffer ohne neue Kandidaten
+        self.REPEAT_DIST = repeat_dist       # px: näher am letzten Treffer -> derselbe Pfeil
+        self.QUIET_TICKS = quiet_ticks       # ruhige Takte, bis das Ziehen als beendet gilt
+
+        self.state = IDLE
+        self.ts = 0.0
+        self.candidate = None
+        self.candidate_ts = 0.0
+        self.hit_ts = None
+        self.last_hit = None
+        self.darts = 0
+        self.quiet = 0
+        self.events = deque(maxlen=history)
+
+    def transition(self, state, ts, reason):
+        if state == self.state: return
+        event = {"ts": ts, "from": self.state, "to": state, "reason": reason}
+        self.state = state
+        self.events.append(event)
+        if self.on_event is not None: self.on_event(event)
+
+    def reset(self, ts):
+        """Board leer (Takeout/Ziehen): keine Pfeile mehr, zurück nach idle."""
+        self.darts = 0
+        self.last_hit = None
+        self.candidate = None
+        self.quiet = 0
+        self.transition(IDLE, ts, "reset")
+
+    def step(self, ts, moving=False, empty=False, hand=False, quiet=True, point=None, score=None):
+        """Ein Takt. moving: Freeze-Check einer Kamera, empty: keine Kamera sieht eine Änderung,
+        hand: große Fläche (Hand am Board), quiet: keine nennenswerte Fläche,
+        point: fusionierter Punkt (x, y) oder None, score: get_score des Punkts (None = nicht zählbar)."""
+        self.ts = ts
+        actions = []
+
+        if hand and self.state != TAKEOUT:
+            self.quiet = 0
+            self.transition(TAKEOUT, ts, "hand")
+
+        # --- Bewegung: Kandidat verwerfen ---
+        if moving:
+            self.candidate = None
+            if self.state in (IDLE, SETTLING): self.transition(MOTION, ts, "moving")
+        elif self.state == MOTION:
+            self.transition(IDLE, ts, "still")
+
+        # --- Alle Darts entfernt ---
+        if empty and self.last_hit is not None:
+            actions.append(("cleared",))
+            self.reset(ts)
+
+        # --- Nach einem Treffer: Referenz setzt sich, keine neuen Kandidaten ---
+        cooling = self.hit_ts is not None and ts - self.hit_ts <= self.HIT_COOLDOWN
+        if self.state == CONFIRMED and not cooling:
+            self.transition(IDLE, ts, "ready")
+
+        if point is not None and not cooling:
+            hit = self.confirm(ts, point, score)
+            if hit: actions.append(hit)
+
+        # --- Ziehen beendet, wenn das Board lange genug ruhig ist ---
+        if self.state == TAKEOUT:
+            self.quiet = self.quiet + 1 if quiet else 0
+            if self.quiet > self.QUIET_TICKS:
+                actions.append(("pulled",))
+                self.reset(ts)
+        return actions
+
+    def confirm(self, ts, point, score):
+        """Zwei aufeinanderfolgende Punkte nah beieinander und kurz hintereinander -> Treffer."""
+        if self.candidate is None or not (np.hypot(point[0] - self.candidate[0], point[1] - self.candidate[1]) < self.CONFIRM_DIST
+                                          and ts - self.candidate_ts < self.CONFIRM_WINDOW):
+            self.candidate, self.candidate_ts = point, ts
+            if self.state in (IDLE, MOTION): self.transition(SETTLING, ts, "candidate")
+            return None
+
+        # Noch derselbe Pfeil wie beim letzten Treffer
+        if self.last_hit is not None and np.hypot(point[0] - self.last_hit[0], point[1] - self.last_hit[1]) < self.REPEAT_DIST:
+            if self.state == SETTLING: self.transition(IDLE, ts, "repeat")
+            return None
+        if score is None: return None
+
+        self.candidate = None
+        self.hit_ts = ts
+        self.last_hit = point
+        self.darts += 1
+        self.transition(CONFIRMED, ts, "hit")
+        return ("hit", point, score)
+
+    def latencies(self):
+        """Sekunden vom ersten Kandidaten (settling) bis zum bestätigten Treffer, pro Treffer."""
+        result, start = [], None
+        for e in self.events:
+            if e["to"] == SETTLING and start is None: start = e["ts"]
+            elif e["to"] == CONFIRMED and start is not None:
+                result.append(e["ts"] - start)
+                start = None
+            elif e["to"] in (IDLE, TAKEOUT, MOTION) and e["reason"] != "ready": start = None
+        return result
+
+def run_stream(observations, **kw):
+    """Spielt einen Stream von Beobachtungen (Dicts mit den Argumenten von step) ab.
+    Gibt (Aktionen, Ereignisse) zurück, z.B. für Tests mit aufgezeichneten Detektionen."""
+    machine = ThrowStateMachine(**kw)
+    actions = []
+    for obs in observations:
+        obs = dict(obs)
+        if obs.get("point") is not None: obs["point"] = tuple(obs["point"])
+        actions += machine.step(**obs)
+    return actions, list(machine.events), machine
+
+# --- SELBSTTEST ---
+
+def scripted(fps=30.0):
+    """Ein Ablauf mit zwei Pfeilen, Bewegung, Ausreißer, Hand und Ziehen."""
+    obs, t = [], 0.0
+    def tick(n=1, **kw):
+        nonlocal t
+        for _ in range(n):
+            obs.append(dict(ts=round(t, 4), **kw))
+            t += 1 / fps
+    score = {"sector": 20, "multiplier": 1, "is_missed": False}
+    tick(10, empty=True)
+    tick(3, moving=True)                                 # Pfeil fliegt ein / Board schwingt
+    tick(1, point=(500, 300), score=score)               # Kandidat
+    tick(1, point=(503, 301), score=score)               # Bestätigung -> Treffer
+    tick(5, point=(503, 301), score=score)               # cooldown: kein zweiter Treffer
+    tick(20)
+    tick(1, point=(502, 302), score=score)               # derselbe Pfeil nach dem cooldown
+    tick(1, point=(501, 302), score=score)
+    tick(1, point=(300, 500), score=score)               # Kandidat ...
+    tick(1, point=(360, 500), score=score)               # ... springt -> neuer Kandidat
+    tick(1, point=(361, 501), score=score)               # Bestätigung -> zweiter Treffer
+    tick(15)
+    tick(5, hand=True, quiet=False)                      # Hand am Board
+    tick(17)                                             # ruhig -> gezogen
+    tick(5, point=(400, 400), score=None)                # nicht zählbar (daneben)
+    return obs
+
+def self_test():
+    actions, events, machine = run_stream(scripted())
+    ok = True
+    def check(name, cond):
+        nonlocal ok
+        print(f"[{'INFO' if cond else 'ERROR'}] {name}: {'ok' if cond else 'FEHLER'}")
+        ok = ok and cond
+
+    kinds = [a[0] for a in actions]
+    check("zwei Treffer, dann gezogen", kinds == ["hit", "hit", "pulled"])
+    check("Trefferpunkte", [a[1] for a in actions if a[0] == "hit"] == [(503, 301), (361, 501)])
+    states = [e["to"] for e in events]
+    check("Zustandsfolge", states[:5] == [MOTION, IDLE, SETTLING, CONFIRMED, IDLE] and TAKEOUT in states)
+    check("Ereignisse zeitlich geordnet", all(a["ts"] <= b["ts"] for a, b in zip(events, events[1:])))
+    # Zweiter Treffer: Kandidat springt einmal -> zwei Takte
+    check("Latenz Kandidat -> Treffer", [round(x * 30) for x in machine.latencies()] == [1, 2])
+
+    cleared, _, _ = run_stream([dict(ts=0.0, point=(1, 1), score={}), dict(ts=0.03, point=(1, 1), score={}),
+                                dict(ts=0.5, empty=True)])
+    check("leeres Board nach Treffer -> cleared", [a[0] for a in cleared] == ["hit", "cleared"])
+    for e in events: print(f"  {e['ts']:7.3f}  {e['from']:>9} -> {e['to']:<9} ({e['reason']})")
+    return ok
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Beobachtungen als JSON-Zeilen (ts, moving, empty, hand, quiet, point, score)
+        with open(sys.argv[1]) as f:
+            actions, events, machine = run_stream(json.loads(line) for line in f if line.strip())
+        for e in events: print(f"{e['ts']:.3f}  {e['from']:>9} -> {e['to']:<9} ({e['reason']})")
+        lat = machine.latencies()
+        if lat: print(f"[INFO] Kandidat -> Treffer: {len(lat)} Treffer, Mittel {np.mean(lat) * 1000:.0f} ms, max {np.max(lat) * 1000:.0f} ms")
+    else:
+        sys.exit(0 if self_test() else 1)
@@ -0,0 +1,402 @@
+import json
+import os
+import sys
+import threading
+import time
+from functools import partial
+
+import cv2
+import numpy as np
+from vision_sources import FrameSource
+from vision_geometry import SEGMENTS, board_mm_to_px, board_radii, field_heatmap, score_points, sector_indices
+
+CANVAS_SIZE = 1000
+RAW_SIZE = (1920, 1080)
+
+# Farben (BGR)
+WALL = (95, 105, 115)
+SURROUND = (25, 25, 25)
+BLACK = (35, 35, 35)
+CREAM = (190, 220, 235)
+RED = (45, 45, 190)
+GREEN = (60, 135, 45)
+WIRE = (170, 170, 170)
+HAND = (120, 150, 205)
+
+def render_board(radii, winkel_offset=0, size=CANVAS_SIZE):
+    """Zeichnet das Board so, wie es nach dem Warp im Canvas liegt.
+    Gleiche Radien, Sektor-Reihenfolge und Winkelkonvention wie get_score (vision_geometry)."""
+    c = size / 2
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float64)
+    rel_x, rel_y = xs - c, ys - c
+    dist = np.hypot(rel_x, rel_y)
+    sector = sector_indices(rel_x, rel_y, winkel_offset).astype(np.int32)
+    # Wie am echten Board: 20 hat ein schwarzes Single-Feld und rote Ringe
+    dark = (sector % 2) == (SEGMENTS.index(20) % 2)
+
+    img = np.empty((size, size, 3), np.uint8)
+    img[:] = WALL
+    img[dist <= radii["double_outer"] * 1.2] = SURROUND
+    inside = dist <= radii["double_outer"]
+    img[inside & dark] = BLACK
+    img[inside & ~dark] = CREAM
+    for inner, outer in (("double_inner", "double_outer"), ("triple_inner", "triple_outer")):
+        ring = (dist >= radii[inner]) & (dist <= radii[outer])
+        img[ring & dark] = RED
+        img[ring & ~dark] = GREEN
+    img[dist <= radii["single_bull"]] = GREEN
+    img[dist <= radii["bull"]] = RED
+
+    # Drähte
+    center = (int(c), int(c))
+    for key in ("bull", "single_bull", "triple_inner", "triple_outer", "double_inner", "double_outer"):
+        cv2.circle(img, center, int(round(radii[key])), WIRE, 1, cv2.LINE_AA)
+    for k in range(20):
+        a = np.radians(k * 18 - 9 - winkel_offset)
+        p0 = (c + radii["single_bull"] * np.cos(a), c - radii["single_bull"] * np.sin(a))
+        p1 = (c + radii["double_outer"] * np.cos(a), c - radii["double_outer"] * np.sin(a))
+        cv2.line(img, tuple(int(v) for v in p0), tuple(int(v) for v in p1), WIRE, 1, cv2.LINE_AA)
+
+    # Zahlenring
+    for k, value in enumerate(SEGMENTS):
+        a = np.radians(k * 18 - winkel_offset)
+        r = radii["double_outer"] * 1.1
+        text = str(value)
+        (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+        org = (int(c + r * np.cos(a) - tw / 2), int(c - r * np.sin(a) + th / 2))
+        cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.8, (230, 230, 230), 2, cv2.LINE_AA)
+    return img
+
+class SynthScene:
+    """Zeitachse einer synthetischen Session (Würfe, Takeouts) mit bekannter Wahrheit pro Wurf.
+    Alle Kameras teilen sich die Szene, jede rendert daraus ihre eigene Ansicht (SynthSource)."""
+    def __init__(self, radii=None, winkel_offset=0, throws=30, fps=30, seed=0,
+                 darts_per_turn=3, frames_per_throw=30, lead_in=40, takeout_frames=20, after_takeout=45,
+                 spread=25.0, noise=3.0, light=0.04, motion_blur=25, vibration=1.5, dart_length=130):
+        self.radii = radii if radii is not None else board_radii()
+        self.fps = fps
+        self.rng = np.random.default_rng(seed)
+        self.board = render_board(self.radii, winkel_offset)
+        self.winkel_offset = winkel_offset
+
+        # Störungen
+        self.noise = noise             # Sensorrauschen (Standardabweichung in Grauwerten)
+        self.light = light             # Helligkeitsschwankung (relativ)
+        self.motion_blur = motion_blur # Länge der Bewegungsunschärfe im Einschlagsbild (px)
+        self.vibration = vibration     # Kamerawackeln nach dem Einschlag (Amplitude in Rohbild-px)
+        self.dart_length = dart_length # Länge des Pfeils in der Board-Ebene (px)
+
+        # --- ZEITACHSE ---
+        # Ein Wurf steckt ab `frame` bis `removed`, ein Takeout zeigt von `start` bis `end` eine Hand
+        self.throws = []
+        self.takeouts = []
+        frame = lead_in
+        turn = []
+        for i in range(throws):
+            x, y = self.random_target(spread)
+            throw = {"index": i, "frame": frame, "removed": None, "x": float(x), "y": float(y),
+                     "tilt": float(self.rng.normal(0, 12)), "score": None}
+            self.throws.append(throw)
+            turn.append(throw)
+            frame += frames_per_throw
+            if len(turn) == darts_per_turn or i == throws - 1:
+                start = frame
+                for t in turn: t["removed"] = start + takeout_frames // 2
+                self.takeouts.append({"start": start, "end": start + takeout_frames,
+                                      "side": float(self.rng.uniform(0, 2 * np.pi))})
+                frame = start + takeout_frames + after_takeout
+                turn = []
+        self.num_frames = frame
+
+        # Wahrheit für alle Würfe in einem Aufruf (gleiche Regeln wie get_score)
+        if self.throws:
+            sectors, multipliers, missed = score_points([t["x"] for t in self.throws], [t["y"] for t in self.throws],
+                                                        self.radii, winkel_offset)
+            for t, sector, multiplier, is_missed in zip(self.throws, sectors, multipliers, missed):
+                t["score"] = {"sector": int(sector), "multiplier": int(multiplier), "is_missed": bool(is_missed)}
+
+        # Gemeinsame Rauschbank (int8, Rohbild-Größe) statt Rauschen pro Bild
+        self.noise_bank = []
+        for _ in range(4 if noise > 0 else 0):
+            n = np.empty((RAW_SIZE[1], RAW_SIZE[0], 3), np.int8)
+            cv2.randn(n, 0, noise)
+            self.noise_bank.append(n)
+
+        self.lock = threading.Lock()
+        self.t0 = None
+        self.position = 0 # Höchster bisher gelieferter Bild-Index (für die Auswertung)
+
+    def random_target(self, spread):
+        """Zielt auf ein zufälliges Feld (Single/Triple/Double/Bull) und streut um den Zielpunkt."""
+        r = self.radii
+        ring = self.rng.choice(["single_in", "triple", "single_out", "double", "bull"], p=[0.25, 0.25, 0.2, 0.2, 0.1])
+        if ring == "bull":
+            radius = 0.0
+        else:
+            bounds = {"single_in": (r["single_bull"], r["triple_inner"]), "triple": (r["triple_inner"], r["triple_outer"]),
+                      "single_out": (r["triple_outer"], r["double_inner"]), "double": (r["double_inner"], r["double_outer"])}[ring]
+            radius = sum(bounds) / 2
+        a = np.radians(self.rng.integers(20) * 18 - self.winkel_offset)
+        x = CANVAS_SIZE / 2 + radius * np.cos(a) + self.rng.normal(0, spread)
+        y = CANVAS_SIZE / 2 - radius * np.sin(a) + self.rng.normal(0, spread)
+        return x, y
+
+    def darts_at(self, k):
+        return [t for t in self.throws if t["frame"] <= k and (t["removed"] is None or k < t["removed"])]
+
+    def takeout_at(self, k):
+        return next((t for t in self.takeouts if t["start"] <= k < t["end"]), None)
+
+    def frame_time(self, k):
+        with self.lock:
+            if self.t0 is None: self.t0 = time.time()
+            self.position = max(self.position, k)
+        return self.t0 + k / self.fps
+
+    def render_canvas(self, k, away, cam_seed):
+        """Canvas-Bild (1000x1000) für Bild k aus Sicht einer Kamera.
+        `away`: Einheitsvektor von der Kamera weg, in diese Richtung fällt der Pfeil im entzerrten Bild."""
+        canvas = self.board.copy()
+        for throw in self.darts_at(k):
+            self.draw_dart(canvas, throw, away, blurred=(k == throw["frame"]))
+
+        takeout = self.takeout_at(k)
+        if takeout is not None:
+            # Hand fährt von außen zur Mitte und wieder zurück
+            phase = (k - takeout["start"]) / max(1, takeout["end"] - takeout["start"] - 1)
+            reach = self.radii["double_outer"] * (1.3 - 1.6 * min(phase, 1 - phase))
+            a = takeout["side"] + 0.05 * cam_seed
+            center = (int(CANVAS_SIZE / 2 + reach * np.cos(a)), int(CANVAS_SIZE / 2 + reach * np.sin(a)))
+            cv2.ellipse(canvas, center, (170, 95), np.degrees(a), 0, 360, HAND, -1, cv2.LINE_AA)
+        return canvas
+
+    def draw_dart(self, canvas, throw, away, blurred=False):
+        tip = np.array([throw["x"], throw["y"]])
+        t = np.radians(throw["tilt"])
+        d = np.array([away[0] * np.cos(t) - away[1] * np.sin(t), away[0] * np.sin(t) + away[1] * np.cos(t)])
+        n = np.array([-d[1], d[0]])
+        L = self.dart_length
+
+        def pt(along, side=0.0):
+            p = tip + d * along * L + n * side
+            return (int(round(p[0])), int(round(p[1])))
+
+        def shape(img, colors):
+            # Spitze (dünn) -> Barrel -> Schaft -> Flight (breit)
+            cv2.line(img, pt(0.0), pt(0.1), colors[0], 2, cv2.LINE_AA)
+            cv2.line(img, pt(0.1), pt(0.45), colors[1], 9, cv2.LINE_AA)
+            cv2.line(img, pt(0.45), pt(0.7), colors[2], 5, cv2.LINE_AA)
+            flight = np.array([pt(0.65), pt(0.8, 18), pt(1.0, 18), pt(1.0, -18), pt(0.8, -18)], np.int32)
+            cv2.fillPoly(img, [flight], colors[3], cv2.LINE_AA)
+
+        # Weicher Schatten neben dem Pfeil (Licht von oben links)
+        shadow = np.zeros(canvas.shape[:2], np.uint8)
+        shape(shadow, (255, 255, 255, 255))
+        x, y, w, h = cv2.boundingRect(shadow)
+        if w and h:
+            pad = 20
+            x0, y0, x1, y1 = max(0, x - pad), max(0, y - pad), min(CANVAS_SIZE, x + w + pad), min(CANVAS_SIZE, y + h + pad)
+            s = cv2.warpAffine(shadow[y0:y1, x0:x1], np.float32([[1, 0, 6], [0, 1, 8]]), (x1 - x0, y1 - y0))
+            s = cv2.GaussianBlur(s, (9, 9), 0).astype(np.float32) / 255
+            region = canvas[y0:y1, x0:x1].astype(np.float32)
+            canvas[y0:y1, x0:x1] = (region * (1 - 0.5 * s[..., None])).astype(np.uint8)
+        shape(canvas, ((200, 200, 200), (150, 150, 150), (30, 30, 30), (40, 210, 240)))
+
+        if blurred and self.motion_blur > 1:
+            # Einschlagsbild: Pfeil noch in Bewegung -> Unschärfe entlang der Flugrichtung
+            m = self.motion_blur
+            x0, y0 = (int(min(tip[0], tip[0] + d[0] * L)) - m - 15, int(min(tip[1], tip[1] + d[1] * L)) - m - 15)
+            x1, y1 = (int(max(tip[0], tip[0] + d[0] * L)) + m + 15, int(max(tip[1], tip[1] + d[1] * L)) + m + 15)
+            x0, y0, x1, y1 = max(0, x0), max(0, y0), min(CANVAS_SIZE, x1), min(CANVAS_SIZE, y1)
+            if x1 > x0 and y1 > y0:
+                kernel = np.zeros((m, m), np.float32)
+                c = (m - 1) / 2
+                cv2.line(kernel, (int(c - d[0] * c), int(c - d[1] * c)), (int(c + d[0] * c), int(c + d[1] * c)), 1.0, 1)
+                kernel /= max(kernel.sum(), 1e-6)
+                canvas[y0:y1, x0:x1] = cv2.filter2D(canvas[y0:y1, x0:x1], -1, kernel)
+
+    def shake(self, k, cam_seed):
+        """Kamerawackeln (dx, dy) in Rohbild-Pixeln: gedämpfte Schwingung nach jedem Einschlag."""
+        dx = dy = 0.0
+        for throw in self.throws:
+            dt = k - throw["frame"]
+            if 0 <= dt < 12:
+                amp = self.vibration * np.exp(-dt / 3.0)
+                phase = throw["index"] * 1.7 + cam_seed
+                dx += amp * np.sin(dt * 2.3 + phase)
+                dy += amp * np.cos(dt * 2.9 + phase)
+        return dx, dy
+
+    def ground_truth(self):
+        return [{key: t[key] for key in ("index", "frame", "x", "y", "score")} for t in self.throws]
+
+def raw_to_canvas_maps(cam):
+    """Für jedes Rohbild-Pixel die Canvas-Koordinate: exakte Umkehrung von CameraHandler.get_warped."""
+    w, h = RAW_SIZE
+    camera_matrix, dist_coeffs = cam.get_cam_intrinsic(np.empty((h, w), np.uint8))
+    xs, ys = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+    raw = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2)
+    undist = cv2.undistortPoints(raw, camera_matrix, dist_coeffs, P=camera_matrix)
+    canvas = cv2.perspectiveTransform(undist, cam.matrix).reshape(h, w, 2)
+    canvas[~np.isfinite(canvas).all(axis=2)] = -1
+    return canvas
+
+class SynthSource(FrameSource):
+    """Rohbild (1920x1080) einer Kamera auf die synthetische Szene, mit Rauschen, Licht und Wackeln.
+    Nutzt die Kalibrierpunkte aus camN_config.json, der Warp der Pipeline ergibt wieder das Board."""
+    def __init__(self, scene, cam_id, realtime=False):
+        from vision import CameraHandler
+        self.scene = scene
+        self.cam_id = cam_id
+        self.realtime = realtime
+        # Ohne Echtzeit darf kein Bild verworfen werden (reproduzierbare Auswertung)
+        self.lockstep = not realtime
+
+        geometry = CameraHandler(cam_id)
+        if geometry.matrix is None:
+            raise RuntimeError(f"Keine Kalibrierung für Cam {cam_id} (cam{cam_id}_config.json)")
+        canvas = raw_to_canvas_maps(geometry)
+        self.map1, self.map2 = cv2.convertMaps(canvas, None, cv2.CV_16SC2)
+
+        # Richtung zur Kamera: unterer Bildrand liegt ihr am nächsten
+        bottom = canvas[RAW_SIZE[1] - 1, RAW_SIZE[0] // 2]
+        toward = bottom - CANVAS_SIZE / 2
+        self.away = -toward / max(np.linalg.norm(toward), 1e-6)
+
+        self.rng = np.random.default_rng(1000 + cam_id)
+        self.light_phase = self.rng.uniform(0, 2 * np.pi)
+        self.position = 0
+        self.pending = None
+        self.next_t = 0.0
+
+    def grab(self):
+        if self.position >= self.scene.num_frames:
+            self.finished = True
+            return False
+        if self.realtime:
+            now = time.time()
+            if now < self.next_t: time.sleep(self.next_t - now)
+            self.next_t = max(now, self.next_t) + 1.0 / self.scene.fps
+        self.pending = self.position
+        self.pending_ts = self.scene.frame_time(self.position)
+        self.position += 1
+        return True
+
+    def retrieve(self):
+        if self.pending is None: return False, None
+        return True, self.render(self.pending)
+
+    def frame_time(self):
+        return self.pending_ts
+
+    def render(self, k):
+        scene = self.scene
+        canvas = scene.render_canvas(k, self.away, self.cam_id)
+        frame = cv2.remap(canvas, self.map1, self.map2, cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=WALL)
+
+        dx, dy = scene.shake(k, self.cam_id)
+        if dx or dy:
+            shift = np.float32([[1, 0, dx], [0, 1, dy]])
+            frame = cv2.warpAffine(frame, shift, RAW_SIZE, borderMode=cv2.BORDER_REPLICATE)
+
+        if scene.light:
+            # Langsame Drift + leichtes Flackern
+            gain = 1 + scene.light * (np.sin(2 * np.pi * k / (scene.fps * 7) + self.light_phase) + 0.25 * self.rng.standard_normal())
+            frame = cv2.convertScaleAbs(frame, alpha=gain)
+        if scene.noise_bank:
+            frame = cv2.add(frame, scene.noise_bank[self.rng.integers(len(scene.noise_bank))], dtype=cv2.CV_8U)
+        return frame
+
+# --- AUSWERTUNG ---
+
+def evaluate(throws=30, seed=0, cam_ids=(0, 1, 2), heatmap=None, min_rate=0.5, **kwargs):
+    """Lässt `throws` Würfe headless durch den kompletten run-Loop laufen und vergleicht mit der Wahrheit.
+    Werden weniger als `min_rate` der Würfe erkannt, ist der Lauf fehlgeschlagen (report["ok"] = False)."""
+    from vision import DartVisionSystem
+    scene = SynthScene(throws=throws, seed=seed, **kwargs)
+    detections = []
+
+    def on_event(event):
+        if event == "NEXT_PLAYER": return
+        detections.append({"coords": system.last_hit_coords, "score": event, "frame": scene.position})
+
+    system = DartVisionSystem(on_event, cam_ids=cam_ids, source_factory=partial(SynthSource, scene), show_debug=False)
+    start = time.time()
+    system.run()
+    elapsed = time.time() - start
+
+    # Jede Detektion dem nächsten steckenden, noch nicht zugeordneten Wurf zuordnen
+    matched = {}
+    false_positives = 0
+    for det in detections:
+        candidates = [t for t in scene.darts_at(det["frame"]) if t["index"] not in matched]
+        if not candidates or det["coords"] is None:
+            false_positives += 1
+            continue
+        best = min(candidates, key=lambda t: np.hypot(t["x"] - det["coords"][0], t["y"] - det["coords"][1]))
+        error = float(np.hypot(best["x"] - det["coords"][0], best["y"] - det["coords"][1]))
+        if error > 50:
+            false_positives += 1
+            continue
+        matched[best["index"]] = (det, error)
+
+    errors = [e for _, e in matched.values()]
+    correct = sum(1 for i, (det, _) in matched.items()
+                  if (det["score"]["sector"], det["score"]["multiplier"]) ==
+                  (scene.throws[i]["score"]["sector"], scene.throws[i]["score"]["multiplier"]))
+    report = {
+        "throws": throws, "frames": scene.num_frames, "seconds": elapsed,
+        "fps": system.frames_total / elapsed if elapsed > 0 else 0.0,
+        "detected": len(matched), "missed": throws - len(matched), "false_positives": false_positives,
+        "score_correct": correct,
+        "error_px_mean": float(np.mean(errors)) if errors else None,
+        "error_px_p95": float(np.percentile(errors, 95)) if errors else None,
+        "error_mm_mean": float(np.mean(errors)) / board_mm_to_px() if errors else None,
+        "ok": len(matched) >= max(1, min_rate * throws),
+    }
+    print(f"[INFO] Würfe: {throws} | erkannt: {len(matched)} | verpasst: {throws - len(matched)} | Fehlalarme: {false_positives}")
+    if matched:
+        print(f"[INFO] Score korrekt: {correct}/{len(matched)} | Positionsfehler: Ø {report['error_px_mean']:.1f}px "
+              f"({report['error_mm_mean']:.1f}mm), p95 {report['error_px_p95']:.1f}px")
+    print(f"[INFO] {system.frames_total} Takte in {elapsed:.1f}s ({report['fps']:.1f} FPS)")
+    if not report["ok"]:
+        # Ein stilles 0/N heißt meist: Detektor und Szene passen nicht zusammen, nicht "schlechte Kamera"
+        print(f"[ERROR] Nur {len(matched)}/{throws} Würfe erkannt (Minimum {min_rate:.0%}) - Detektor oder Szene prüfen!")
+
+    if heatmap:
+        # Erkannte Treffer pro Feld, über die Label-Map eingefärbt
+        coords = np.array([d["coords"] for d in detections if d["coords"] is not None] or np.empty((0, 2)), dtype=np.int64)
+        cv2.imwrite(heatmap, field_heatmap(system.score_map(), coords[:, 0], coords[:, 1]))
+    return report
+
+def write_frames(path, frame_index=None, throws=3, seed=0):
+    """Schreibt die Rohbilder aller Kameras für ein Bild mit steckenden Pfeilen (zum Anschauen)."""
+    scene = SynthScene(throws=throws, seed=seed)
+    k = frame_index if frame_index is not None else scene.throws[-1]["frame"] + 5
+    os.makedirs(path, exist_ok=True)
+    for cam_id in (0, 1, 2):
+        source = SynthSource(scene, cam_id)
+        cv2.imwrite(os.path.join(path, f"cam{cam_id}_{k:05d}.png"), source.render(k))
+    cv2.imwrite(os.path.join(path, "board.png"), scene.board)
+    with open(os.path.join(path, "truth.json"), "w") as f:
+        json.dump(scene.ground_truth(), f, indent=2)
+    print(f"[INFO] Bilder für Frame {k} gespeichert: {path}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "eval":
+        n = int(args[1]) if len(args) > 1 and args[1].isdigit() else 30
+        seed = int(args[args.index("--seed") + 1]) if "--seed" in args else 0
+        heatmap = args[args.index("--heatmap") + 1] if "--heatmap" in args else None
+        min_rate = float(args[args.index("--min-rate") + 1]) if "--min-rate" in args else 0.5
+        report = evaluate(n, seed=seed, heatmap=heatmap, min_rate=min_rate)
+        if "--json" in args:
+            with open(args[args.index("--json") + 1], "w") as f:
+                json.dump(report, f, indent=2)
+        sys.exit(0 if report["ok"] else 1)
+    elif args and args[0] == "frames" and len(args) > 1:
+        write_frames(args[1])
+    else:
+        print("Verwendung: python vision_synth.py eval [würfe] [--seed N] [--min-rate 0.5] [--json <datei>] [--heatmap <bild>]")
+        print("            python vision_synth.py frames <ordner>")
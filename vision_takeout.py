@@ -1,55 +1,117 @@
 import cv2
 import numpy as np
+from vision_absdiff import board_roi
 
 class TakeoutDetector:
-    def __init__(self, board_mask):
+    # Grenzen der vollen Auflösung (1000x1000)
+    CONTOUR_AREA = 1200  # 🚀 von 900 auf 1200 erhöht (Lichtreflexe ignorieren)
+    TOTAL_AREA = 4000    # 🚀 von 3000 auf 4000 erhöht
+    THRESHOLD = 40
+
+    def __init__(self, board_mask, levels=2, margin=1.5):
         self.board_mask = board_mask
         self.clean_board = None
+        # Außerhalb der Maske ist das Ergebnis immer 0 -> nur die Bounding Box rechnen
+        self.mask_roi = board_roi(board_mask)
+        # Grobprüfung auf der Pyramidenstufe `levels` (2 -> 4x kleiner, 1/16 der Pixel)
+        self.levels = levels
+        self.area_scale = 4 ** levels
+        # Nur außerhalb von [Grenze / margin, Grenze * margin] entscheidet die Grobstufe allein
+        self.margin = margin
+        x0, y0, x1, y1 = self.mask_roi
+        self.coarse_mask = cv2.threshold(self.pyramid(board_mask[y0:y1, x0:x1]), 127, 255, cv2.THRESH_BINARY)[1]
+        self.clean_coarse = None
+
+    def pyramid(self, img):
+        for _ in range(self.levels): img = cv2.pyrDown(img)
+        return img
 
     def set_clean_board(self, frame):
         """Speichert das saubere Board ohne Pfeile."""
         self.clean_board = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        x0, y0, x1, y1 = self.mask_roi
+        self.clean_coarse = self.pyramid(self.clean_board[y0:y1, x0:x1])
 
-    def check_takeout(self, warped_frame, last_hit_contours):
-        """Prüft, ob Pfeile aus den vergangenen Positionen entfernt wurden."""
+    def check_takeout(self, warped_frame, last_hit_contours, debug=True, gray=None):
+        """Prüft, ob Pfeile aus den vergangenen Positionen entfernt wurden.
+        gray: Graubild desselben Bildes aus der Detektion (spart die Umrechnung).
+        Zuerst grob auf der Pyramidenstufe, volle Auflösung nur wenn das Ergebnis knapp ist.
+        Mit debug=False ohne Debug-Bild (zweiter Wert None)."""
         # --- BUGFIX: Nicht als leer melden, wenn noch keine Referenz existiert ---
         if self.clean_board is None:
-            return False, warped_frame
+            return False, warped_frame if debug else None
+
+        x0, y0, x1, y1 = self.mask_roi
+        if gray is None: gray = cv2.cvtColor(warped_frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        else: gray = gray[y0:y1, x0:x1]
+
+        # Debug-Bild braucht die Konturen der vollen Auflösung
+        takeout_detected = None if debug else self.coarse_check(gray, bool(last_hit_contours))
+        contours = []
+        if takeout_detected is None:
+            takeout_detected, contours = self.full_check(gray, bool(last_hit_contours))
 
-        gray = cv2.cvtColor(warped_frame, cv2.COLOR_BGR2GRAY)
+        # Debug-Visualisierung
+        if not debug:
+            return takeout_detected, None
+        debug_img = warped_frame.copy()
+        if not takeout_detected:
+            cv2.drawContours(debug_img, contours, -1, (0, 0, 255), 1)
         
+        return takeout_detected, debug_img
+
+    def coarse_check(self, gray, has_hits):
+        """Grobe Prüfung auf 1/4 der Auflösung. True/False wenn eindeutig, None wenn knapp.
+        pyrDown glättet (ersetzt den GaussianBlur) und dünne Pfeile verlieren dabei Kontrast:
+        'leer' gilt deshalb erst bei halber Schwelle, 'belegt' bei voller Schwelle."""
+        diff = cv2.absdiff(self.clean_coarse, self.pyramid(gray))
+        diff = cv2.bitwise_and(diff, self.coarse_mask)
+        _, low = cv2.threshold(diff, self.THRESHOLD // 2, 255, cv2.THRESH_BINARY)
+        limit = self.CONTOUR_AREA if has_hits else self.TOTAL_AREA
+
+        # Gesamtfläche ist eine obere Grenze für jede einzelne Fläche
+        if cv2.countNonZero(low) * self.area_scale < limit / self.margin: return True
+        _, high = cv2.threshold(diff, self.THRESHOLD, 255, cv2.THRESH_BINARY)
+        if not has_hits:
+            if cv2.countNonZero(high) * self.area_scale > limit * self.margin: return False
+            return None
+
+        # Größte zusammenhängende Fläche (Pixel, hochgerechnet auf volle Auflösung), 16-Bit-Labels reichen hier
+        if self.largest_area(low) < limit / self.margin: return True
+        if self.largest_area(high) > limit * self.margin: return False
+        return None
+
+    def largest_area(self, binary):
+        n, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8, ltype=cv2.CV_16U)
+        return stats[1:, cv2.CC_STAT_AREA].max() * self.area_scale if n > 1 else 0
+
+    def full_check(self, gray, has_hits):
+        """Prüfung in voller Auflösung. Gibt (takeout_detected, Konturen) zurück."""
+        x0, y0, x1, y1 = self.mask_roi
         # --- ROBUSTERER ABSDIFF ---
         # Differenz zum leeren Board
-        diff = cv2.absdiff(self.clean_board, gray)
+        diff = cv2.absdiff(self.clean_board[y0:y1, x0:x1], gray)
         diff = cv2.GaussianBlur(diff, (5, 5), 0) # Leicht glätten
         
         # 🚀 Schwellwert leicht angepasst für 1000x1000
-        _, thr = cv2.threshold(diff, 40, 255, cv2.THRESH_BINARY)
-        thr = cv2.bitwise_and(thr, self.board_mask)
+        _, thr = cv2.threshold(diff, self.THRESHOLD, 255, cv2.THRESH_BINARY)
+        thr = cv2.bitwise_and(thr, self.board_mask[y0:y1, x0:x1])
         
         # --- 🚀 BUGFIX 3: contours initialisieren ---
         takeout_detected = True 
-        debug_img = warped_frame.copy()
         contours = []
         
         # Nur prüfen, wenn wir Darts zu entfernen haben
-        if last_hit_contours:
-            contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if has_hits:
+            contours, _ = cv2.findContours(thr, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
             
             for cnt in contours:
                 # 🚀 FLÄCHENPRÜFUNG FÜR 1000x1000 ANGEPASST
-                # Area Threshold erhöht, um Lichtreflexe besser zu ignorieren
-                if cv2.contourArea(cnt) > 1200: # 🚀 HIER: von 900 auf 1200 erhöht
+                if cv2.contourArea(cnt) > self.CONTOUR_AREA:
                     takeout_detected = False
                     break
         else:
             # Wenn keine Darts stecken, darf der TakeoutDetector nichts finden
-            # 🚀 Schwellwert für Gesamtdifferenz für 1000x1000 angepasst
-            if cv2.countNonZero(thr) > 4000: # 🚀 HIER: von 3000 auf 4000 erhöht
+            if cv2.countNonZero(thr) > self.TOTAL_AREA:
                 takeout_detected = False
-
-        # Debug-Visualisierung
-        if not takeout_detected:
-            cv2.drawContours(debug_img, contours, -1, (0, 0, 255), 1)
-        
-        return takeout_detected, debug_img
\ No newline at end of file
+        return takeout_detected, contours
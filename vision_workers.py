@@ -0,0 +1,290 @@
+import multiprocessing as mp
+import queue
+import sys
+import threading
+import time
+from functools import partial
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+from vision_sources import CAMERA_STATES, READY, CameraSource, FrameSource
+
+FRAME_SHAPE = (1000, 1000, 3)
+
+class SharedFrame:
+    """Ein-Slot-Bildpuffer im Shared Memory (1000x1000 BGR), wird pro Bild überschrieben."""
+    def __init__(self, name=None):
+        size = int(np.prod(FRAME_SHAPE))
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.array = np.ndarray(FRAME_SHAPE, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self, unlink=False):
+        self.array = None # Puffer freigeben, sonst schlägt close() fehl
+        self.shm.close()
+        if unlink: self.shm.unlink()
+
+def camera_worker(index, cam_id, shm_name, seq, status, results, commands, board_mask, freeze_mean, freeze_max, source_factory,
+                  radii=None, winkel_offset=0):
+    """Prozess pro Kamera: Capture -> Warp -> Detektion. Nur kleine Ergebnisse gehen zurück."""
+    from vision import CameraHandler, CameraPipeline
+
+    source = source_factory(cam_id) if source_factory else CameraSource(cam_id)
+    cam = CameraHandler(cam_id, source=source)
+    pipeline = CameraPipeline(index, cam, board_mask, freeze_mean, freeze_max, radii=radii, winkel_offset=winkel_offset)
+    shared = SharedFrame(shm_name)
+
+    high_sensitivity = False
+    debug_requested = False # Fusion will ein Debug-Bild -> nächstes Bild ins Shared Memory
+    last_hit_contours = {}
+    epoch = 0
+    pending = None # [epoch, skip, clean_board]: Referenz nach `skip` Bildern setzen
+
+    try:
+        running = True
+        while running:
+            # --- KOMMANDOS DER FUSION (nicht blockierend) ---
+            while True:
+                try: cmd = commands.get_nowait()
+                except queue.Empty: break
+                if cmd[0] == "stop": running = False
+                elif cmd[0] == "sensitivity": high_sensitivity = cmd[1]
+                elif cmd[0] == "learn": pipeline.learn_background = cmd[1]
+                elif cmd[0] == "debug_frame": debug_requested = True
+                elif cmd[0] == "last_hits": last_hit_contours = cmd[1]
+                elif cmd[0] == "settle": pipeline.settle_reference(cmd[1])
+                elif cmd[0] == "mode": cam.request_capture_mode(cmd[1])
+                elif cmd[0] == "geometry": pipeline.detector.set_geometry(cmd[1], cmd[2])
+                elif cmd[0] == "reference":
+                    pending = [cmd[1], cmd[2], cmd[3]]
+                    if cmd[4]:
+                        cam.load_config()
+                        cam.compute_warp_matrix()
+            if not running: break
+
+            # Kamera-Zustand für die Anzeige (Index in CAMERA_STATES)
+            if cam.cap is not None: status.value = CAMERA_STATES.index(cam.cap.status)
+            if cam.cap is None or not cam.cap.isOpened():
+                time.sleep(0.5)
+                continue
+
+            cam.apply_capture_mode()
+            ret, frame = cam.cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            # Zeitpunkt des Bildes: nach dem (blockierenden) Lesen, wie im CaptureThread
+            ts = cam.cap.frame_time() or time.time()
+            if not pipeline.prepare(frame, ts): continue
+
+            # Bild ins Shared Memory nur auf Anfrage der Debug-Ansicht (sonst keine Kopie pro Bild)
+            if debug_requested:
+                with seq.get_lock():
+                    shared.array[:] = pipeline.warped
+                    seq.value += 1
+                debug_requested = False
+
+            if pending is not None:
+                if pending[1] > 0:
+                    pending[1] -= 1
+                    continue
+                pipeline.set_reference(pipeline.warped, clean_board=pending[2])
+                epoch, pending = pending[0], None
+                print(f"[DEBUG] Referenz für Cam {cam_id} gesetzt.")
+                continue
+
+            # Idle / Bilder aus dem kleinen Modus: nur grobe Prüfung. Bei einer Änderung sofort auf volle
+            # Auflösung umschalten (die Fusion folgt mit "mode"), detektiert wird erst auf deren Bildern
+            if cam.capture_mode == "idle" or pipeline.low_res:
+                wake = pipeline.idle_change()
+                if wake: cam.request_capture_mode("active")
+                results.put({"index": index, "cam_id": cam_id, "ts": pipeline.ts, "idle": True, "wake": wake, "epoch": epoch})
+                continue
+
+            coarse = pipeline.coarse_change()
+            pipeline.detector.high_sensitivity_mode = high_sensitivity or coarse
+            result = pipeline.process(last_hit_contours)
+            result["debug"] = None # Bilder gehen nicht über die Queue
+            result["coarse_change"] = coarse
+            result["epoch"] = epoch
+            results.put(result)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shared.close()
+        if cam.cap is not None: cam.cap.release()
+
+class WorkerPool:
+    """Ein Worker-Prozess pro Kamera. Sammelt deren Ergebnisse für die Fusion im Vision-Thread."""
+    def __init__(self, cam_ids, board_mask, freeze_mean, freeze_max, source_factory=None, collect_timeout=0.5,
+                 radii=None, winkel_offset=0):
+        # spawn verhält sich auf Windows und Linux gleich
+        self.ctx = mp.get_context("spawn")
+        self.collect_timeout = collect_timeout
+        self.results = self.ctx.Queue()
+        self.epoch = 0
+        self.high_sensitivity = False
+        self.learn_background = True
+        self.debug_pending = False
+
+        self.workers = []
+        for i, cam_id in enumerate(cam_ids):
+            shared = SharedFrame()
+            seq = self.ctx.Value("Q", 0)
+            status = self.ctx.Value("i", 0)
+            commands = self.ctx.Queue()
+            process = self.ctx.Process(
+                target=camera_worker, name=f"VisionWorker-{cam_id}", daemon=True,
+                args=(i, cam_id, shared.name, seq, status, self.results, commands,
+                      board_mask, freeze_mean, freeze_max, source_factory, radii, winkel_offset))
+            self.workers.append({"cam_id": cam_id, "process": process, "commands": commands,
+                                 "shared": shared, "seq": seq, "status": status, "debug_seq": 0})
+
+    def start(self):
+        for w in self.workers: w["process"].start()
+        print(f"[VISION] {len(self.workers)} Worker-Prozesse gestartet.")
+
+    def stop(self):
+        self.broadcast("stop")
+        for w in self.workers:
+            w["process"].join(timeout=2.0)
+            if w["process"].is_alive(): w["process"].terminate()
+            w["shared"].close(unlink=True)
+        self.workers = []
+
+    def broadcast(self, *cmd):
+        for w in self.workers: w["commands"].put(cmd)
+
+    def update_references(self, skip, clean_board=False, reload=False):
+        """Neue Referenz in allen Workern (reload: vorher Config neu laden). Ältere Ergebnisse werden danach ignoriert."""
+        self.epoch += 1
+        self.broadcast("reference", self.epoch, skip, clean_board, reload)
+
+    def set_high_sensitivity(self, flag):
+        if flag != self.high_sensitivity:
+            self.high_sensitivity = flag
+            self.broadcast("sensitivity", flag)
+
+    def set_background_learning(self, flag):
+        if flag != self.learn_background:
+            self.learn_background = flag
+            self.broadcast("learn", flag)
+
+    def set_last_hit_contours(self, contours):
+        self.broadcast("last_hits", contours)
+
+    def set_capture_mode(self, mode):
+        self.broadcast("mode", mode)
+
+    def camera_status(self):
+        """Zustand pro Kamera {cam_id: OPENING/READY/FAILED}, wie ihn die Worker zuletzt gemeldet haben."""
+        return {w["cam_id"]: CAMERA_STATES[w["status"].value] for w in self.workers}
+
+    def collect(self):
+        """Wartet auf ein Ergebnis pro lebendem Worker mit offener Kamera (max. collect_timeout).
+        Worker ohne Kamera liefern nichts, auf sie zu warten hieße: jeder Takt dauert collect_timeout."""
+        latest = {}
+        alive = {i for i, w in enumerate(self.workers) if w["process"].is_alive()}
+        ready = {i for i in alive if CAMERA_STATES[self.workers[i]["status"].value] == READY}
+        # Ist keine Kamera offen, wie bisher auf alle warten (sonst dreht der Vision-Thread leer)
+        waiting = ready or alive
+        deadline = time.time() + self.collect_timeout
+        while waiting - latest.keys():
+            remaining = deadline - time.time()
+            if remaining <= 0: break
+            try: r = self.results.get(timeout=remaining)
+            except queue.Empty: break
+            if r["epoch"] >= self.epoch: latest[r["index"]] = r
+
+        # Bereits wartende, neuere Ergebnisse ersetzen ältere (nichts aufstauen)
+        while True:
+            try: r = self.results.get_nowait()
+            except queue.Empty: break
+            if r["epoch"] >= self.epoch: latest[r["index"]] = r
+        return [latest[i] for i in sorted(latest)]
+
+    def request_debug_frames(self):
+        """Jeder Worker legt sein nächstes Bild ins Shared Memory (abholen mit debug_frames).
+        Eine Anfrage auf einmal, bis Bilder da sind."""
+        if self.debug_pending: return
+        self.debug_pending = True
+        self.broadcast("debug_frame")
+
+    def debug_frames(self):
+        """Kopien der seit dem letzten Abholen neu abgelegten Bilder (nur für die Debug-Fenster)."""
+        frames = {}
+        for w in self.workers:
+            with w["seq"].get_lock():
+                if w["seq"].value == w["debug_seq"]: continue
+                w["debug_seq"] = w["seq"].value
+                frames[w["cam_id"]] = w["shared"].array.copy()
+        if frames: self.debug_pending = False
+        return frames
+
+# --- BENCHMARK ---
+
+class BenchSource(FrameSource):
+    """Synthetische 1080p-Quelle mit wanderndem Objekt (kein Kamera-Gerät nötig)."""
+    def __init__(self, cam_id, fps=120):
+        rng = np.random.default_rng(cam_id)
+        small = rng.integers(0, 255, (108, 192, 3), dtype=np.uint8)
+        self.base = cv2.resize(small, (1920, 1080), interpolation=cv2.INTER_CUBIC)
+        self.interval = 1.0 / fps if fps else 0.0
+        self.next_t = 0.0
+        self.count = 0
+
+    def grab(self):
+        if self.interval:
+            now = time.time()
+            if now < self.next_t: time.sleep(self.next_t - now)
+            self.next_t = max(now, self.next_t) + self.interval
+        self.count += 1
+        return True
+
+    def retrieve(self):
+        frame = self.base.copy()
+        # Nach dem Referenzbild ein Pfeil-ähnlicher Strich, damit die Detektion Arbeit hat
+        if self.count > 20:
+            x = 800 + (self.count * 7) % 300
+            cv2.line(frame, (x, 400), (x + 60, 520), (255, 255, 255), 9)
+        return True, frame
+
+def run_benchmark(seconds=5.0, source_fps=120, ui_work_ms=4.0):
+    """Ende-zu-Ende FPS bei 1, 2 und 3 Kameras, jeweils im Vision-Thread und mit Workern.
+    Parallel läuft eine simulierte 60-Hz-UI-Schleife im Hauptthread (reiner Python-Code)."""
+    from vision import DartVisionSystem
+
+    print(f"{'Kameras':>8} {'Modus':>8} {'Vision FPS':>11} {'UI FPS':>8}")
+    for n in (1, 2, 3):
+        for use_workers in (False, True):
+            system = DartVisionSystem(lambda hit: None, cam_ids=range(n), use_workers=use_workers,
+                                      source_factory=partial(BenchSource, fps=source_fps), show_debug=False)
+            thread = threading.Thread(target=system.run, daemon=True)
+            thread.start()
+            # Aufwärmen: Prozesse starten, Referenzen setzen
+            while system.frames_total < 5 and thread.is_alive(): time.sleep(0.05)
+
+            start_frames, start = system.frames_total, time.time()
+            ui_frames = 0
+            while time.time() - start < seconds:
+                t = time.perf_counter()
+                while (time.perf_counter() - t) * 1000 < ui_work_ms: pass # UI-Arbeit unter dem GIL
+                ui_frames += 1
+                time.sleep(max(0.0, 1 / 60 - (time.perf_counter() - t)))
+            elapsed = time.time() - start
+            vision_fps = (system.frames_total - start_frames) / elapsed
+
+            system.stop()
+            thread.join(timeout=2.0)
+            mode = "worker" if use_workers else "thread"
+            print(f"{n:>8} {mode:>8} {vision_fps:>11.1f} {ui_frames / elapsed:>8.1f}")
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        run_benchmark()
+    else:
+        print("Verwendung: python vision_workers.py --bench")